@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Enum Resolution Benchmark
+
+Times GaqlRowExtractor on an enum-heavy query (nine enum columns and one
+metric), where enum numbers are resolved by indexing EnumRegistry tables
+inline, against the previous per-value converter: a dict lookup called
+once per enum field per row.
+
+Rows are cycled from a pool of distinct synthetic GoogleAdsRow protobufs,
+so a million-row run doesn't hold a million rows in memory.
+
+Usage:
+    python benchmarks/bench_enums.py [--rows 1000000] [--pool 10000]
+
+Requirements:
+    - google-ads installed (no credentials or network needed)
+"""
+
+import argparse
+import operator
+import time
+from itertools import cycle, islice
+
+from synthetic import GoogleAdsRowPb
+
+from google_ads_mcp import GaqlRowExtractor, enum_registry
+
+ENUM_QUERY = (
+    "SELECT campaign.status, campaign.serving_status, campaign.advertising_channel_type, "
+    "campaign.bidding_strategy_type, ad_group.status, segments.slot, segments.device, "
+    "segments.ad_network_type, segments.day_of_week, metrics.clicks "
+    "FROM ad_group WHERE segments.date DURING LAST_30_DAYS"
+)
+
+
+def make_row(i: int):
+    row = GoogleAdsRowPb()
+    row.campaign.status = 2 + i % 2
+    row.campaign.serving_status = 2 + i % 4
+    row.campaign.advertising_channel_type = 2 + i % 5
+    row.campaign.bidding_strategy_type = 2 + i % 9
+    row.ad_group.status = 2 + i % 3
+    row.segments.slot = 2 + i % 6
+    row.segments.device = 2 + i % 4
+    row.segments.ad_network_type = 2 + i % 5
+    row.segments.day_of_week = 2 + i % 7
+    row.metrics.clicks = i % 40
+    return row
+
+
+def dict_converter_values(query: str, descriptor):
+    """Compile the previous extractor: convert_i(get_i(row)) with a dict-lookup converter per enum field."""
+    namespace, exprs = {}, []
+    for index, path in enumerate(GaqlRowExtractor.for_query(query).field_paths):
+        message, field = descriptor, None
+        for part in path.split("."):
+            field = message.fields_by_name[part]
+            message = field.message_type
+        namespace[f"get_{index}"] = operator.attrgetter(path)
+        expr = f"get_{index}(row)"
+        if field.enum_type is not None:
+            names = {value.number: value.name for value in field.enum_type.values}
+            namespace[f"convert_{index}"] = lambda value, names=names: names.get(value, str(value))
+            expr = f"convert_{index}({expr})"
+        exprs.append(expr)
+    exec(f"def values(row):\n    return ({', '.join(exprs)},)\n", namespace)
+    return namespace["values"]
+
+
+def rows_per_second(func, pool, rows: int) -> float:
+    start = time.perf_counter()
+    for row in islice(cycle(pool), rows):
+        func(row)
+    elapsed = time.perf_counter() - start
+    return rows / elapsed if elapsed else float("inf")
+
+
+def best_of(paths, pool, rows: int, repeat: int):
+    """Run the paths round-robin and keep each one's best throughput, to damp machine noise."""
+    best = {label: 0.0 for label, _ in paths}
+    for _ in range(repeat):
+        for label, func in paths:
+            best[label] = max(best[label], rows_per_second(func, pool, rows))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to extract (default: 1000000)")
+    parser.add_argument("--pool", type=int, default=10_000, help="Distinct rows to cycle (default: 10000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the best is reported (default: 3)")
+    args = parser.parse_args()
+
+    pool = [make_row(i) for i in range(args.pool)]
+    extractor = GaqlRowExtractor.for_query(ENUM_QUERY)
+    baseline = dict_converter_values(ENUM_QUERY, GoogleAdsRowPb.DESCRIPTOR)
+    assert extractor.values(pool[0]) == baseline(pool[0])
+
+    print(f"{'path':<28}{'rows/s':>14}{'enum values/s':>16}")
+    results = best_of([
+        ("dict converter per value", baseline),
+        ("registry table (values)", extractor.values),
+        ("registry table (to_dict)", extractor.to_dict),
+    ], pool, args.rows, args.repeat)
+    for label, speed in results.items():
+        print(f"{label:<28}{speed:>14,.0f}{speed * 9:>16,.0f}")
+    speedup = results["registry table (values)"] / results["dict converter per value"]
+    print(f"\n{len(enum_registry)} enum tables built; speedup (values): {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+End-to-End GAQL Benchmark
+
+Runs run_google_ads_gaql against SyntheticGoogleAdsClient and reports
+throughput, peak RSS and where the time went (API, serialization,
+encoding), as read from server_metrics. Each case runs in its own
+subprocess so peak RSS is per case.
+
+Modes:
+    paged-json      page through the whole result with run_google_ads_gaql_next_page
+    paged-columnar  the same with response_format='columnar'
+    streamed        one use_streaming response (stops at CHARACTER_LIMIT)
+    store           store_as: every row into the SQLite result store
+
+Usage:
+    python benchmarks/bench_gaql.py [--rows 1000 --rows 100000] [--shape campaign]
+        [--mode store] [--output report.json] [--compare baseline.json]
+
+    With --compare, cases whose throughput dropped or peak RSS grew by more
+    than --threshold percent are listed and the exit status is 1.
+
+Requirements:
+    - google-ads installed (no credentials or network needed)
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from synthetic import SHAPES, SyntheticGoogleAdsClient
+
+import google_ads_mcp
+
+MODES = ("paged-json", "paged-columnar", "streamed", "store")
+DEFAULT_ROWS = (1_000, 100_000)
+# Stages whose time is reported; gaql_api includes building the synthetic rows
+STAGES = ("gaql_api", "serialize", "encode_json", "encode_columnar", "scheduler_wait")
+REPORT_VERSION = 1
+
+
+def peak_rss_mb() -> float:
+    """Return this process's peak resident set size in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def drive(mode: str, query: str) -> int:
+    """Run one query in the given mode and return the number of tool calls."""
+    params = google_ads_mcp.RunGoogleAdsGaqlInput(
+        customer_id="1234567890",
+        query=query,
+        page_size=10_000,
+        use_streaming=mode in ("streamed", "store"),
+        use_cache=False,
+        response_format="columnar" if mode == "paged-columnar" else "json",
+        store_as="bench" if mode == "store" else None
+    )
+    output = await google_ads_mcp.run_google_ads_gaql(params)
+    calls = 1
+    if output.startswith("Error"):
+        raise RuntimeError(output)
+    if not mode.startswith("paged"):
+        return calls
+
+    while True:
+        next_cursor = json.loads(output).get("next_cursor")
+        if not next_cursor:
+            return calls
+        output = await google_ads_mcp.run_google_ads_gaql_next_page(
+            google_ads_mcp.GaqlNextPageInput(cursor=next_cursor, page_size=10_000)
+        )
+        calls += 1
+        if output.startswith("Error"):
+            raise RuntimeError(output)
+
+
+def run_case(shape: str, rows: int, mode: str) -> Dict[str, Any]:
+    """Run one case in this process and return its result."""
+    with tempfile.TemporaryDirectory() as workdir:
+        client = SyntheticGoogleAdsClient(shape, rows)
+        # Isolate every piece of module state the tools touch
+        google_ads_mcp.get_google_ads_client = lambda: client
+        google_ads_mcp.server_metrics = google_ads_mcp.ServerMetrics(prometheus_path=None, jsonl_path=None)
+        google_ads_mcp.gaql_scheduler = google_ads_mcp.GaqlScheduler(developer_qps=0, customer_qps=0)
+        google_ads_mcp.field_catalog = google_ads_mcp.GaqlFieldCatalogCache(cache_dir=workdir)
+        google_ads_mcp.result_store = google_ads_mcp.GaqlResultStore(str(Path(workdir) / "store.sqlite"))
+        baseline_rss = peak_rss_mb()
+
+        started = time.perf_counter()
+        tool_calls = asyncio.run(drive(mode, SHAPES[shape][0]))
+        seconds = time.perf_counter() - started
+
+        snapshot = google_ads_mcp.server_metrics.snapshot()
+        stages = {
+            stage: {
+                "seconds": snapshot["stages"][stage]["duration_seconds"]["sum"],
+                "rows": snapshot["stages"][stage].get("rows", {}).get("sum")
+            }
+            for stage in STAGES if stage in snapshot["stages"]
+        }
+        # Rows the server read, not rows the stand-in buffered into a batch
+        rows_read = int(stages.get("gaql_api", {}).get("rows") or 0)
+        return {
+            "shape": shape,
+            "rows": rows,
+            "mode": mode,
+            "rows_read": rows_read,
+            "tool_calls": tool_calls,
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(rows_read / seconds) if seconds else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "baseline_rss_mb": round(baseline_rss, 1),
+            "stages": stages,
+            # Tool dispatch, cursor bookkeeping and result store writes
+            "other_seconds": round(seconds - sum(stage["seconds"] for stage in stages.values()), 4)
+        }
+
+
+def run_in_subprocess(shape: str, rows: int, mode: str) -> Dict[str, Any]:
+    """Run one case in a fresh interpreter so its peak RSS is its own."""
+    completed = subprocess.run(
+        [sys.executable, __file__, "--worker", "--shape", shape, "--rows", str(rows), "--mode", mode],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def case_key(result: Dict[str, Any]) -> str:
+    return f"{result['shape']}/{result['mode']}/{result['rows']}"
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print the change against a baseline report and return the regressed cases."""
+    previous = {case_key(result): result for result in baseline.get("results", [])}
+    regressions = []
+    print(f"\n{'case':<36}{'rows/s':>14}{'change':>9}{'peak MiB':>10}{'change':>9}")
+    for result in results:
+        key = case_key(result)
+        before = previous.get(key)
+        if before is None:
+            print(f"{key:<36}{result['rows_per_second']:>14,}{'new':>9}")
+            continue
+        speed = (result["rows_per_second"] / before["rows_per_second"] - 1) * 100
+        memory = (result["peak_rss_mb"] / before["peak_rss_mb"] - 1) * 100
+        flag = ""
+        if speed < -threshold or memory > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(
+            f"{key:<36}{result['rows_per_second']:>14,}{speed:>+8.1f}%"
+            f"{result['peak_rss_mb']:>10.1f}{memory:>+8.1f}%{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, action="append", help="Result size(s) (default: 1000 and 100000)")
+    parser.add_argument("--shape", choices=sorted(SHAPES), action="append", help="Row shape(s) to run (default: all)")
+    parser.add_argument("--mode", choices=MODES, action="append", help="Mode(s) to run (default: all)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent (default: 10)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_case(args.shape[0], args.rows[0], args.mode[0])))
+        return
+
+    results = []
+    print(f"{'case':<36}{'rows/s':>14}{'calls':>8}{'peak MiB':>10}{'api s':>8}{'serialize s':>13}{'encode s':>10}{'other s':>9}")
+    for shape in args.shape or sorted(SHAPES):
+        for mode in args.mode or MODES:
+            for rows in args.rows or DEFAULT_ROWS:
+                result = run_in_subprocess(shape, rows, mode)
+                results.append(result)
+                stages = result["stages"]
+                encode = sum(stages.get(stage, {}).get("seconds") or 0 for stage in ("encode_json", "encode_columnar"))
+                print(
+                    f"{case_key(result):<36}{result['rows_per_second']:>14,}{result['tool_calls']:>8,}"
+                    f"{result['peak_rss_mb']:>10.1f}{stages.get('gaql_api', {}).get('seconds') or 0:>8.2f}"
+                    f"{stages.get('serialize', {}).get('seconds') or 0:>13.2f}{encode:>10.2f}"
+                    f"{result['other_seconds']:>9.2f}"
+                )
+
+    report = {
+        "version": REPORT_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "google_ads_api": google_ads_mcp.GaqlFieldCatalogCache.current_version()
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:g}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Response Size Benchmark
+
+Compares the size of run_google_ads_gaql responses in the nested 'json'
+format and the 'columnar' format on synthetic rows, and how many rows of
+each fit within CHARACTER_LIMIT.
+
+Usage:
+    python benchmarks/bench_response_size.py [--rows 2000] [--shape campaign]
+
+Requirements:
+    - google-ads installed (no credentials or network needed)
+"""
+
+import argparse
+import json
+
+from synthetic import SHAPES, make_rows
+
+from google_ads_mcp import (
+    CHARACTER_LIMIT,
+    GaqlRowExtractor,
+    build_columnar_response,
+    build_json_response,
+    parse_select_fields,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000, help="Rows per shape (default: 2000)")
+    parser.add_argument("--shape", choices=sorted(SHAPES), action="append", help="Row shape(s) to run (default: all)")
+    args = parser.parse_args()
+
+    unlimited = 10 ** 12
+    print(f"{'shape':<18}{'json chars':>14}{'columnar chars':>16}{'ratio':>8}{'json rows/resp':>16}{'columnar rows/resp':>20}")
+    for shape in args.shape or sorted(SHAPES):
+        query = SHAPES[shape][0]
+        rows = make_rows(shape, args.rows)
+        extractor = GaqlRowExtractor.for_query(query)
+        columns = parse_select_fields(query)
+        header = {"customer_id": "1234567890", "query": query}
+
+        json_size = len(build_json_response(header, (extractor(row) for row in rows), budget=unlimited))
+        columnar_size = len(build_columnar_response(header, columns, (extractor.values(row) for row in rows), budget=unlimited))
+        json_fit = json.loads(build_json_response(header, (extractor(row) for row in rows)))["result_count"]
+        columnar_fit = json.loads(
+            build_columnar_response(header, columns, (extractor.values(row) for row in rows))
+        )["result_count"]
+
+        print(
+            f"{shape:<18}{json_size:>14,}{columnar_size:>16,}{json_size / columnar_size:>7.1f}x"
+            f"{json_fit:>16,}{columnar_fit:>20,}"
+        )
+    print(f"\nrows/resp = rows returned within CHARACTER_LIMIT ({CHARACTER_LIMIT:,} characters)")
+
+
+if __name__ == "__main__":
+    main()
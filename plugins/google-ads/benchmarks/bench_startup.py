@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+
+Measures how quickly a fresh server process becomes useful:
+
+    import      time to import google_ads_mcp
+    initialize  process start to the initialize response over stdio
+    tools/list  process start to the tools/list response
+    sdk         time to import the Ads SDK and GoogleAdsService stubs, which
+                the first tool call pays unless the prewarm already has
+
+Each run starts a new interpreter; medians are reported. The handshake is
+run with the prewarm on and off (GOOGLE_ADS_PREWARM).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5]
+
+Requirements:
+    - mcp and google-ads installed (no credentials or network needed)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SERVER = Path(__file__).parent.parent / "src" / "google_ads_mcp.py"
+
+IMPORT_SCRIPT = f"""
+import sys, time
+sys.path.insert(0, {str(SERVER.parent)!r})
+started = time.perf_counter()
+import google_ads_mcp
+imported = time.perf_counter()
+google_ads_mcp.prewarm_google_ads_sdk()
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def time_import() -> tuple:
+    """Return (import seconds, SDK load seconds) from a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, "GOOGLE_ADS_REFRESH_TOKEN": ""}
+    )
+    imported, sdk = completed.stdout.split()
+    return float(imported), float(sdk)
+
+
+def send(process: subprocess.Popen, message: dict) -> None:
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def receive(process: subprocess.Popen, request_id: int) -> dict:
+    """Read stdout until the response to request_id arrives."""
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("Server exited during the handshake")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def time_handshake(prewarm: bool) -> tuple:
+    """Return seconds from process start to the initialize and tools/list responses."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, str(SERVER)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        env={**os.environ, "GOOGLE_ADS_PREWARM": "1" if prewarm else "0"}
+    )
+    try:
+        send(process, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "bench_startup", "version": "1.0"}
+            }
+        })
+        receive(process, 1)
+        initialized = time.perf_counter() - started
+
+        send(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        send(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = receive(process, 2)["result"]["tools"]
+        listed = time.perf_counter() - started
+        if not tools:
+            raise RuntimeError("tools/list returned no tools")
+        return initialized, listed
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement (default: 5)")
+    args = parser.parse_args()
+
+    imports = [time_import() for _ in range(args.runs)]
+    print(f"{'import google_ads_mcp':<32}{statistics.median(run[0] for run in imports) * 1000:>10.0f} ms")
+    print(f"{'load Ads SDK (first tool call)':<32}{statistics.median(run[1] for run in imports) * 1000:>10.0f} ms")
+
+    for prewarm in (False, True):
+        runs = [time_handshake(prewarm) for _ in range(args.runs)]
+        label = "prewarm on" if prewarm else "prewarm off"
+        print(f"{'initialize (' + label + ')':<32}{statistics.median(run[0] for run in runs) * 1000:>10.0f} ms")
+        print(f"{'tools/list (' + label + ')':<32}{statistics.median(run[1] for run in runs) * 1000:>10.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
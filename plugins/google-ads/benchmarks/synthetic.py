@@ -0,0 +1,164 @@
+"""
+Synthetic GoogleAdsRow generators for offline benchmarks.
+
+Rows are real GoogleAdsRow protobufs populated with deterministic values,
+so benchmarks exercise the same descriptors and field types as live
+responses without network access or credentials. SyntheticGoogleAdsClient
+stands in for GoogleAdsClient so the MCP tools can run end to end.
+"""
+
+import sys
+from itertools import cycle, islice
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Make src/google_ads_mcp.py importable from the benchmarks directory
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from google.ads.googleads import client as googleads_client_module
+
+
+def _row_class():
+    version = googleads_client_module._DEFAULT_VERSION
+    module = __import__(
+        f"google.ads.googleads.{version}.services.types.google_ads_service",
+        fromlist=["GoogleAdsRow"]
+    )
+    return module.GoogleAdsRow.pb()
+
+
+GoogleAdsRowPb = _row_class()
+
+
+def _campaign_row(i: int):
+    row = GoogleAdsRowPb()
+    row.campaign.id = 10_000_000 + i % 500
+    row.campaign.name = f"Campaign {i % 500}"
+    row.campaign.status = 2 + i % 2
+    row.campaign.advertising_channel_type = 2
+    row.metrics.impressions = 1_000 + i
+    row.metrics.clicks = 50 + i % 40
+    row.metrics.cost_micros = 12_340_000 + i * 1_000
+    row.metrics.conversions = float(i % 7)
+    row.metrics.conversions_value = float(i % 7) * 42.5
+    return row
+
+
+def _search_term_row(i: int):
+    row = GoogleAdsRowPb()
+    row.campaign.id = 10_000_000 + i % 50
+    row.campaign.name = f"Campaign {i % 50}"
+    row.ad_group.id = 20_000_000 + i % 400
+    row.ad_group.name = f"Ad Group {i % 400}"
+    row.search_term_view.search_term = f"cheap blue widget size {i}"
+    row.search_term_view.status = 1 + i % 4
+    row.segments.date = f"2025-01-{1 + i % 28:02d}"
+    row.metrics.impressions = 100 + i % 1000
+    row.metrics.clicks = i % 25
+    row.metrics.cost_micros = (i % 25) * 850_000
+    row.metrics.conversions = float(i % 11 == 0)
+    row.metrics.conversions_value = float(i % 11 == 0) * 60.0
+    return row
+
+
+def _shopping_product_row(i: int):
+    row = GoogleAdsRowPb()
+    row.segments.product_item_id = f"sku-{i}"
+    row.segments.product_title = f"Widget model {i} in blue"
+    row.segments.product_brand = f"Brand {i % 30}"
+    row.segments.product_type_l1 = f"Category {i % 12}"
+    row.metrics.clicks = i % 60
+    row.metrics.cost_micros = (i % 60) * 420_000
+    row.metrics.conversions = float(i % 9 == 0)
+    row.metrics.conversions_value = float(i % 9 == 0) * 35.0
+    return row
+
+
+# shape name -> (GAQL query, row factory)
+SHAPES: Dict[str, Tuple[str, Callable[[int], object]]] = {
+    "campaign": (
+        "SELECT campaign.id, campaign.name, campaign.status, "
+        "campaign.advertising_channel_type, metrics.impressions, metrics.clicks, "
+        "metrics.cost_micros, metrics.conversions, metrics.conversions_value "
+        "FROM campaign WHERE segments.date DURING LAST_30_DAYS",
+        _campaign_row,
+    ),
+    "search_term": (
+        "SELECT campaign.id, campaign.name, ad_group.id, ad_group.name, "
+        "search_term_view.search_term, search_term_view.status, segments.date, "
+        "metrics.impressions, metrics.clicks, metrics.cost_micros, "
+        "metrics.conversions, metrics.conversions_value "
+        "FROM search_term_view WHERE segments.date DURING LAST_30_DAYS",
+        _search_term_row,
+    ),
+    "shopping_product": (
+        "SELECT segments.product_item_id, segments.product_title, "
+        "segments.product_brand, segments.product_type_l1, metrics.clicks, "
+        "metrics.cost_micros, metrics.conversions, metrics.conversions_value "
+        "FROM shopping_performance_view WHERE segments.date DURING LAST_30_DAYS",
+        _shopping_product_row,
+    ),
+}
+
+
+def make_rows(shape: str, count: int) -> List[object]:
+    """Return count synthetic rows of the given shape."""
+    factory = SHAPES[shape][1]
+    return [factory(i) for i in range(count)]
+
+
+# SearchStream returns up to 10,000 rows per response message
+STREAM_BATCH_SIZE = 10_000
+
+
+class SyntheticGoogleAdsService:
+    """
+    GoogleAdsService stand-in that yields synthetic rows.
+
+    Rows are cycled from a pool of distinct rows built up front, so memory
+    use reflects the server under test rather than the row source; a
+    result of millions of rows costs no more to hold than the pool.
+    """
+
+    def __init__(self, shape: str, count: int, distinct: int = 1_000):
+        self.count = count
+        self.pool = make_rows(shape, min(count, distinct) or 1)
+        self.calls = 0
+
+    def _rows(self) -> Iterator[object]:
+        return islice(cycle(self.pool), self.count)
+
+    def search_stream(self, customer_id: str, query: str) -> Iterator[SimpleNamespace]:
+        """Yield response batches the way SearchStream does."""
+        self.calls += 1
+        rows = self._rows()
+        while True:
+            batch = list(islice(rows, STREAM_BATCH_SIZE))
+            if not batch:
+                return
+            yield SimpleNamespace(results=batch)
+
+    def search(self, customer_id: str, query: str) -> Iterator[object]:
+        """Yield rows one at a time the way the Search pager does."""
+        self.calls += 1
+        return self._rows()
+
+
+class SyntheticGoogleAdsClient:
+    """
+    GoogleAdsClient stand-in serving one synthetic result.
+
+    Only GoogleAdsService is available; other services raise, so the field
+    catalog fetch fails fast and queries get the syntax checks only.
+    """
+
+    developer_token = "synthetic-developer-token"
+
+    def __init__(self, shape: str, count: int, distinct: int = 1_000):
+        self.service = SyntheticGoogleAdsService(shape, count, distinct)
+
+    def get_service(self, name: str):
+        if name != "GoogleAdsService":
+            raise ValueError(f"{name} is not available offline")
+        return self.service
@@ -27,31 +27,140 @@ Recent Fixes:
 """
 
 from mcp.server.fastmcp import FastMCP
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, List, Dict, Any, Callable, Tuple
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Callable, Iterable, Iterator, Tuple
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from enum import Enum
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import asyncio
+import atexit
+import contextlib
+import difflib
+import fnmatch
+import functools
+import hashlib
+import heapq
+import importlib
 import json
+import logging
+import math
+import operator
 import os
+import random
+import re
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
 import warnings
-from google.oauth2.credentials import Credentials
-from google.ads.googleads import client as googleads_client_module
-from google.ads.googleads.client import GoogleAdsClient
-from google.protobuf.json_format import MessageToJson
+
+# The Google Ads SDK, google-auth and protobuf are imported on first use (see
+# SDK LOADING below) so the server can answer the MCP handshake and list tools
+# without paying their import cost
+if TYPE_CHECKING:
+    from google.ads.googleads.client import GoogleAdsClient
+    from google.protobuf.descriptor import FieldDescriptor
+
+logger = logging.getLogger(__name__)
 
 # Module-level constants
 CHARACTER_LIMIT = 25000
-def _resolve_google_ads_version() -> Optional[str]:
+
+# Access tokens are refreshed in the background once they are this close to expiry
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("GOOGLE_ADS_TOKEN_REFRESH_MARGIN", "300"))
+TOKEN_REFRESH_INTERVAL_SECONDS = 60
+
+# Upper bound on GAQL calls running at once; each one occupies a worker thread
+GAQL_MAX_CONCURRENCY = max(1, int(os.getenv("GOOGLE_ADS_MAX_CONCURRENCY", "8")))
+
+# Request scheduling: queries per second per developer token and per customer,
+# attempts per call for retryable errors, longest backoff honored, and worker
+# threads for bulk work (fan-outs, syncs) so it never occupies the interactive pool
+GAQL_DEVELOPER_QPS = float(os.getenv("GOOGLE_ADS_DEVELOPER_QPS", "10"))
+GAQL_CUSTOMER_QPS = float(os.getenv("GOOGLE_ADS_CUSTOMER_QPS", "4"))
+GAQL_MAX_ATTEMPTS = int(os.getenv("GOOGLE_ADS_MAX_ATTEMPTS", "5"))
+GAQL_MAX_RETRY_DELAY_SECONDS = float(os.getenv("GOOGLE_ADS_MAX_RETRY_DELAY", "60"))
+GAQL_BULK_CONCURRENCY = max(1, int(os.getenv("GOOGLE_ADS_BULK_CONCURRENCY", str(max(1, GAQL_MAX_CONCURRENCY // 2)))))
+
+# GAQL result cache: entry lifetime, LRU size, per-entry row cap and optional disk directory
+GAQL_CACHE_TTL_SECONDS = int(os.getenv("GOOGLE_ADS_CACHE_TTL", "600"))
+GAQL_CACHE_MAX_ENTRIES = int(os.getenv("GOOGLE_ADS_CACHE_MAX_ENTRIES", "128"))
+GAQL_CACHE_MAX_ROWS = int(os.getenv("GOOGLE_ADS_CACHE_MAX_ROWS", "50000"))
+GAQL_CACHE_DIR = os.getenv("GOOGLE_ADS_CACHE_DIR", "").strip() or None
+
+# Identical in-flight queries can be joined until the shared stream has produced this many rows
+GAQL_SINGLE_FLIGHT_REPLAY_ROWS = int(os.getenv("GOOGLE_ADS_SINGLE_FLIGHT_REPLAY_ROWS", "1000"))
+# A subscriber this many rows behind the fastest one is detached and continues on its own request
+GAQL_SINGLE_FLIGHT_MAX_LAG_ROWS = int(os.getenv("GOOGLE_ADS_SINGLE_FLIGHT_MAX_LAG_ROWS", "2000"))
+
+# Cross-account responses list at most this many accounts per header field
+# (slowest, failed, truncated) and shorten each account error to this many characters
+FANOUT_HEADER_SAMPLE = 10
+FANOUT_ERROR_CHARS = 200
+
+# How often the cached MCC account hierarchy is rebuilt in the background
+ACCOUNT_REFRESH_INTERVAL_SECONDS = int(os.getenv("GOOGLE_ADS_ACCOUNT_REFRESH_INTERVAL", "1800"))
+
+# SQLite file holding stored GAQL results; defaults to a per-process file in the temp directory
+GAQL_STORE_PATH = os.getenv("GOOGLE_ADS_STORE_PATH", "").strip() or os.path.join(
+    tempfile.gettempdir(), f"google_ads_mcp_{os.getpid()}.sqlite"
+)
+STORE_INSERT_BATCH_SIZE = 5000
+
+# Paged run_google_ads_gaql results: idle lifetime of a cursor and how many stay open
+GAQL_CURSOR_TTL_SECONDS = int(os.getenv("GOOGLE_ADS_CURSOR_TTL", "300"))
+GAQL_MAX_CURSORS = int(os.getenv("GOOGLE_ADS_MAX_CURSORS", "32"))
+
+# Persistent SQLite file for incrementally synced daily metrics
+METRICS_SYNC_PATH = os.getenv("GOOGLE_ADS_SYNC_PATH", "").strip() or os.path.join(
+    os.path.expanduser("~"), ".cache", "google-ads-mcp", "metrics.sqlite"
+)
+
+# Optional metrics export: Prometheus text file (rewritten at most every flush interval) and JSONL call log
+METRICS_PROMETHEUS_PATH = os.getenv("GOOGLE_ADS_METRICS_PROMETHEUS_FILE", "").strip() or None
+METRICS_JSONL_PATH = os.getenv("GOOGLE_ADS_METRICS_JSONL", "").strip() or None
+METRICS_FLUSH_INTERVAL_SECONDS = float(os.getenv("GOOGLE_ADS_METRICS_FLUSH_INTERVAL", "10"))
+
+# GoogleAdsFieldService catalog used for offline GAQL validation, cached per API version
+GAQL_CATALOG_DIR = os.getenv("GOOGLE_ADS_CATALOG_DIR", "").strip() or os.path.join(
+    os.path.expanduser("~"), ".cache", "google-ads-mcp"
+)
+GAQL_CATALOG_MAX_AGE_SECONDS = int(os.getenv("GOOGLE_ADS_CATALOG_MAX_AGE", str(7 * 24 * 3600)))
+
+# Load the Ads SDK in a background thread once the MCP client has connected
+GOOGLE_ADS_PREWARM = os.getenv("GOOGLE_ADS_PREWARM", "1").strip().lower() not in ("0", "false", "no", "")
+
+
+# ============================================================================
+# SDK LOADING
+# ============================================================================
+
+@functools.lru_cache(maxsize=None)
+def googleads_client_module():
+    """Import and return google.ads.googleads.client (deferred: it is slow to import)."""
+    from google.ads.googleads import client as module
+    return module
+
+
+@functools.lru_cache(maxsize=None)
+def google_ads_api_version() -> Optional[str]:
     """
     Return a supported Google Ads API version or None to use the client's default.
     Falls back automatically if the requested version isn't bundled with the SDK.
+    Resolved on first use, since checking it imports the SDK.
     """
     requested = os.getenv("GOOGLE_ADS_API_VERSION", "").strip()
     if not requested:
         return None
 
-    valid_versions = getattr(googleads_client_module, "_VALID_API_VERSIONS", None)
+    module = googleads_client_module()
+    valid_versions = getattr(module, "_VALID_API_VERSIONS", None)
     if valid_versions and requested not in valid_versions:
-        default_version = getattr(googleads_client_module, "_DEFAULT_VERSION", "unspecified")
+        default_version = getattr(module, "_DEFAULT_VERSION", "unspecified")
         warnings.warn(
             f"GOOGLE_ADS_API_VERSION '{requested}' is not available; "
             f"falling back to client default '{default_version}'.",
@@ -62,22 +171,468 @@ def _resolve_google_ads_version() -> Optional[str]:
     return requested
 
 
-GOOGLE_ADS_API_VERSION = _resolve_google_ads_version()
+def __getattr__(name: str) -> Any:
+    # Names that used to be bound at import time and now load the SDK on access
+    if name == "GoogleAdsClient":
+        return googleads_client_module().GoogleAdsClient
+    if name == "PooledGoogleAdsClient":
+        return pooled_client_class()
+    if name == "GOOGLE_ADS_API_VERSION":
+        return google_ads_api_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Initialize FastMCP server
 mcp = FastMCP("google_ads_mcp")
 
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+# Histogram bucket upper bounds per metric family
+METRIC_BUCKETS: Dict[str, Tuple[float, ...]] = {
+    "duration_seconds": (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    "rows": (1, 10, 100, 1000, 10_000, 100_000, 1_000_000),
+    "response_bytes": (1000, 5000, 10_000, 25_000, 50_000, 100_000, 1_000_000),
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram with count, sum, min and max."""
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        index = 0
+        while index < len(self.bounds) and value > self.bounds[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating within its bucket."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= target and bucket_count:
+                low = self.bounds[index - 1] if index else (self.min or 0.0)
+                high = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = low + (high - low) * (target - seen) / bucket_count
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, 6)
+
+        return {
+            "count": self.count,
+            "sum": rounded(self.total),
+            "mean": rounded(self.total / self.count) if self.count else None,
+            "min": rounded(self.min),
+            "p50": rounded(self.quantile(0.5)),
+            "p95": rounded(self.quantile(0.95)),
+            "p99": rounded(self.quantile(0.99)),
+            "max": rounded(self.max)
+        }
+
+
+class ServerMetrics:
+    """
+    Latency, row and response size histograms for tools and pipeline stages.
+
+    Stages (client setup, OAuth refresh, GAQL API time, row serialization,
+    JSON/markdown encoding) and whole tool calls are recorded with a label
+    naming them. Optionally the histograms are written to a Prometheus text
+    file and every tool call appended to a JSONL log.
+    """
+
+    def __init__(
+        self,
+        prometheus_path: Optional[str] = METRICS_PROMETHEUS_PATH,
+        jsonl_path: Optional[str] = METRICS_JSONL_PATH,
+        flush_interval_seconds: float = METRICS_FLUSH_INTERVAL_SECONDS
+    ):
+        self.prometheus_path = prometheus_path
+        self.jsonl_path = jsonl_path
+        self.flush_interval_seconds = flush_interval_seconds
+        self.started_at = time.time()
+        self._histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self._tool_calls: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def observe(self, family: str, value: float, label: str, name: str) -> None:
+        """Record one observation, e.g. observe("rows", 120, "stage", "gaql_api")."""
+        key = (family, label, name)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(METRIC_BUCKETS[family])
+            histogram.observe(value)
+
+    @contextlib.contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time a block as a pipeline stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("duration_seconds", time.perf_counter() - start, "stage", stage)
+
+    def record_tool_call(self, tool: str, seconds: float, response: Any) -> None:
+        """Record a finished tool call and export it if configured."""
+        response_bytes = len(response.encode("utf-8")) if isinstance(response, str) else 0
+        error = not isinstance(response, str) or response.startswith("Error")
+        self.observe("duration_seconds", seconds, "tool", tool)
+        self.observe("response_bytes", response_bytes, "tool", tool)
+        with self._lock:
+            calls = self._tool_calls.setdefault(tool, {"calls": 0, "errors": 0})
+            calls["calls"] += 1
+            calls["errors"] += int(error)
+
+        if self.jsonl_path:
+            self._append_jsonl({
+                "ts": round(time.time(), 3),
+                "tool": tool,
+                "seconds": round(seconds, 6),
+                "response_bytes": response_bytes,
+                "error": error
+            })
+        if self.prometheus_path and time.time() - self._last_flush >= self.flush_interval_seconds:
+            self.write_prometheus()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every histogram summary and tool call counter."""
+        with self._lock:
+            histograms = {key: histogram.summary() for key, histogram in self._histograms.items()}
+            tool_calls = {tool: dict(calls) for tool, calls in self._tool_calls.items()}
+        snapshot: Dict[str, Any] = {
+            "uptime_seconds": round(time.time() - self.started_at),
+            "tool_calls": tool_calls,
+            "tools": {},
+            "stages": {}
+        }
+        for (family, label, name), summary in sorted(histograms.items()):
+            section = snapshot["tools" if label == "tool" else "stages"]
+            section.setdefault(name, {})[family] = summary
+        return snapshot
+
+    def prometheus_text(self) -> str:
+        """Render the histograms in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(
+                (key, list(histogram.counts), histogram.total, histogram.count)
+                for key, histogram in self._histograms.items()
+            )
+            tool_calls = sorted((tool, dict(calls)) for tool, calls in self._tool_calls.items())
+
+        lines = []
+        families_seen = set()
+        for (family, label, name), counts, total, count in items:
+            metric = f"google_ads_mcp_{label}_{family}"
+            if metric not in families_seen:
+                families_seen.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(METRIC_BUCKETS[family] + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{metric}_bucket{{{label}="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{{label}="{name}"}} {total}')
+            lines.append(f'{metric}_count{{{label}="{name}"}} {count}')
+        if tool_calls:
+            lines.append("# TYPE google_ads_mcp_tool_errors_total counter")
+            for tool, calls in tool_calls:
+                lines.append(f'google_ads_mcp_tool_errors_total{{tool="{tool}"}} {calls["errors"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self) -> None:
+        """Atomically rewrite the Prometheus text file (best-effort)."""
+        if not self.prometheus_path:
+            return
+        self._last_flush = time.time()
+        directory = os.path.dirname(self.prometheus_path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(self.prometheus_text())
+            os.replace(temp_path, self.prometheus_path)
+        except OSError:
+            pass
+
+    def reset(self) -> None:
+        """Drop all recorded data."""
+        with self._lock:
+            self._histograms.clear()
+            self._tool_calls.clear()
+        self.started_at = time.time()
+
+    def _append_jsonl(self, event: Dict[str, Any]) -> None:
+        try:
+            with self._lock, open(self.jsonl_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(event) + "\n")
+        except OSError:
+            pass
+
+
+server_metrics = ServerMetrics()
+atexit.register(server_metrics.write_prometheus)
+
+
+def instrumented(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Record latency and response size for every call of an async tool."""
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await func(*args, **kwargs)
+            return response
+        finally:
+            server_metrics.record_tool_call(func.__name__, time.perf_counter() - start, response)
+
+    return wrapper
+
+
 # ============================================================================
 # SHARED UTILITIES
 # ============================================================================
 
-def get_google_ads_client(customer_id: Optional[str] = None) -> GoogleAdsClient:
+@functools.lru_cache(maxsize=None)
+def pooled_client_class() -> type:
+    """Return PooledGoogleAdsClient, defining it on first use (it subclasses the SDK client)."""
+    module = googleads_client_module()
+
+    class PooledGoogleAdsClient(module.GoogleAdsClient):
+        """
+        GoogleAdsClient that reuses service clients (and their gRPC channels).
+
+        The stock client opens a new channel on every get_service() call; pooled
+        clients memoize services by name and version so repeated tool calls share
+        a single channel per service.
+        """
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._services: Dict[Tuple[str, str], Any] = {}
+            self._services_lock = threading.Lock()
+
+        def get_service(self, name, version=module._DEFAULT_VERSION, interceptors=None):
+            # Custom interceptors produce a distinct channel, so bypass the cache
+            if interceptors:
+                return super().get_service(name, version=version, interceptors=interceptors)
+
+            key = (name, self.version or version)
+            with self._services_lock:
+                service = self._services.get(key)
+                if service is None:
+                    service = super().get_service(name, version=version)
+                    self._services[key] = service
+                return service
+
+    PooledGoogleAdsClient.__qualname__ = "PooledGoogleAdsClient"
+    return PooledGoogleAdsClient
+
+
+def prewarm_google_ads_sdk() -> None:
     """
-    Initialize Google Ads API client with OAuth 2.0 credentials.
-    
+    Import the Ads SDK and build the pooled client ahead of the first tool call.
+
+    Loads the client module, the GoogleAdsService stubs and message types for
+    the configured API version and protobuf's json_format. When credentials
+    are configured, the pooled client and its GoogleAdsService are created
+    too. Failures are only logged at debug level: the first tool call reports them.
+    """
+    try:
+        with server_metrics.span("prewarm"):
+            module = googleads_client_module()
+            version = google_ads_api_version() or module._DEFAULT_VERSION
+            importlib.import_module(f"google.ads.googleads.{version}.services.services.google_ads_service")
+            importlib.import_module("google.protobuf.json_format")
+            if os.getenv("GOOGLE_ADS_REFRESH_TOKEN"):
+                get_google_ads_client().get_service("GoogleAdsService")
+    except Exception:
+        logger.debug("Google Ads SDK prewarm failed", exc_info=True)
+
+
+_prewarm_started = threading.Event()
+
+
+def start_prewarm() -> None:
+    """Run prewarm_google_ads_sdk() once in a daemon thread."""
+    if _prewarm_started.is_set():
+        return
+    _prewarm_started.set()
+    threading.Thread(target=prewarm_google_ads_sdk, name="google-ads-prewarm", daemon=True).start()
+
+
+def install_prewarm_hook(server: FastMCP) -> None:
+    """
+    Start the prewarm once the client sends notifications/initialized.
+
+    Waiting for the end of the handshake keeps the SDK import from competing
+    with the initialize response for the interpreter. Falls back to starting
+    right away when the server doesn't expose its notification handlers.
+    """
+    handlers = getattr(getattr(server, "_mcp_server", None), "notification_handlers", None)
+    if handlers is None:
+        start_prewarm()
+        return
+
+    from mcp.types import InitializedNotification
+    previous = handlers.get(InitializedNotification)
+
+    async def on_initialized(notification: Any) -> None:
+        start_prewarm()
+        if previous is not None:
+            await previous(notification)
+
+    handlers[InitializedNotification] = on_initialized
+
+
+class GoogleAdsClientPool:
+    """
+    Process-wide pool of GoogleAdsClient instances.
+
+    Clients are keyed by (login_customer_id, API version) so every tool call
+    for the same MCC shares credentials and gRPC channels. A daemon thread
+    refreshes OAuth access tokens before they expire, keeping the token
+    round trip off the request path.
+    """
+
+    def __init__(
+        self,
+        refresh_margin_seconds: int = TOKEN_REFRESH_MARGIN_SECONDS,
+        refresh_interval_seconds: int = TOKEN_REFRESH_INTERVAL_SECONDS,
+        background_refresh: bool = True
+    ):
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.background_refresh = background_refresh
+        self._clients: Dict[Tuple[str, Optional[str]], "GoogleAdsClient"] = {}
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.token_refreshes = 0
+        self.token_refresh_errors = 0
+
+    def get_client(
+        self,
+        login_customer_id: str,
+        version: Optional[str],
+        factory: Callable[[], "GoogleAdsClient"]
+    ) -> "GoogleAdsClient":
+        """Return the pooled client for the key, building it with factory on a miss."""
+        key = (login_customer_id, version)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+
+            self.misses += 1
+            client = factory()
+            self._clients[key] = client
+            self._ensure_refresher()
+            return client
+
+    def refresh_expiring_tokens(self) -> None:
+        """Refresh access tokens that are missing or within the refresh margin."""
+        with self._lock:
+            clients = list(self._clients.values())
+
+        for client in clients:
+            credentials = client.credentials
+            if not self._needs_refresh(credentials):
+                continue
+            try:
+                from google.auth.transport.requests import Request as GoogleAuthRequest
+                with server_metrics.span("oauth_refresh"):
+                    credentials.refresh(GoogleAuthRequest())
+                self.token_refreshes += 1
+            except Exception:
+                # The gRPC auth plugin retries on the request path and surfaces the error
+                self.token_refresh_errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool counters for diagnostics."""
+        lookups = self.hits + self.misses
+        return {
+            "clients": len(self._clients),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "token_refreshes": self.token_refreshes,
+            "token_refresh_errors": self.token_refresh_errors
+        }
+
+    def clear(self) -> None:
+        """Drop all pooled clients and stop the background refresher."""
+        self._stop_event.set()
+        with self._lock:
+            self._clients.clear()
+            refresher = self._refresher
+            self._refresher = None
+        if refresher is not None and refresher is not threading.current_thread():
+            refresher.join(timeout=1)
+        self._stop_event = threading.Event()
+
+    def _needs_refresh(self, credentials: Any) -> bool:
+        if not getattr(credentials, "token", None):
+            return True
+        expiry = getattr(credentials, "expiry", None)
+        if expiry is None:
+            return False
+        # google-auth stores expiry as a naive UTC datetime
+        remaining = expiry.replace(tzinfo=timezone.utc).timestamp() - time.time()
+        return remaining <= self.refresh_margin_seconds
+
+    def _ensure_refresher(self) -> None:
+        if not self.background_refresh or self._refresher is not None:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop,
+            name="google-ads-token-refresher",
+            daemon=True
+        )
+        self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        stop_event = self._stop_event
+        while True:
+            self.refresh_expiring_tokens()
+            if stop_event.wait(self.refresh_interval_seconds):
+                return
+
+
+client_pool = GoogleAdsClientPool()
+
+
+def get_google_ads_client(customer_id: Optional[str] = None) -> "GoogleAdsClient":
+    """
+    Return a pooled Google Ads API client authenticated with OAuth 2.0.
+
+    Clients are shared per login customer ID and API version, so repeated
+    tool calls reuse credentials, cached access tokens and gRPC channels.
+
     Args:
         customer_id: Optional customer ID to set as login_customer_id
-        
+
     Returns:
         GoogleAdsClient instance configured with OAuth 2.0
     """
@@ -97,425 +652,5596 @@ def get_google_ads_client(customer_id: Optional[str] = None) -> GoogleAdsClient:
             "- GOOGLE_ADS_CLIENT_SECRET\n"
             "- GOOGLE_ADS_REFRESH_TOKEN"
         )
-    
-    # Create credentials from OAuth 2.0 refresh token
-    credentials = Credentials(
-        None,
-        refresh_token=refresh_token,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=client_id,
-        client_secret=client_secret,
-        scopes=['https://www.googleapis.com/auth/adwords']
-    )
-    
-    # Initialize Google Ads client
-    client = GoogleAdsClient(
-        credentials=credentials,
-        developer_token=developer_token,
-        login_customer_id=login_customer_id,
-        version=GOOGLE_ADS_API_VERSION
-    )
-    
-    return client
+
+    version = google_ads_api_version()
+
+    def build_client() -> "GoogleAdsClient":
+        from google.oauth2.credentials import Credentials
+
+        # Create credentials from OAuth 2.0 refresh token
+        credentials = Credentials(
+            None,
+            refresh_token=refresh_token,
+            token_uri="https://oauth2.googleapis.com/token",
+            client_id=client_id,
+            client_secret=client_secret,
+            scopes=['https://www.googleapis.com/auth/adwords']
+        )
+
+        # Initialize Google Ads client
+        return pooled_client_class()(
+            credentials=credentials,
+            developer_token=developer_token,
+            login_customer_id=login_customer_id,
+            version=version
+        )
+
+    with server_metrics.span("get_client"):
+        return client_pool.get_client(login_customer_id, version, build_client)
+
+
+# ============================================================================
+# REQUEST SCHEDULER
+# ============================================================================
+
+class RequestPriority(str, Enum):
+    """Scheduling lane for a Google Ads API call."""
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+# gRPC statuses worth retrying; anything else (bad query, permissions) fails at once
+RETRYABLE_STATUSES = frozenset({
+    "RESOURCE_EXHAUSTED", "UNAVAILABLE", "INTERNAL", "DEADLINE_EXCEEDED", "ABORTED"
+})
+
+
+def classify_api_error(error: BaseException) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Inspect a Google Ads API error.
+
+    Works on GoogleAdsException (gRPC status plus the GoogleAdsFailure
+    details) and bare grpc.RpcError alike.
+
+    Returns:
+        (status, retry_after) - the gRPC status name when the error is
+        retryable (else None) and the server's retry delay hint in seconds
+    """
+    rpc_error = getattr(error, "error", error)
+    code = getattr(rpc_error, "code", None)
+    status = None
+    if callable(code):
+        try:
+            status = getattr(code(), "name", None)
+        except Exception:
+            status = None
+
+    retry_after = None
+    failure = getattr(error, "failure", None)
+    for failure_error in getattr(failure, "errors", None) or ():
+        quota_error = getattr(getattr(failure_error, "error_code", None), "quota_error", None)
+        if quota_error and get_enum_name(quota_error) in ("RESOURCE_EXHAUSTED", "RESOURCE_TEMPORARILY_EXHAUSTED"):
+            status = "RESOURCE_EXHAUSTED"
+        quota_details = getattr(getattr(failure_error, "details", None), "quota_error_details", None)
+        delay = getattr(quota_details, "retry_delay", None)
+        if delay is not None:
+            seconds = getattr(delay, "seconds", 0) + getattr(delay, "nanos", 0) / 1e9
+            if seconds > 0:
+                retry_after = max(retry_after or 0.0, seconds)
+
+    return (status if status in RETRYABLE_STATUSES else None), retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter that hands out reservations.
+
+    reserve() always takes a token and returns how long the caller must wait
+    for it, so concurrent callers queue up in order instead of racing. A
+    rate of zero disables limiting.
+    """
+
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate = rate_per_second
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, floor: float = 0.0) -> float:
+        """
+        Take one token; return the seconds to wait before using it.
+
+        Args:
+            floor: Tokens to leave for other callers (bulk work leaves a
+                reserve so interactive calls are not starved)
+        """
+        now = time.monotonic()
+        with self._lock:
+            paused = max(0.0, self._paused_until - now)
+            if self.rate <= 0:
+                return paused
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            available = self.tokens - floor
+            self.tokens -= 1
+            wait = 0.0 if available >= 1 else (1 - available) / self.rate
+            return max(wait, paused)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for a while (the server asked us to slow down)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class GaqlScheduler:
+    """
+    Central admission control for GAQL calls.
+
+    Every call waits for a token from its developer token's bucket and its
+    customer's bucket. Bulk work (fan-outs, syncs, background refreshes)
+    leaves a reserve of developer tokens for interactive calls. Failed calls
+    with a retryable status are retried with exponential backoff and jitter,
+    honoring the server's retry delay; a RESOURCE_EXHAUSTED answer also
+    pauses that customer's bucket so concurrent callers back off together.
+    """
+
+    def __init__(
+        self,
+        developer_qps: float = GAQL_DEVELOPER_QPS,
+        customer_qps: float = GAQL_CUSTOMER_QPS,
+        max_attempts: int = GAQL_MAX_ATTEMPTS,
+        base_delay: float = 1.0,
+        max_delay: float = GAQL_MAX_RETRY_DELAY_SECONDS,
+        bulk_reserve: float = 0.25,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.developer_qps = developer_qps
+        self.customer_qps = customer_qps
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bulk_reserve = bulk_reserve
+        self._sleep = sleep
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self.requests = {priority.value: 0 for priority in RequestPriority}
+        self.throttled = 0
+        self.throttle_wait_seconds = 0.0
+        self.retries: Dict[str, int] = {}
+        self.gave_up = 0
+
+    def _bucket(self, kind: str, key: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get((kind, key))
+            if bucket is None:
+                rate = self.developer_qps if kind == "developer" else self.customer_qps
+                bucket = self._buckets[(kind, key)] = TokenBucket(rate, rate * 2)
+            return bucket
+
+    def acquire(
+        self,
+        customer_id: str,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        developer_token: str = ""
+    ) -> float:
+        """
+        Block until a call for this customer may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        developer = self._bucket("developer", developer_token)
+        floor = developer.burst * self.bulk_reserve if priority == RequestPriority.BULK else 0.0
+        wait = max(developer.reserve(floor), self._bucket("customer", customer_id).reserve())
+        with self._lock:
+            self.requests[RequestPriority(priority).value] += 1
+            if wait > 0:
+                self.throttled += 1
+                self.throttle_wait_seconds += wait
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def backoff(self, error: BaseException, attempt: int, customer_id: str) -> Optional[float]:
+        """
+        Decide whether a failed attempt should be retried and wait if so.
+
+        Args:
+            error: Exception raised by the API call
+            attempt: Number of the attempt that failed (1-based)
+            customer_id: Customer the call was for
+
+        Returns:
+            The delay slept before retrying, or None when the caller should give up
+        """
+        status, retry_after = classify_api_error(error)
+        if status is None:
+            return None
+        if attempt >= self.max_attempts or (retry_after or 0) > self.max_delay:
+            with self._lock:
+                self.gave_up += 1
+            return None
+
+        # Full jitter on the exponential step, never sooner than the server asked
+        delay = self._random.uniform(0.5, 1.0) * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = max(delay, retry_after or 0.0)
+        if status == "RESOURCE_EXHAUSTED":
+            self._bucket("customer", customer_id).pause(delay)
+        with self._lock:
+            self.retries[status] = self.retries.get(status, 0) + 1
+        self._sleep(delay)
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """Return scheduler counters for diagnostics."""
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "throttled": self.throttled,
+                "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+                "retries": dict(self.retries),
+                "gave_up": self.gave_up,
+                "developer_qps": self.developer_qps,
+                "customer_qps": self.customer_qps
+            }
+
+
+gaql_scheduler = GaqlScheduler()
+
+
+# ============================================================================
+# SINGLE-FLIGHT QUERIES
+# ============================================================================
+
+_FLIGHT_END = object()
+_FLIGHT_DETACHED = object()
+
+
+class _GaqlFlight:
+    """
+    One in-flight GAQL row stream shared by every caller that asked for it.
+
+    Rows are pulled from the source by whichever subscriber first needs the
+    next one and buffered for the others. Late joiners replay the buffer
+    from the start, so the first replay_rows rows are kept; once the stream
+    passes them the flight closes to new joiners and every append drops the
+    rows all subscribers have read, leaving only the gap between the fastest
+    and the slowest reader in memory. A reader that falls more than
+    max_lag_rows behind (e.g. an idle paged cursor) is detached, so that gap
+    stays bounded too.
+    """
+
+    def __init__(
+        self,
+        rows: Iterator[Any],
+        replay_rows: int,
+        max_lag_rows: int,
+        on_done: Callable[["_GaqlFlight"], None]
+    ):
+        self._rows = rows
+        self._replay_rows = replay_rows
+        self._max_lag_rows = max_lag_rows
+        self._on_done = on_done
+        self._cond = threading.Condition()
+        self._buffer: List[Any] = []
+        self._offset = 0
+        self._positions: Dict[int, int] = {}
+        self._detached = set()
+        self._next_token = 0
+        self._pulling = False
+        self.joinable = True
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+    def join(self) -> Optional[int]:
+        """Register a subscriber; returns its token, or None if the flight can't be joined."""
+        with self._cond:
+            if not self.joinable or self.done:
+                return None
+            token = self._next_token
+            self._next_token += 1
+            self._positions[token] = 0
+            return token
+
+    def get(self, token: int, index: int) -> Any:
+        """Return row number index (waiting for it if needed), _FLIGHT_END or _FLIGHT_DETACHED."""
+        while True:
+            with self._cond:
+                if token in self._detached:
+                    return _FLIGHT_DETACHED
+                self._positions[token] = index
+                while True:
+                    if index < self._offset + len(self._buffer):
+                        return self._buffer[index - self._offset]
+                    if self.done:
+                        if self.error is not None:
+                            raise self.error
+                        return _FLIGHT_END
+                    if not self._pulling:
+                        self._pulling = True
+                        break
+                    self._cond.wait()
+
+            # Pull outside the lock so readers of buffered rows aren't blocked by the API
+            row, error, finished = None, None, False
+            try:
+                row = next(self._rows)
+            except StopIteration:
+                finished = True
+            except Exception as e:
+                error, finished = e, True
+
+            with self._cond:
+                self._pulling = False
+                if finished:
+                    self.done = True
+                    self.joinable = False
+                    self.error = error
+                else:
+                    self._buffer.append(row)
+                    self._trim()
+                self._cond.notify_all()
+            if finished:
+                self._on_done(self)
+
+    def leave(self, token: int) -> None:
+        """Unregister a subscriber; the last one out cancels an unfinished stream."""
+        with self._cond:
+            self._positions.pop(token, None)
+            self._detached.discard(token)
+            abandon = not self._positions and not self.done
+            if abandon:
+                self.done = True
+                self.joinable = False
+            else:
+                self._trim()
+        if abandon:
+            close = getattr(self._rows, "close", None)
+            if callable(close):
+                close()
+            self._on_done(self)
+
+    def _trim(self) -> None:
+        if self.joinable and self._offset + len(self._buffer) <= self._replay_rows:
+            return
+        self.joinable = False
+        if not self._positions:
+            return
+        end = self._offset + len(self._buffer)
+        for token, position in list(self._positions.items()):
+            if end - position > self._max_lag_rows:
+                del self._positions[token]
+                self._detached.add(token)
+        if not self._positions:
+            return
+        low = min(self._positions.values())
+        if low > self._offset:
+            del self._buffer[:low - self._offset]
+            self._offset = low
+
+
+class GaqlSingleFlight:
+    """
+    Coalesces identical concurrent GAQL queries into one API call.
+
+    Callers asking for the same (customer ID, normalized query) while a
+    stream for it is still running subscribe to that stream instead of
+    issuing their own request; each still receives every row from the start.
+    A caller detached for lagging behind re-issues the query on its own and
+    skips the rows it already read (relying on the API's stable row order).
+    """
+
+    def __init__(
+        self,
+        replay_rows: int = GAQL_SINGLE_FLIGHT_REPLAY_ROWS,
+        max_lag_rows: int = GAQL_SINGLE_FLIGHT_MAX_LAG_ROWS
+    ):
+        self.replay_rows = replay_rows
+        self.max_lag_rows = max_lag_rows
+        self._flights: Dict[str, _GaqlFlight] = {}
+        self._lock = threading.Lock()
+        self.flights = 0
+        self.deduplicated = 0
+        self.detached = 0
+
+    def iter_rows(self, key: str, open_rows: Callable[[], Iterator[Any]]) -> Iterator[Any]:
+        """
+        Yield the rows for key, sharing an in-flight stream when there is one.
+
+        The flight is joined on the first next() call, so a generator that is
+        closed without being read never holds a subscription.
+
+        Args:
+            key: Coalescing key, normally gaql_cache_key(customer_id, query)
+            open_rows: Starts the underlying row stream when no flight is running
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            token = flight.join() if flight is not None else None
+            if token is None:
+                flight = _GaqlFlight(
+                    open_rows(), self.replay_rows, self.max_lag_rows, functools.partial(self._finish, key)
+                )
+                token = flight.join()
+                self._flights[key] = flight
+                self.flights += 1
+            else:
+                self.deduplicated += 1
+
+        index = 0
+        try:
+            while True:
+                row = flight.get(token, index)
+                if row is _FLIGHT_END:
+                    return
+                if row is _FLIGHT_DETACHED:
+                    break
+                index += 1
+                yield row
+        finally:
+            flight.leave(token)
+
+        with self._lock:
+            self.detached += 1
+        rows = open_rows()
+        try:
+            for position, row in enumerate(rows):
+                if position >= index:
+                    yield row
+        finally:
+            close = getattr(rows, "close", None)
+            if callable(close):
+                close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return coalescing counters for diagnostics."""
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "flights": self.flights,
+                "deduplicated": self.deduplicated,
+                "detached": self.detached
+            }
+
+    def _finish(self, key: str, flight: _GaqlFlight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+
+gaql_single_flight = GaqlSingleFlight()
+
+
+def iter_gaql_rows(
+    client: "GoogleAdsClient",
+    customer_id: str,
+    query: str,
+    use_streaming: bool = True,
+    priority: RequestPriority = RequestPriority.INTERACTIVE
+) -> Iterator[Any]:
+    """
+    Yield GAQL result rows lazily as the API returns them.
+
+    Rows are never collected into a list, so consumers can stop early.
+    Closing the generator before it is exhausted cancels the underlying
+    SearchStream call instead of draining the remaining batches.
+
+    Each attempt is admitted by gaql_scheduler. Quota and transient errors
+    are retried with backoff as long as no row has been yielded yet; after
+    that a failure is raised, since the consumer already holds partial data.
+
+    Args:
+        client: GoogleAdsClient instance
+        customer_id: Customer ID to query (format: 1234567890, no dashes)
+        query: GAQL query string
+        use_streaming: Whether to use SearchStream (default) or Search
+        priority: Scheduling lane (interactive calls are favored over bulk)
+
+    Yields:
+        GoogleAdsRow objects
+    """
+    ga_service = client.get_service("GoogleAdsService")
+    developer_token = getattr(client, "developer_token", "")
+    developer_token = developer_token if isinstance(developer_token, str) else ""
+    response = None
+    exhausted = False
+    attempt = 0
+    # API time is the wall time minus time spent in the consumer and waiting for the scheduler
+    started = time.perf_counter()
+    paused_at: Optional[float] = None
+    consumer_seconds = 0.0
+    wait_seconds = 0.0
+    rows_read = 0
+
+    try:
+        while True:
+            attempt += 1
+            wait_seconds += gaql_scheduler.acquire(customer_id, priority, developer_token)
+            try:
+                if use_streaming:
+                    response = ga_service.search_stream(customer_id=customer_id, query=query)
+                    rows = (row for batch in response for row in batch.results)
+                else:
+                    # Use non-streaming search; the pager fetches further pages on demand
+                    response = ga_service.search(customer_id=customer_id, query=query)
+                    rows = response
+                for row in rows:
+                    rows_read += 1
+                    if rows_read == 1:
+                        server_metrics.observe(
+                            "duration_seconds", time.perf_counter() - started - wait_seconds,
+                            "stage", "gaql_first_row"
+                        )
+                    paused_at = time.perf_counter()
+                    yield row
+                    consumer_seconds += time.perf_counter() - paused_at
+                    paused_at = None
+                exhausted = True
+                return
+            except Exception as e:
+                delay = None if rows_read else gaql_scheduler.backoff(e, attempt, customer_id)
+                if delay is None:
+                    raise
+                wait_seconds += delay
+    except Exception as e:
+        retried = f" (gave up after {attempt} attempts)" if attempt > 1 else ""
+        raise Exception(f"Error executing GAQL query: {str(e)}{retried}\nQuery: {query}")
+    finally:
+        cancel = getattr(response, "cancel", None)
+        if not exhausted and callable(cancel):
+            cancel()
+        now = time.perf_counter()
+        if paused_at is not None:
+            consumer_seconds += now - paused_at
+        server_metrics.observe("duration_seconds", now - started - consumer_seconds - wait_seconds, "stage", "gaql_api")
+        server_metrics.observe("rows", rows_read, "stage", "gaql_api")
+        if wait_seconds:
+            server_metrics.observe("duration_seconds", wait_seconds, "stage", "scheduler_wait")
 
 
 def execute_gaql_query(
-    client: GoogleAdsClient,
+    client: "GoogleAdsClient",
     customer_id: str,
     query: str,
     use_streaming: bool = True,
-    page_size: Optional[int] = None
+    priority: RequestPriority = RequestPriority.INTERACTIVE
 ) -> List[Any]:
     """
     Execute a GAQL query and return results.
 
+    Prefer iter_gaql_rows() for large result sets; this collects every row.
+    Identical queries already in flight are shared (see GaqlSingleFlight).
+
     Args:
         client: GoogleAdsClient instance
         customer_id: Customer ID to query (format: 1234567890, no dashes)
         query: GAQL query string
         use_streaming: Whether to use SearchStream (default) or Search
-        page_size: Deprecated - not supported by Google Ads API. The API handles pagination internally.
+        priority: Scheduling lane (see GaqlScheduler)
 
     Returns:
         List of GoogleAdsRow objects
     """
-    ga_service = client.get_service("GoogleAdsService")
+    return list(gaql_single_flight.iter_rows(
+        gaql_cache_key(customer_id, query),
+        lambda: iter_gaql_rows(client, customer_id, query, use_streaming=use_streaming, priority=priority)
+    ))
 
-    try:
-        if use_streaming:
-            response = ga_service.search_stream(customer_id=customer_id, query=query)
-            results = []
-            for batch in response:
-                results.extend(batch.results)
-            return results
-        else:
-            # Use non-streaming search
-            # Note: Google Ads API does not support page_size parameter in the search method
-            # Pagination is handled internally by the API
-            response = ga_service.search(customer_id=customer_id, query=query)
-            return list(response)
-    except Exception as e:
-        raise Exception(f"Error executing GAQL query: {str(e)}\nQuery: {query}")
 
+def iter_serialized_gaql_rows(
+    client: "GoogleAdsClient",
+    customer_id: str,
+    query: str,
+    use_streaming: bool = True,
+    use_cache: bool = True,
+    as_values: bool = False,
+    priority: RequestPriority = RequestPriority.INTERACTIVE,
+    record: bool = True
+) -> Iterator[Any]:
+    """
+    Yield GAQL rows serialized to dictionaries, one at a time.
+
+    Rows are converted with a GaqlRowExtractor compiled from the query's
+    SELECT clause, falling back to serialize_gaql_row() when the fields
+    can't be resolved. The choice is made on the first row and kept; an
+    extractor failure on a later row is raised rather than switching formats
+    mid-result. With as_values=True each row is instead a flat tuple
+    in SELECT order (no fallback; the SELECT clause must resolve). Closing
+    this generator closes (and cancels) the underlying row stream.
 
-def format_micros(micros: int) -> float:
-    """Convert micros (1/1,000,000) to standard currency format."""
-    return round(micros / 1_000_000, 2)
+    Results pass through result_cache: a fresh cached entry is replayed
+    without calling the API, and rows read from the API are stored for the
+    next caller. A partially read result is cached as a prefix; reading
+    past it re-issues the query and skips the rows already served (so it
+    relies on the API returning rows in the same order), and the extended
+    entry keeps the prefix's original expiry. With record=False, rows from
+    the API are not kept for the cache, so callers that fold a large scan
+    into a summary don't also hold a copy of it. On a
+    miss, a concurrent identical query that is already running is joined
+    instead of sending another request (see GaqlSingleFlight).
+    Yielded rows may be shared with the cache and must be treated as read-only.
+
+    Args:
+        client: GoogleAdsClient instance
+        customer_id: Customer ID to query (format: 1234567890, no dashes)
+        query: GAQL query string
+        use_streaming: Whether to use SearchStream (default) or Search
+        use_cache: Read from the cache; when False the API is always called
+            and the fresh result replaces any cached entry
+        as_values: Yield flat value tuples instead of nested dictionaries
+        priority: Scheduling lane for API calls (see GaqlScheduler)
+        record: Store rows read from the API in result_cache (a cached
+            entry is still replayed when False)
+
+    Raises:
+        ValueError: If as_values is set and the SELECT fields can't be resolved
+    """
+    extractor = GaqlRowExtractor.for_query(query)
+    if as_values and extractor is None:
+        raise ValueError("Columnar rows need an explicit SELECT field list.")
 
+    flight_key = gaql_cache_key(customer_id, query)
+    cache_key = flight_key + ("|values" if as_values else "")
+    cached = result_cache.lookup(cache_key) if use_cache else None
+    recorded: Optional[List[dict]] = [] if record else None
+    expires_at: Optional[float] = None
+    skip = 0
 
-def format_gaql_value(value: Any) -> str:
+    if cached is not None:
+        expires_at, cached_rows, complete = cached
+        for serialized in cached_rows:
+            yield serialized
+        if complete:
+            return
+        # The prefix didn't cover this read; the rest comes from the API
+        result_cache.record_miss()
+        skip = len(cached_rows)
+        if recorded is not None:
+            recorded = list(cached_rows)
+
+    rows = gaql_single_flight.iter_rows(
+        flight_key,
+        lambda: iter_gaql_rows(client, customer_id, query, use_streaming=use_streaming, priority=priority)
+    )
+    exhausted = False
+    serialize_seconds = 0.0
+    serialized_rows = 0
+    try:
+        for row in rows:
+            if skip:
+                skip -= 1
+                continue
+
+            started = time.perf_counter()
+            serialized = None
+            if as_values:
+                serialized = extractor.values(row)
+            elif extractor is not None:
+                if serialized_rows:
+                    serialized = extractor(row)
+                else:
+                    # Choose the serializer on the first row so one result never mixes formats
+                    try:
+                        serialized = extractor(row)
+                    except (ValueError, AttributeError):
+                        extractor = None
+            if serialized is None:
+                serialized = serialize_gaql_row(row)
+            serialize_seconds += time.perf_counter() - started
+            serialized_rows += 1
+
+            if recorded is not None:
+                recorded.append(serialized)
+                if len(recorded) > GAQL_CACHE_MAX_ROWS:
+                    # Too large to keep in memory; stop recording
+                    recorded = None
+            yield serialized
+        exhausted = True
+    finally:
+        rows.close()
+        if recorded is not None and (recorded or exhausted):
+            result_cache.put(cache_key, recorded, complete=exhausted, expires_at=expires_at)
+        server_metrics.observe("duration_seconds", serialize_seconds, "stage", "serialize")
+        server_metrics.observe("rows", serialized_rows, "stage", "serialize")
+
+
+def summarize_account_error(error: str, query: str) -> str:
+    """Shorten a per-account error for a response header, without the query it repeats."""
+    error = " ".join(error.replace(query, "<query>").split())
+    return error if len(error) <= FANOUT_ERROR_CHARS else error[:FANOUT_ERROR_CHARS - 3] + "..."
+
+
+class ResponseBudget:
+    """
+    Characters left in one response, shared by concurrent row readers.
+
+    Each kept row is charged the length build_json_response() will emit for
+    it as a merged row (indented, with a leading customer_id column), so
+    readers feeding the same response stop once it is full instead of
+    reading rows that would be dropped when the response is built.
+    """
+
+    def __init__(self, chars: int = CHARACTER_LIMIT):
+        self.remaining = chars
+        self._lock = threading.Lock()
+
+    def charge(self, customer_id: str, row: Dict[str, Any]) -> bool:
+        """Count a row of customer_id against the budget; False once the budget is spent."""
+        # One more character for the comma between rows
+        size = len(_json_row_text({"customer_id": customer_id, **row})) + 1
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= size
+            return True
+
+
+def collect_gaql_rows(
+    client: "GoogleAdsClient",
+    customer_id: str,
+    query: str,
+    max_rows: int,
+    use_cache: bool = True,
+    priority: RequestPriority = RequestPriority.INTERACTIVE,
+    budget: Optional[ResponseBudget] = None
+) -> Tuple[List[dict], bool]:
+    """
+    Read up to max_rows serialized rows for a query.
+
+    Args:
+        budget: Shared response budget; reading stops once it is spent
+
+    Returns:
+        (rows, more_rows_available) - the stream is cancelled once the cap
+        or the budget is hit
+    """
+    collected: List[dict] = []
+    rows = iter_serialized_gaql_rows(client, customer_id, query, use_cache=use_cache, priority=priority)
+    try:
+        for row in rows:
+            if len(collected) >= max_rows or (budget is not None and not budget.charge(customer_id, row)):
+                return collected, True
+            collected.append(row)
+    finally:
+        rows.close()
+    return collected, False
+
+
+def get_mcc_id() -> str:
+    """Return the configured MCC (login customer) ID without dashes."""
+    mcc_id = os.getenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID")
+    if not mcc_id:
+        raise ValueError("MCC account ID not configured. Set GOOGLE_ADS_LOGIN_CUSTOMER_ID environment variable.")
+    return format_customer_id(mcc_id)
+
+
+def fetch_client_accounts(client: "GoogleAdsClient", mcc_id: str) -> List[Dict[str, Any]]:
+    """
+    Return the enabled, non-manager client accounts anywhere under an MCC.
+
+    Served from the cached account hierarchy (see AccountHierarchyCache).
+
+    Args:
+        client: GoogleAdsClient instance
+        mcc_id: Manager account ID (no dashes)
+
+    Returns:
+        List of account dicts (id, name, currency, timezone, status, flags, hierarchy)
+    """
+    return filter_accounts(account_hierarchy.get_accounts(client, mcc_id))
+
+
+def filter_accounts(
+    accounts: List[Dict[str, Any]],
+    include_managers: bool = False,
+    include_inactive: bool = False
+) -> List[Dict[str, Any]]:
+    """Keep enabled, non-manager accounts unless told otherwise."""
+    return [
+        account for account in accounts
+        if (include_managers or not account["is_manager"])
+        and (include_inactive or account["status"] == "ENABLED")
+    ]
+
+
+def select_accounts(
+    accounts: List[Dict[str, Any]],
+    customer_ids: Optional[List[str]] = None,
+    name_pattern: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Filter an account list by explicit IDs and/or a case-insensitive name pattern.
+
+    Args:
+        accounts: Account dicts with "id" and "name" keys
+        customer_ids: Account IDs to keep (dashes allowed); IDs not in the
+            list of accounts are still returned so they can be queried directly
+        name_pattern: Shell-style pattern matched against account names (e.g. "*Shoes*")
+
+    Returns:
+        Matching account dicts, in input order
+    """
+    selected = accounts
+    if customer_ids:
+        wanted = [format_customer_id(customer_id) for customer_id in customer_ids]
+        by_id = {account["id"]: account for account in accounts}
+        selected = [by_id.get(customer_id, {"id": customer_id, "name": None}) for customer_id in dict.fromkeys(wanted)]
+    if name_pattern:
+        pattern = name_pattern.lower()
+        selected = [
+            account for account in selected
+            if fnmatch.fnmatchcase((account.get("name") or "").lower(), pattern)
+        ]
+    return selected
+
+
+def earliest_account_date(accounts: List[Dict[str, Any]]) -> date:
+    """
+    Return the earliest current date across the accounts' time zones.
+
+    segments.date is reported in each account's own time zone, so a window
+    ending the day before this date holds only complete days for every
+    account. Accounts without a known time zone use the server's date.
+    """
+    today = date.today()
+    dates = []
+    for account in accounts:
+        try:
+            dates.append(datetime.now(ZoneInfo(account["timezone"])).date() if account.get("timezone") else today)
+        except (ZoneInfoNotFoundError, ValueError):
+            dates.append(today)
+    return min(dates, default=today)
+
+
+# Blocking Google Ads calls run here so async tools never stall the event loop
+gaql_executor = ThreadPoolExecutor(
+    max_workers=GAQL_MAX_CONCURRENCY,
+    thread_name_prefix="google-ads-gaql"
+)
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking call on the bounded GAQL thread pool.
+
+    At most GAQL_MAX_CONCURRENCY calls execute at once; additional calls queue
+    in the executor while the event loop keeps serving other requests.
+
+    Args:
+        func: Blocking callable (client setup, GAQL execution, serialization)
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(gaql_executor, functools.partial(func, *args, **kwargs))
+
+
+# Bulk work (fan-outs, syncs) runs on its own smaller pool so it can't crowd out interactive calls
+gaql_bulk_executor = ThreadPoolExecutor(
+    max_workers=GAQL_BULK_CONCURRENCY,
+    thread_name_prefix="google-ads-bulk"
+)
+
+
+async def run_bulk(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking bulk-lane call on the bulk thread pool.
+
+    Like run_blocking(), but long multi-account jobs queue here, leaving
+    gaql_executor free for interactive tool calls.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(gaql_bulk_executor, functools.partial(func, *args, **kwargs))
+
+
+async def execute_gaql_query_async(
+    client: "GoogleAdsClient",
+    customer_id: str,
+    query: str,
+    use_streaming: bool = True
+) -> List[Any]:
+    """Execute a GAQL query on the GAQL thread pool without blocking the event loop."""
+    return await run_blocking(
+        execute_gaql_query,
+        client,
+        customer_id,
+        query,
+        use_streaming=use_streaming
+    )
+
+
+def format_micros(micros: int) -> float:
+    """Convert micros (1/1,000,000) to standard currency format."""
+    return round(micros / 1_000_000, 2)
+
+
+def format_gaql_value(value: Any) -> str:
+    """
+    Format a value for safe inclusion in GAQL queries.
+
+    Handles proper escaping for strings, boolean conversion, and type validation.
+
+    Args:
+        value: The value to format
+
+    Returns:
+        str: Properly formatted GAQL value
+    """
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    elif isinstance(value, str):
+        # Escape single quotes by doubling them
+        escaped_value = value.replace("'", "''")
+        return f"'{escaped_value}'"
+    elif isinstance(value, (int, float)):
+        return str(value)
+    else:
+        # For other types, convert to string and escape
+        str_value = str(value)
+        escaped_value = str_value.replace("'", "''")
+        return f"'{escaped_value}'"
+
+
+def resolve_date_range(range_name: str, today: Optional[date] = None) -> Optional[Tuple[date, date]]:
+    """
+    Resolve a GAQL relative date range (e.g. LAST_30_DAYS) to concrete dates.
+
+    Args:
+        range_name: GAQL date range literal, case-insensitive
+        today: Reference date (defaults to the local current date)
+
+    Returns:
+        (start, end) dates inclusive, or None for unknown ranges
+    """
+    today = today or date.today()
+    name = range_name.upper()
+    weekday = today.weekday()  # Monday == 0
+    days_since_sunday = (weekday + 1) % 7
+    first_of_month = today.replace(day=1)
+
+    if name == "TODAY":
+        return today, today
+    if name == "YESTERDAY":
+        yesterday = today - timedelta(days=1)
+        return yesterday, yesterday
+    if name in ("LAST_7_DAYS", "LAST_14_DAYS", "LAST_30_DAYS"):
+        days = int(name.split("_")[1])
+        return today - timedelta(days=days), today - timedelta(days=1)
+    if name == "THIS_MONTH":
+        return first_of_month, today
+    if name == "LAST_MONTH":
+        last_month_end = first_of_month - timedelta(days=1)
+        return last_month_end.replace(day=1), last_month_end
+    if name == "THIS_WEEK_SUN_TODAY":
+        return today - timedelta(days=days_since_sunday), today
+    if name == "THIS_WEEK_MON_TODAY":
+        return today - timedelta(days=weekday), today
+    if name == "LAST_WEEK_SUN_SAT":
+        start = today - timedelta(days=days_since_sunday + 7)
+        return start, start + timedelta(days=6)
+    if name == "LAST_WEEK_MON_SUN":
+        start = today - timedelta(days=weekday + 7)
+        return start, start + timedelta(days=6)
+    if name == "LAST_BUSINESS_WEEK":
+        start = today - timedelta(days=weekday + 7)
+        return start, start + timedelta(days=4)
+    return None
+
+
+_GAQL_LITERAL_PATTERN = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")""")
+_DURING_PATTERN = re.compile(r"\bduring ([a-z0-9_]+)")
+
+
+def normalize_gaql(query: str, today: Optional[date] = None) -> str:
+    """
+    Return a canonical form of a GAQL query for use as a cache key.
+
+    Keywords and field names are lower-cased and whitespace is collapsed,
+    while quoted literals are kept verbatim. Relative DURING ranges are
+    rewritten to explicit BETWEEN dates so keys roll over at midnight.
+    """
+    parts = _GAQL_LITERAL_PATTERN.split(query)
+    for index in range(0, len(parts), 2):
+        text = re.sub(r"\s+", " ", parts[index].lower())
+        text = re.sub(r"\s*([,()=<>!]+)\s*", r"\1", text)
+        parts[index] = _DURING_PATTERN.sub(lambda match: _resolve_during(match, today), text)
+    return "".join(parts).strip()
+
+
+def _resolve_during(match: "re.Match[str]", today: Optional[date]) -> str:
+    resolved = resolve_date_range(match.group(1), today)
+    if resolved is None:
+        # Unknown range: pin it to the current day so stale keys still expire at midnight
+        return f"{match.group(0)}@{(today or date.today()).isoformat()}"
+    start, end = resolved
+    return f"between '{start.isoformat()}' and '{end.isoformat()}'"
+
+
+def calculate_roas(conversions_value: float, cost: float) -> Optional[float]:
+    """Calculate ROAS (Return on Ad Spend)."""
+    if cost == 0:
+        return None
+    return round(conversions_value / cost, 2)
+
+
+def calculate_cvr(conversions: float, clicks: int) -> Optional[float]:
+    """Calculate conversion rate."""
+    if clicks == 0:
+        return None
+    return round((conversions / clicks) * 100, 2)
+
+
+def get_proto_attr(entity: Any, attr: str) -> Any:
+    """Return proto field, handling trailing underscore that Python reserves."""
+    if entity is None:
+        return None
+
+    sentinel = object()
+    value = getattr(entity, attr, sentinel)
+    if value is sentinel:
+        value = getattr(entity, f"{attr}_", sentinel)
+    return None if value is sentinel else value
+
+
+def _rows_total(rows: Iterable[Any], count: int, truncated: bool, offset: int) -> Optional[int]:
+    """Rows in the full result: known when the stream ran out or the rows are a sized collection."""
+    if not truncated:
+        return offset + count
+    if isinstance(rows, (list, tuple)):
+        return offset + len(rows)
+    return None
+
+
+def _response_footer(
+    count_key: str,
+    count: int,
+    truncated: bool,
+    budget: int,
+    next_cursor: Optional[str] = None,
+    rows_total: Optional[int] = None
+) -> Dict[str, Any]:
+    """Footer fields shared by the JSON and columnar response builders."""
+    footer: Dict[str, Any] = {
+        count_key: count,
+        "rows_returned": count,
+        "rows_total": rows_total,
+        "truncated": truncated
+    }
+    if truncated:
+        footer["more_rows_available"] = True
+        if next_cursor:
+            footer["next_cursor"] = next_cursor
+            footer["message"] = (
+                "More rows available. Call run_google_ads_gaql_next_page with next_cursor "
+                "to fetch them without re-running the query."
+            )
+        else:
+            footer["message"] = (
+                f"Response limit of {budget:,} characters reached. Add filters, "
+                f"a LIMIT clause or select fewer fields to see the remaining rows."
+            )
+    return footer
+
+
+def _json_row_text(row: Any) -> str:
+    """One row as build_json_response() writes it inside the row array."""
+    return "\n    " + json.dumps(row, indent=2).replace("\n", "\n    ")
+
+
+def build_json_response(
+    header: Dict[str, Any],
+    rows: Iterable[Any],
+    rows_key: str = "results",
+    count_key: str = "result_count",
+    budget: int = CHARACTER_LIMIT,
+    max_rows: Optional[int] = None,
+    next_cursor: Optional[str] = None,
+    offset: int = 0
+) -> str:
+    """
+    Build a JSON response from a row stream without exceeding the character budget.
+
+    Rows are encoded one at a time and appended only while they fit, so the
+    output is always valid JSON. Once the budget (or max_rows) is spent the
+    row iterator is closed (cancelling any underlying GAQL stream) and the
+    response is marked with "more_rows_available". The footer reports
+    rows_returned and rows_total (null when the stream was cut before its
+    end). Rows are not encoded once even the shortest row seen so far could
+    no longer fit. The layout matches json.dumps(indent=2).
+
+    Args:
+        header: Fields emitted before the rows (e.g. customer_id, query)
+        rows: Iterable of JSON-serializable rows, typically a generator
+        rows_key: Key holding the row array
+        count_key: Key holding the number of rows returned
+        budget: Maximum response size in characters
+        max_rows: Stop after this many rows (one extra row is read to detect more)
+        next_cursor: Cursor ID reported in the footer when rows remain
+        offset: Rows returned by earlier pages, counted in rows_total
+
+    Returns:
+        str: JSON document no longer than the budget (header permitting)
+    """
+    def footer_text(count: int, truncated: bool, rows_total: Optional[int]) -> str:
+        footer = _response_footer(count_key, count, truncated, budget, next_cursor, rows_total)
+        # Drop the opening "{\n" so the footer continues the enclosing object
+        return json.dumps(footer, indent=2)[2:]
+
+    header_text = json.dumps(header, indent=2)
+    opening = header_text[:-2] + "," if header else "{"
+    parts = [opening, f'\n  "{rows_key}": [']
+    used = sum(len(part) for part in parts)
+    # Space for the closing bracket and the larger (truncated) footer
+    reserved = len("\n  ],\n") + len(footer_text(10 ** 9, True, 10 ** 9))
+
+    count = 0
+    truncated = False
+    encode_seconds = 0.0
+    # Length of the shortest row so far, the estimate for rows not yet encoded
+    shortest = 0
+    iterator = iter(rows)
+    try:
+        for row in iterator:
+            if (max_rows is not None and count >= max_rows) or used + shortest + reserved > budget:
+                truncated = True
+                break
+            started = time.perf_counter()
+            piece = ("," if count else "") + _json_row_text(row)
+            encode_seconds += time.perf_counter() - started
+            if used + len(piece) + reserved > budget:
+                truncated = True
+                break
+            parts.append(piece)
+            used += len(piece)
+            # Compare like with like: every row after the first carries a leading comma
+            size = len(piece) if count else len(piece) + 1
+            shortest = size if not count else min(shortest, size)
+            count += 1
+    finally:
+        close = getattr(iterator, "close", None)
+        if callable(close):
+            close()
+
+    parts.append("\n  ]," if count else "],")
+    parts.append("\n" + footer_text(count, truncated, _rows_total(rows, count, truncated, offset)))
+    server_metrics.observe("duration_seconds", encode_seconds, "stage", "encode_json")
+    server_metrics.observe("rows", count, "stage", "encode_json")
+    return "".join(parts)
+
+
+def build_columnar_response(
+    header: Dict[str, Any],
+    columns: List[str],
+    rows: Iterable[Any],
+    budget: int = CHARACTER_LIMIT,
+    max_rows: Optional[int] = None,
+    next_cursor: Optional[str] = None,
+    offset: int = 0
+) -> str:
+    """
+    Build a compact columnar JSON response from a stream of value rows.
+
+    Field paths are listed once in "columns" and each row is a positional
+    array. String values are dictionary-encoded per column: rows hold an
+    index into "dictionaries"[column], so repeated names cost a few digits.
+    Like build_json_response(), rows are added only while the whole
+    document (dictionaries included) stays within the budget, and the row
+    iterator is closed as soon as it is exceeded.
+
+    Args:
+        header: Fields emitted before the columns (e.g. customer_id, query)
+        columns: Field paths in row order
+        rows: Iterable of value sequences matching columns
+        budget: Maximum response size in characters
+        max_rows: Stop after this many rows (one extra row is read to detect more)
+        next_cursor: Cursor ID reported in the footer when rows remain
+        offset: Rows returned by earlier pages, counted in rows_total
+
+    Returns:
+        str: JSON document no longer than the budget (header permitting)
+    """
+    compact = functools.partial(json.dumps, separators=(",", ":"))
+
+    def footer_text(
+        dictionaries: Dict[str, List[str]],
+        count: int,
+        truncated: bool,
+        rows_total: Optional[int]
+    ) -> str:
+        footer = _response_footer("result_count", count, truncated, budget, next_cursor, rows_total)
+        return f'  "dictionaries": {compact(dictionaries)},\n' + json.dumps(footer, indent=2)[2:]
+
+    header_text = json.dumps(header, indent=2)
+    opening = header_text[:-2] + "," if header else "{"
+    parts = [opening, f'\n  "columns": {compact(columns)},\n  "rows": [']
+    used = sum(len(part) for part in parts)
+    reserved = len("\n  ],\n") + len(footer_text({}, 10 ** 9, True, 10 ** 9))
+
+    # Per-column value -> index maps, built lazily for string columns
+    indexes: List[Optional[Dict[str, int]]] = [None] * len(columns)
+    dictionaries: Dict[str, List[str]] = {}
+
+    count = 0
+    truncated = False
+    encode_seconds = 0.0
+    # Length of the shortest row so far, the estimate for rows not yet encoded
+    shortest = 0
+    iterator = iter(rows)
+    try:
+        for values in iterator:
+            if (max_rows is not None and count >= max_rows) or used + shortest + reserved > budget:
+                truncated = True
+                break
+            started = time.perf_counter()
+            encoded = list(values)
+            added: List[Tuple[int, str]] = []
+            extra = 0
+            for position, value in enumerate(encoded):
+                if not isinstance(value, str):
+                    continue
+                index = indexes[position]
+                if index is None:
+                    index = indexes[position] = {}
+                    extra += len(compact(columns[position])) + 4
+                code = index.get(value)
+                if code is None:
+                    code = len(index)
+                    added.append((position, value))
+                    extra += len(compact(value)) + 1
+                encoded[position] = code
+
+            piece = ("," if count else "") + "\n    " + compact(encoded)
+            encode_seconds += time.perf_counter() - started
+            if used + len(piece) + extra + reserved > budget:
+                truncated = True
+                break
+
+            for position, value in added:
+                indexes[position][value] = len(indexes[position])
+                dictionaries.setdefault(columns[position], []).append(value)
+            parts.append(piece)
+            used += len(piece) + extra
+            # Compare like with like: every row after the first carries a leading comma
+            size = len(piece) if count else len(piece) + 1
+            shortest = size if not count else min(shortest, size)
+            count += 1
+    finally:
+        close = getattr(iterator, "close", None)
+        if callable(close):
+            close()
+
+    parts.append("\n  ],\n" if count else "],\n")
+    parts.append(footer_text(dictionaries, count, truncated, _rows_total(rows, count, truncated, offset)))
+    server_metrics.observe("duration_seconds", encode_seconds, "stage", "encode_columnar")
+    server_metrics.observe("rows", count, "stage", "encode_columnar")
+    return "".join(parts)
+
+
+def _markdown_cell(value: Any) -> str:
+    """Render one table cell; None shows as "-" and pipes/newlines can't break the row."""
+    if value is None:
+        return "-"
+    text = value if isinstance(value, str) else str(value)
+    if "|" in text or "\n" in text:
+        text = text.replace("|", "\\|").replace("\n", " ")
+    return text
+
+
+def build_markdown_response(
+    preamble: str,
+    columns: List[str],
+    rows: Iterable[Any],
+    format_row: Optional[Callable[[Any], Iterable[Any]]] = None,
+    total_rows: Optional[int] = None,
+    hint: str = "",
+    budget: int = CHARACTER_LIMIT
+) -> str:
+    """
+    Render a Markdown table from a row stream without exceeding the character budget.
+
+    Lines are collected in a list and joined once, so rendering is linear in
+    the output size, and a row is formatted only if every row before it
+    fit. When the next row would push the document past the budget, the row
+    iterator is closed and a footer says how many rows were left out. The
+    preamble counts against the same budget and is cut short if it alone
+    would leave no room for the table header and footer.
+
+    Args:
+        preamble: Title and summary lines written before the table
+        columns: Column headings
+        rows: Rows to render, typically a list or generator
+        format_row: Turns a row into its cell values (None renders as "-");
+            rows are used as cell sequences when omitted
+        total_rows: Rows in the full result, for the footer when rows has no len()
+        hint: Appended to the footer, e.g. how to narrow the result
+        budget: Maximum response size in characters
+
+    Returns:
+        str: Markdown document no longer than the budget
+    """
+    if total_rows is None and hasattr(rows, "__len__"):
+        total_rows = len(rows)
+
+    def footer_text(omitted: Optional[int]) -> str:
+        shown = "More rows" if omitted is None else f"{omitted:,} more rows"
+        return f"\n⚠️ {shown} not shown (response limit of {budget:,} characters). {hint}".rstrip() + "\n"
+
+    table_header = [
+        "| " + " | ".join(columns) + " |\n",
+        "|" + "|".join("---" for _ in columns) + "|\n"
+    ]
+    reserved = len(footer_text(10 ** 9))
+    room = budget - reserved - sum(len(part) for part in table_header)
+    if len(preamble) > room:
+        preamble = preamble[:max(0, room - 5)] + "...\n\n"
+    parts = [preamble] + table_header
+    used = sum(len(part) for part in parts)
+
+    count = 0
+    truncated = False
+    iterator = iter(rows)
+    with server_metrics.span("render_markdown"):
+        try:
+            for row in iterator:
+                cells = row if format_row is None else format_row(row)
+                line = "| " + " | ".join([_markdown_cell(cell) for cell in cells]) + " |\n"
+                if used + len(line) + reserved > budget:
+                    truncated = True
+                    break
+                parts.append(line)
+                used += len(line)
+                count += 1
+        finally:
+            close = getattr(iterator, "close", None)
+            if callable(close):
+                close()
+
+    if truncated:
+        parts.append(footer_text(None if total_rows is None else total_rows - count))
+    server_metrics.observe("rows", count, "stage", "render_markdown")
+    return "".join(parts)
+
+
+def failed_accounts_line(failed: Dict[str, str], query: str) -> str:
+    """
+    Markdown line listing accounts whose queries failed, or "" when none did.
+
+    Only the first FANOUT_HEADER_SAMPLE accounts are named, with shortened
+    errors; the rest are counted.
+    """
+    if not failed:
+        return ""
+    sample = list(failed.items())[:FANOUT_HEADER_SAMPLE]
+    line = "**Failed accounts:** " + ", ".join(
+        f"{customer_id} ({summarize_account_error(error, query)})" for customer_id, error in sample
+    )
+    if len(failed) > len(sample):
+        line += f" and {len(failed) - len(sample):,} more"
+    return line + "\n\n"
+
+
+def failed_accounts_sample(failed: Dict[str, str], query: str) -> Dict[str, str]:
+    """The first FANOUT_HEADER_SAMPLE failures with shortened errors, for a JSON header."""
+    return {
+        customer_id: summarize_account_error(error, query)
+        for customer_id, error in list(failed.items())[:FANOUT_HEADER_SAMPLE]
+    }
+
+
+def format_customer_id(customer_id: str) -> str:
+    """Format customer ID by removing dashes."""
+    return customer_id.replace("-", "")
+
+
+class EnumRegistry:
+    """
+    Number-to-name tables for Google Ads enums, built once per enum type.
+
+    Enum numbers are small and dense, so each table is a tuple indexed by
+    the number and resolving a value is a bounds check plus an index.
+    Numbers the installed SDK doesn't know render as their decimal text,
+    as in MessageToJson. Tables are keyed by the enum's full name, which
+    includes the API version, so one registry serves every pooled client.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    def table(self, enum_type: Any) -> Tuple[str, ...]:
+        """
+        Return the name table for an enum type.
+
+        Args:
+            enum_type: protobuf EnumDescriptor, enum wrapper with a DESCRIPTOR,
+                or proto-plus enum class (as returned by client.enums)
+
+        Returns:
+            Tuple whose item at each enum number is that value's name
+        """
+        descriptor = getattr(enum_type, "DESCRIPTOR", enum_type)
+        key = getattr(descriptor, "full_name", None)
+        if key is None:
+            key = f"{enum_type.__module__}.{enum_type.__qualname__}"
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+
+        if hasattr(descriptor, "values_by_number"):
+            names = {number: value.name for number, value in descriptor.values_by_number.items()}
+        else:
+            names = {int(member): member.name for member in enum_type}
+        size = max((number for number in names if number >= 0), default=-1) + 1
+        table = tuple(names.get(number, str(number)) for number in range(size))
+        with self._lock:
+            return self._tables.setdefault(key, table)
+
+    def converter(self, enum_type: Any) -> Callable[[int], str]:
+        """Return a function mapping an enum number of enum_type to its name."""
+        table = self.table(enum_type)
+        size = len(table)
+        return lambda number: table[number] if 0 <= number < size else str(number)
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+
+enum_registry = EnumRegistry()
+
+
+def get_enum_name(
+    value: Any,
+    enum_converter: Optional[Callable[[int], str]] = None,
+    default: str = "UNSPECIFIED"
+) -> str:
+    """
+    Safely resolve the name of a Google Ads enum, handling int fallbacks.
+
+    Args:
+        value: Enum value returned by Google Ads API (may be proto enum or int)
+        enum_converter: Number-to-name function from enum_registry.converter()
+        default: Fallback string when value is None
+
+    Returns:
+        Enum name string or fallback representation.
+    """
+    if value is None:
+        return default
+
+    # proto-plus enum members carry their name; raw protobuf fields are ints
+    name = getattr(value, "name", None)
+    if name:
+        return name
+    if enum_converter is not None:
+        return enum_converter(int(value))
+    return str(value)
+
+
+# ============================================================================
+# ROW SERIALIZATION
+# ============================================================================
+
+_FIELD_PATH_PATTERN = re.compile(r"^[a-z][a-z0-9_]*(\.[a-z][a-z0-9_]*)+$")
+
+
+def parse_select_fields(query: str) -> List[str]:
+    """
+    Return the field paths listed in a GAQL SELECT clause, in order.
+
+    Uses parse_gaql(), so the columns always agree with what validation saw.
+
+    Args:
+        query: GAQL query string
+
+    Returns:
+        List of dotted field paths (e.g. ["campaign.name", "metrics.clicks"]),
+        or an empty list when the query cannot be parsed.
+    """
+    try:
+        fields = parse_gaql(query).select
+    except GaqlSyntaxError:
+        return []
+    if not all(_FIELD_PATH_PATTERN.match(field) for field in fields):
+        return []
+    return list(dict.fromkeys(fields))
+
+
+def _is_repeated(field: "FieldDescriptor") -> bool:
+    from google.protobuf.descriptor import FieldDescriptor
+
+    is_repeated = getattr(field, "is_repeated", None)
+    if is_repeated is not None:
+        return is_repeated
+    return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+def _field_converter(field: "FieldDescriptor") -> Optional[Callable[[Any], Any]]:
+    """Return the value converter for a leaf field, or None when no conversion is needed."""
+    from google.protobuf.descriptor import FieldDescriptor
+    from google.protobuf.json_format import MessageToDict
+
+    repeated = _is_repeated(field)
+
+    if field.type == FieldDescriptor.TYPE_ENUM:
+        convert = enum_registry.converter(field.enum_type)
+        if repeated:
+            return lambda values: [convert(value) for value in values]
+        return convert
+
+    if field.type == FieldDescriptor.TYPE_MESSAGE:
+        if repeated:
+            return lambda values: [MessageToDict(value) for value in values]
+        return MessageToDict
+
+    if repeated:
+        return list
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def google_ads_row_descriptor() -> Any:
+    """Return the GoogleAdsRow message descriptor for the API version in use."""
+    version = google_ads_api_version() or googleads_client_module()._DEFAULT_VERSION
+    module = importlib.import_module(f"google.ads.googleads.{version}.services.types.google_ads_service")
+    return module.GoogleAdsRow.pb().DESCRIPTOR
+
+
+def is_numeric_gaql_field(field_path: str) -> bool:
+    """
+    Check whether a GAQL field path resolves to a single numeric value.
+
+    Raises:
+        ValueError: If the field path does not exist on GoogleAdsRow
+    """
+    from google.protobuf.descriptor import FieldDescriptor
+
+    message_descriptor = google_ads_row_descriptor()
+    field = None
+    for part in field_path.split("."):
+        if message_descriptor is None:
+            return False
+        field = message_descriptor.fields_by_name.get(part)
+        if field is None:
+            raise ValueError(f"Unknown field '{part}' in '{field_path}'")
+        message_descriptor = field.message_type
+    return field.type not in (
+        FieldDescriptor.TYPE_STRING, FieldDescriptor.TYPE_BYTES, FieldDescriptor.TYPE_BOOL,
+        FieldDescriptor.TYPE_ENUM, FieldDescriptor.TYPE_MESSAGE, FieldDescriptor.TYPE_GROUP
+    ) and not _is_repeated(field)
+
+
+class GaqlRowExtractor:
+    """
+    Proto-to-dict row extractor compiled once for a query's SELECT fields.
+
+    Instead of round-tripping every row through MessageToJson and json.loads,
+    the field paths are resolved against the GoogleAdsRow descriptor once and
+    compiled into a single function that reads exactly those fields. Output
+    nests like MessageToJson (camelCase keys, enum names), except that int64
+    values such as micros stay numbers and unset fields keep their defaults.
+    """
+
+    def __init__(self, field_paths: List[str]):
+        self.field_paths = tuple(field_paths)
+        self._compiled: Optional[Tuple[Callable[[Any], dict], Callable[[Any], tuple]]] = None
+
+    @classmethod
+    def for_query(cls, query: str) -> Optional["GaqlRowExtractor"]:
+        """Return an extractor for the query, or None if its SELECT clause can't be parsed."""
+        field_paths = parse_select_fields(query)
+        return cls(field_paths) if field_paths else None
+
+    def to_dict(self, row: Any) -> dict:
+        """Extract the selected fields of a row into a nested dictionary."""
+        message = getattr(row, "_pb", row)
+        return self._compile(message)[0](message)
+
+    def values(self, row: Any) -> tuple:
+        """Extract the selected fields of a row as a flat tuple in SELECT order."""
+        message = getattr(row, "_pb", row)
+        return self._compile(message)[1](message)
+
+    __call__ = to_dict
+
+    def _compile(self, message: Any) -> Tuple[Callable[[Any], dict], Callable[[Any], tuple]]:
+        if self._compiled is None:
+            self._compiled = _compile_row_extractor(self.field_paths, message.DESCRIPTOR)
+        return self._compiled
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_row_extractor(
+    field_paths: Tuple[str, ...],
+    descriptor: Any
+) -> Tuple[Callable[[Any], dict], Callable[[Any], tuple]]:
+    """
+    Generate extractor functions for field paths on a row descriptor.
+
+    Raises:
+        ValueError: If a field path does not exist on the descriptor
+    """
+    from google.protobuf.descriptor import FieldDescriptor
+
+    namespace: Dict[str, Any] = {}
+    tree: Dict[str, Any] = {}
+    value_exprs = []
+
+    for index, path in enumerate(field_paths):
+        message_descriptor = descriptor
+        json_keys = []
+        field = None
+        for part in path.split("."):
+            if message_descriptor is None:
+                raise ValueError(f"Field path '{path}' descends into a non-message field")
+            field = message_descriptor.fields_by_name.get(part)
+            if field is None:
+                raise ValueError(f"Unknown field '{part}' in '{path}'")
+            json_keys.append(field.json_name)
+            message_descriptor = field.message_type if not _is_repeated(field) else None
+
+        namespace[f"get_{index}"] = operator.attrgetter(path)
+        expr = f"get_{index}(row)"
+        converter = None
+        if field.type == FieldDescriptor.TYPE_ENUM and not _is_repeated(field):
+            # Index the registry table inline rather than calling a converter per value
+            names = enum_registry.table(field.enum_type)
+            namespace[f"names_{index}"] = names
+            expr = (
+                f"(names_{index}[value_{index}] if 0 <= (value_{index} := {expr}) < {len(names)} "
+                f"else str(value_{index}))"
+            )
+        else:
+            converter = _field_converter(field)
+        if converter is not None:
+            namespace[f"convert_{index}"] = converter
+            expr = f"convert_{index}({expr})"
+        value_exprs.append(expr)
+
+        node = tree
+        for key in json_keys[:-1]:
+            node = node.setdefault(key, {})
+        node[json_keys[-1]] = expr
+
+    def render(node: Dict[str, Any]) -> str:
+        items = (
+            f"{key!r}: {render(value) if isinstance(value, dict) else value}"
+            for key, value in node.items()
+        )
+        return "{" + ", ".join(items) + "}"
+
+    source = (
+        f"def to_dict(row):\n    return {render(tree)}\n"
+        f"def values(row):\n    return ({', '.join(value_exprs)},)\n"
+    )
+    exec(compile(source, "<gaql-row-extractor>", "exec"), namespace)
+    return namespace["to_dict"], namespace["values"]
+
+
+# ============================================================================
+# GAQL VALIDATION
+# ============================================================================
+
+_GAQL_TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+        (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+        |(?P<number>-?\d+(?:\.\d+)?)
+        |(?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)
+        |(?P<operator>!=|>=|<=|=|<|>)
+        |(?P<punctuation>[(),])
+    )""",
+    re.VERBOSE
+)
+
+# Operators written as keywords; NOT and IS combine with the word that follows
+_GAQL_KEYWORD_OPERATORS = {
+    "IN", "LIKE", "DURING", "BETWEEN", "IS", "CONTAINS", "REGEXP_MATCH", "NOT"
+}
+
+# Selecting any of these requires a finite date range on one of them in WHERE
+CORE_DATE_SEGMENTS = frozenset({
+    "segments.date", "segments.week", "segments.month", "segments.quarter", "segments.year"
+})
+
+
+class GaqlSyntaxError(ValueError):
+    """Raised when a query is not a well-formed GAQL SELECT statement."""
+
+
+class GaqlValidationError(ValueError):
+    """Raised when a query fails validation; carries every problem found."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("Invalid GAQL query:\n" + "\n".join(f"- {error}" for error in errors))
+
+
+class GaqlCondition:
+    """One WHERE predicate: field, operator and the raw value tokens."""
+
+    def __init__(self, field: str, operator: str, values: List[Tuple[str, str]]):
+        self.field = field
+        self.operator = operator
+        self.values = values
+
+    def to_gaql(self) -> str:
+        texts = [text for _, text in self.values]
+        if self.operator in ("IN", "NOT IN") or self.operator.startswith("CONTAINS"):
+            return f"{self.field} {self.operator} ({', '.join(texts)})"
+        if self.operator == "BETWEEN":
+            return f"{self.field} BETWEEN {texts[0]} AND {texts[1]}"
+        if self.operator in ("IS NULL", "IS NOT NULL"):
+            return f"{self.field} {self.operator}"
+        return f"{self.field} {self.operator} {texts[0]}"
+
+
+class GaqlQuery:
+    """Parsed GAQL SELECT statement."""
+
+    def __init__(self):
+        self.select: List[str] = []
+        self.resource = ""
+        self.where: List[GaqlCondition] = []
+        self.order_by: List[Tuple[str, str]] = []
+        self.limit: Optional[int] = None
+        self.parameters: List[Tuple[str, str]] = []
+
+    def to_gaql(self) -> str:
+        """Render the query back to GAQL text."""
+        parts = [f"SELECT {', '.join(self.select)} FROM {self.resource}"]
+        if self.where:
+            parts.append("WHERE " + " AND ".join(condition.to_gaql() for condition in self.where))
+        if self.order_by:
+            parts.append("ORDER BY " + ", ".join(f"{field} {direction}" for field, direction in self.order_by))
+        if self.limit is not None:
+            parts.append(f"LIMIT {self.limit}")
+        if self.parameters:
+            parts.append("PARAMETERS " + ", ".join(f"{name} = {value}" for name, value in self.parameters))
+        return " ".join(parts)
+
+
+def _tokenize_gaql(query: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = _GAQL_TOKEN_PATTERN.match(query, position)
+        if not match or match.end() == position:
+            raise GaqlSyntaxError(f"Unexpected character {query[position:].lstrip()[:1]!r} at position {position}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class _GaqlParser:
+    """Recursive-descent parser over GAQL tokens."""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.index = 0
+
+    def peek_keyword(self) -> Optional[str]:
+        if self.index < len(self.tokens) and self.tokens[self.index][0] == "name":
+            return self.tokens[self.index][1].upper()
+        return None
+
+    def next(self, expected: str) -> Tuple[str, str]:
+        if self.index >= len(self.tokens):
+            raise GaqlSyntaxError(f"Query ended early; expected {expected}")
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect_keyword(self, keyword: str) -> None:
+        kind, text = self.next(keyword)
+        if kind != "name" or text.upper() != keyword:
+            raise GaqlSyntaxError(f"Expected {keyword} but found '{text}'")
+
+    def expect_punctuation(self, symbol: str) -> None:
+        kind, text = self.next(f"'{symbol}'")
+        if text != symbol:
+            raise GaqlSyntaxError(f"Expected '{symbol}' but found '{text}'")
+
+    def field(self) -> str:
+        kind, text = self.next("a field name")
+        if kind != "name":
+            raise GaqlSyntaxError(f"Expected a field name but found '{text}'")
+        return text.lower()
+
+    def value(self) -> Tuple[str, str]:
+        kind, text = self.next("a value")
+        if kind not in ("string", "number", "name"):
+            raise GaqlSyntaxError(f"Expected a value but found '{text}'")
+        return kind, text
+
+    def value_list(self) -> List[Tuple[str, str]]:
+        self.expect_punctuation("(")
+        values = [self.value()]
+        while self.index < len(self.tokens) and self.tokens[self.index][1] == ",":
+            self.index += 1
+            values.append(self.value())
+        self.expect_punctuation(")")
+        return values
+
+    def condition(self) -> GaqlCondition:
+        field = self.field()
+        kind, text = self.next("an operator")
+        if kind == "operator":
+            return GaqlCondition(field, text, [self.value()])
+        keyword = text.upper() if kind == "name" else text
+        if keyword not in _GAQL_KEYWORD_OPERATORS:
+            raise GaqlSyntaxError(f"Unknown operator '{text}' after {field}")
+
+        if keyword == "NOT":
+            negated = self.next("IN, LIKE or REGEXP_MATCH")[1].upper()
+            if negated == "IN":
+                return GaqlCondition(field, "NOT IN", self.value_list())
+            if negated in ("LIKE", "REGEXP_MATCH"):
+                return GaqlCondition(field, f"NOT {negated}", [self.value()])
+            raise GaqlSyntaxError(f"Unknown operator 'NOT {negated}' after {field}")
+        if keyword == "IN":
+            return GaqlCondition(field, "IN", self.value_list())
+        if keyword == "IS":
+            if self.peek_keyword() == "NOT":
+                self.index += 1
+                self.expect_keyword("NULL")
+                return GaqlCondition(field, "IS NOT NULL", [])
+            self.expect_keyword("NULL")
+            return GaqlCondition(field, "IS NULL", [])
+        if keyword == "CONTAINS":
+            quantifier = self.next("ANY, ALL or NONE")[1].upper()
+            if quantifier not in ("ANY", "ALL", "NONE"):
+                raise GaqlSyntaxError(f"Expected ANY, ALL or NONE after CONTAINS but found '{quantifier}'")
+            return GaqlCondition(field, f"CONTAINS {quantifier}", self.value_list())
+        if keyword == "BETWEEN":
+            low = self.value()
+            self.expect_keyword("AND")
+            return GaqlCondition(field, "BETWEEN", [low, self.value()])
+        if keyword == "DURING":
+            kind, text = self.next("a date range")
+            if kind != "name":
+                raise GaqlSyntaxError(f"Expected a date range after DURING but found '{text}'")
+            return GaqlCondition(field, "DURING", [(kind, text.upper())])
+        return GaqlCondition(field, keyword, [self.value()])
+
+    def parse(self) -> GaqlQuery:
+        query = GaqlQuery()
+        if self.peek_keyword() != "SELECT":
+            found = self.tokens[0][1] if self.tokens else "an empty query"
+            raise GaqlSyntaxError(
+                f"Only SELECT queries are supported (found '{found}'); this tool is read-only."
+            )
+        self.index += 1
+        query.select.append(self.field())
+        while self.index < len(self.tokens) and self.tokens[self.index][1] == ",":
+            self.index += 1
+            query.select.append(self.field())
+
+        self.expect_keyword("FROM")
+        query.resource = self.field()
+
+        if self.peek_keyword() == "WHERE":
+            self.index += 1
+            query.where.append(self.condition())
+            while self.peek_keyword() == "AND":
+                self.index += 1
+                query.where.append(self.condition())
+
+        if self.peek_keyword() == "ORDER":
+            self.index += 1
+            self.expect_keyword("BY")
+            while True:
+                field = self.field()
+                direction = "ASC"
+                if self.peek_keyword() in ("ASC", "DESC"):
+                    direction = self.next("ASC or DESC")[1].upper()
+                query.order_by.append((field, direction))
+                if self.index < len(self.tokens) and self.tokens[self.index][1] == ",":
+                    self.index += 1
+                    continue
+                break
+
+        if self.peek_keyword() == "LIMIT":
+            self.index += 1
+            kind, text = self.next("a row limit")
+            if kind != "number" or not text.isdigit() or int(text) < 1:
+                raise GaqlSyntaxError(f"LIMIT must be a positive integer, not '{text}'")
+            query.limit = int(text)
+
+        if self.peek_keyword() == "PARAMETERS":
+            self.index += 1
+            while True:
+                name = self.field()
+                self.expect_punctuation("=")
+                query.parameters.append((name, self.value()[1]))
+                if self.index < len(self.tokens) and self.tokens[self.index][1] == ",":
+                    self.index += 1
+                    continue
+                break
+
+        if self.index < len(self.tokens):
+            raise GaqlSyntaxError(f"Unexpected '{self.tokens[self.index][1]}' after the end of the query")
+        return query
+
+
+def parse_gaql(query: str) -> GaqlQuery:
+    """
+    Parse a GAQL SELECT statement.
+
+    Anything other than a single SELECT (mutations, multiple statements,
+    stray characters) is rejected, so the check is structural rather than a
+    search for words like "update" that may legitimately appear in a filter.
+
+    Raises:
+        GaqlSyntaxError: If the query is not valid GAQL syntax
+    """
+    return _GaqlParser(_tokenize_gaql(query)).parse()
+
+
+class GaqlFieldCatalog:
+    """
+    Field metadata for one API version, as returned by GoogleAdsFieldService.
+
+    Each entry records the field's category (RESOURCE, ATTRIBUTE, SEGMENT,
+    METRIC), whether it can be selected, filtered and sorted, its enum values
+    and which resources, segments and metrics it is selectable with.
+    """
+
+    def __init__(self, version: str, fields: Dict[str, Dict[str, Any]]):
+        self.version = version
+        self.fields = fields
+        self._selectable_with = {
+            name: frozenset(field.get("selectable_with", ())) for name, field in fields.items()
+        }
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.fields.get(name)
+
+    def selectable_with(self, name: str) -> frozenset:
+        return self._selectable_with.get(name, frozenset())
+
+    def suggest(self, name: str, category: Optional[str] = None) -> Optional[str]:
+        """Return the closest known field name, for typo hints."""
+        candidates = [
+            candidate for candidate, field in self.fields.items()
+            if category is None or field.get("category") == category
+        ]
+        matches = difflib.get_close_matches(name, candidates, n=1, cutoff=0.75)
+        return matches[0] if matches else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": self.version, "fields": self.fields}
+
+
+_FIELD_CATALOG_QUERY = (
+    "SELECT name, category, selectable, filterable, sortable, selectable_with, "
+    "attribute_resources, data_type, enum_values, is_repeated "
+    "WHERE category IN ('RESOURCE', 'ATTRIBUTE', 'SEGMENT', 'METRIC')"
+)
+
+
+def fetch_field_catalog(client: "GoogleAdsClient", version: str) -> GaqlFieldCatalog:
+    """Download every GAQL field's metadata from GoogleAdsFieldService."""
+    service = client.get_service("GoogleAdsFieldService")
+    request = client.get_type("SearchGoogleAdsFieldsRequest")
+    request.query = _FIELD_CATALOG_QUERY
+
+    fields = {}
+    for field in service.search_google_ads_fields(request=request):
+        fields[field.name] = {
+            "category": get_enum_name(field.category),
+            "selectable": bool(field.selectable),
+            "filterable": bool(field.filterable),
+            "sortable": bool(field.sortable),
+            "selectable_with": list(field.selectable_with),
+            "attribute_resources": list(field.attribute_resources),
+            "data_type": get_enum_name(field.data_type),
+            "enum_values": list(field.enum_values),
+            "is_repeated": bool(field.is_repeated)
+        }
+    if not fields:
+        raise ValueError("GoogleAdsFieldService returned no fields")
+    return GaqlFieldCatalog(version, fields)
+
+
+class GaqlFieldCatalogCache:
+    """
+    Field catalogs per API version, kept in memory and on disk.
+
+    The catalog is fetched once per version and reused across restarts until
+    it is max_age_seconds old. When it cannot be fetched, validation falls
+    back to syntax checks and the fetch is retried after retry_seconds.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = GAQL_CATALOG_DIR,
+        max_age_seconds: int = GAQL_CATALOG_MAX_AGE_SECONDS,
+        retry_seconds: int = 300
+    ):
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_seconds
+        self.retry_seconds = retry_seconds
+        self._catalogs: Dict[str, GaqlFieldCatalog] = {}
+        self._failed_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.disk_loads = 0
+        self.fetch_errors = 0
+
+    @staticmethod
+    def current_version() -> str:
+        """Return the API version queries are sent to."""
+        return google_ads_api_version() or getattr(googleads_client_module(), "_DEFAULT_VERSION", "default")
+
+    def get(self, client: "GoogleAdsClient", version: Optional[str] = None) -> Optional[GaqlFieldCatalog]:
+        """Return the catalog for a version, loading or fetching it on first use."""
+        version = version or self.current_version()
+        catalog = self._catalogs.get(version)
+        if catalog is not None:
+            return catalog
+
+        with self._lock:
+            catalog = self._catalogs.get(version)
+            if catalog is not None:
+                return catalog
+            catalog = self._read_disk(version)
+            if catalog is not None:
+                self.disk_loads += 1
+            elif self._failed_until.get(version, 0) > time.time():
+                return None
+            else:
+                try:
+                    catalog = fetch_field_catalog(client, version)
+                    self.fetches += 1
+                except Exception:
+                    self.fetch_errors += 1
+                    self._failed_until[version] = time.time() + self.retry_seconds
+                    return None
+                self._write_disk(catalog)
+            self._catalogs[version] = catalog
+            return catalog
+
+    def clear(self) -> None:
+        """Forget in-memory catalogs and fetch failures (disk copies are kept)."""
+        with self._lock:
+            self._catalogs.clear()
+            self._failed_until.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return catalog counters for diagnostics."""
+        return {
+            "versions_loaded": sorted(self._catalogs),
+            "fetches": self.fetches,
+            "disk_loads": self.disk_loads,
+            "fetch_errors": self.fetch_errors
+        }
+
+    def _disk_path(self, version: str) -> str:
+        return os.path.join(self.cache_dir, f"gaql-fields-{version}.json")
+
+    def _read_disk(self, version: str) -> Optional[GaqlFieldCatalog]:
+        path = self._disk_path(version)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                return None
+            with open(path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != version or not payload.get("fields"):
+            return None
+        return GaqlFieldCatalog(version, payload["fields"])
+
+    def _write_disk(self, catalog: GaqlFieldCatalog) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(catalog.to_dict(), handle)
+            os.replace(temp_path, self._disk_path(catalog.version))
+        except OSError:
+            # The in-memory catalog still serves this process
+            pass
+
+
+field_catalog = GaqlFieldCatalogCache()
+
+
+class GaqlValidation:
+    """Outcome of validate_gaql(): the query to send, problems found and fixes applied."""
+
+    def __init__(self, query: str, errors: List[str], fixes: List[str], catalog_version: Optional[str]):
+        self.query = query
+        self.errors = errors
+        self.fixes = fixes
+        self.catalog_version = catalog_version
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+
+def _unquote(text: str) -> str:
+    return text[1:-1] if text[:1] in ("'", '"') else text
+
+
+def _field_resource(name: str) -> str:
+    return name.split(".", 1)[0]
+
+
+def _has_finite_date_range(conditions: List[GaqlCondition]) -> bool:
+    """True when a core date segment is pinned (DURING, BETWEEN, =, IN) or bounded on both sides."""
+    lower = set()
+    upper = set()
+    for condition in conditions:
+        if condition.field not in CORE_DATE_SEGMENTS:
+            continue
+        if condition.operator in ("DURING", "BETWEEN", "=", "IN"):
+            return True
+        if condition.operator in (">", ">="):
+            lower.add(condition.field)
+        elif condition.operator in ("<", "<="):
+            upper.add(condition.field)
+    return bool(lower & upper)
+
+
+def validate_gaql(
+    query: str,
+    catalog: Optional[GaqlFieldCatalog] = None,
+    auto_fix: bool = True
+) -> GaqlValidation:
+    """
+    Validate a GAQL query locally, before it costs an API round trip.
+
+    Syntax and the core date segment rule are always checked. With a field
+    catalog, every field is checked for existence, selectability,
+    filterability, sortability, compatibility with the FROM resource and
+    with the selected segments, and enum filter values are checked against
+    the allowed names. With auto_fix, unambiguous problems are repaired
+    instead of reported: duplicate SELECT fields are dropped and enum values
+    in the wrong case are upper-cased.
+
+    Args:
+        query: GAQL query string
+        catalog: Field metadata for the target API version, if available
+        auto_fix: Apply safe fixes and return the rewritten query
+
+    Returns:
+        GaqlValidation with the (possibly rewritten) query, errors and fixes
+    """
+    version = catalog.version if catalog else None
+    try:
+        parsed = parse_gaql(query)
+    except GaqlSyntaxError as e:
+        return GaqlValidation(query, [str(e)], [], version)
+
+    errors: List[str] = []
+    fixes: List[str] = []
+
+    unique = list(dict.fromkeys(parsed.select))
+    if len(unique) != len(parsed.select):
+        duplicates = sorted({field for field in parsed.select if parsed.select.count(field) > 1})
+        if auto_fix:
+            parsed.select = unique
+            fixes.append(f"Removed duplicate SELECT fields: {', '.join(duplicates)}")
+        else:
+            errors.append(f"Duplicate SELECT fields: {', '.join(duplicates)}")
+
+    date_segments = [field for field in parsed.select if field in CORE_DATE_SEGMENTS]
+    if date_segments and not _has_finite_date_range(parsed.where):
+        errors.append(
+            f"{', '.join(date_segments)} is selected, so WHERE must limit it to a finite range "
+            f"with DURING, BETWEEN, =, IN or both a lower and an upper bound "
+            f"(e.g. segments.date DURING LAST_30_DAYS)"
+        )
+
+    if catalog is not None:
+        errors.extend(_check_fields(parsed, catalog, fixes if auto_fix else None))
+
+    rewritten = parsed.to_gaql() if fixes else query
+    return GaqlValidation(rewritten, errors, fixes, version)
+
+
+def _check_fields(
+    parsed: GaqlQuery,
+    catalog: GaqlFieldCatalog,
+    fixes: Optional[List[str]]
+) -> List[str]:
+    """Catalog checks for validate_gaql(); enum case fixes are appended to fixes when given."""
+    errors: List[str] = []
+
+    resource = catalog.get(parsed.resource)
+    if resource is None or resource.get("category") != "RESOURCE":
+        hint = catalog.suggest(parsed.resource, "RESOURCE")
+        errors.append(
+            f"Unknown resource '{parsed.resource}' in FROM" + (f"; did you mean '{hint}'?" if hint else "")
+        )
+        resource = None
+
+    compatible = catalog.selectable_with(parsed.resource)
+    attributed = set(resource.get("attribute_resources", ())) if resource else set()
+
+    def check(name: str, clause: str, capability: str) -> Optional[Dict[str, Any]]:
+        field = catalog.get(name)
+        if field is None or field.get("category") == "RESOURCE":
+            hint = catalog.suggest(name)
+            errors.append(f"Unknown field '{name}' in {clause}" + (f"; did you mean '{hint}'?" if hint else ""))
+            return None
+        if not field.get(capability, False):
+            errors.append(f"{name} is not {capability} (used in {clause})")
+        if resource is not None:
+            owner = _field_resource(name)
+            if field.get("category") in ("SEGMENT", "METRIC"):
+                ok = name in compatible
+            else:
+                ok = owner == parsed.resource or owner in attributed or owner in compatible
+            if not ok:
+                errors.append(f"{name} cannot be used with FROM {parsed.resource}")
+        return field
+
+    for name in parsed.select:
+        check(name, "SELECT", "selectable")
+    for condition in parsed.where:
+        field = check(condition.field, "WHERE", "filterable")
+        if field and field.get("data_type") == "ENUM" and field.get("enum_values"):
+            allowed = {value.upper(): value for value in field["enum_values"]}
+            for position, (kind, text) in enumerate(condition.values):
+                if kind != "string":
+                    continue
+                value = _unquote(text)
+                if value in field["enum_values"]:
+                    continue
+                if fixes is not None and value.upper() in allowed:
+                    quote = text[0]
+                    condition.values[position] = (kind, f"{quote}{allowed[value.upper()]}{quote}")
+                    fixes.append(f"{condition.field}: '{value}' -> '{allowed[value.upper()]}'")
+                else:
+                    hint = difflib.get_close_matches(value.upper(), list(allowed), n=1)
+                    errors.append(
+                        f"'{value}' is not a valid value for {condition.field}"
+                        + (f"; did you mean '{allowed[hint[0]]}'?" if hint else "")
+                    )
+    for name, _ in parsed.order_by:
+        check(name, "ORDER BY", "sortable")
+
+    # Segments restrict which metrics and other segments they can be combined with
+    selected_segments = [name for name in parsed.select if name.startswith("segments.")]
+    for segment in selected_segments:
+        segment_compatible = catalog.selectable_with(segment)
+        if not segment_compatible:
+            continue
+        for name in parsed.select:
+            if name == segment or not name.startswith(("metrics.", "segments.")):
+                continue
+            if catalog.get(name) is not None and name not in segment_compatible:
+                errors.append(f"{segment} and {name} cannot be selected together")
+
+    return errors
+
+
+def prepare_gaql_query(client: "GoogleAdsClient", query: str, auto_fix: bool = True) -> Tuple[str, List[str]]:
+    """
+    Validate a query before sending it and return (query to send, fixes applied).
+
+    Uses the cached field catalog for the current API version; when the
+    catalog is unavailable only the syntax checks run.
+
+    Raises:
+        GaqlValidationError: If the query has problems that were not fixed
+    """
+    validation = validate_gaql(query, field_catalog.get(client), auto_fix=auto_fix)
+    if not validation.valid:
+        raise GaqlValidationError(validation.errors)
+    return validation.query, validation.fixes
+
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+def gaql_cache_key(customer_id: str, query: str, today: Optional[date] = None) -> str:
+    """Return the cache key for a query against a customer."""
+    return f"{format_customer_id(customer_id)}|{normalize_gaql(query, today)}"
+
+
+class GaqlResultCache:
+    """
+    LRU cache of serialized GAQL results with a time-to-live.
+
+    Entries hold the rows read so far and whether the result was complete.
+    When a directory is configured, entries are also written there as JSON
+    so repeated analysis survives server restarts. Only complete entries
+    count as hits; a partial prefix is counted as a miss by the reader once
+    it has to call the API for the rest.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = GAQL_CACHE_TTL_SECONDS,
+        max_entries: int = GAQL_CACHE_MAX_ENTRIES,
+        cache_dir: Optional[str] = GAQL_CACHE_DIR
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[str, Tuple[float, List[dict], bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.partial_hits = 0
+        self.disk_hits = 0
+
+    def get(self, key: str) -> Optional[Tuple[List[dict], bool]]:
+        """Return (rows, complete) for a fresh entry, or None on a miss."""
+        entry = self.lookup(key)
+        return None if entry is None else (entry[1], entry[2])
+
+    def lookup(self, key: str) -> Optional[Tuple[float, List[dict], bool]]:
+        """Return (expires_at, rows, complete) for a fresh entry, or None on a miss."""
+        if self.ttl_seconds <= 0:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count_hit(entry)
+                return entry
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._count_hit(entry)
+            self.disk_hits += 1
+            self._store(key, entry)
+        return entry
+
+    def record_miss(self) -> None:
+        """Count a partial entry whose reader had to call the API for the remaining rows."""
+        with self._lock:
+            self.misses += 1
+
+    def put(
+        self,
+        key: str,
+        rows: List[dict],
+        complete: bool = True,
+        expires_at: Optional[float] = None
+    ) -> None:
+        """
+        Store rows for a key, evicting the least recently used entries.
+
+        Args:
+            key: Cache key from gaql_cache_key()
+            rows: Serialized rows
+            complete: Whether rows is the whole result
+            expires_at: Keep an existing expiry (e.g. of a resumed prefix)
+                instead of starting a new TTL
+        """
+        if self.ttl_seconds <= 0:
+            return
+
+        if expires_at is None:
+            expires_at = time.time() + self.ttl_seconds
+        elif expires_at <= time.time():
+            return
+        entry = (expires_at, rows, complete)
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+
+    def clear(self) -> None:
+        """Drop every in-memory entry (disk entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for diagnostics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "partial_hits": self.partial_hits,
+            "disk_hits": self.disk_hits,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+    def _count_hit(self, entry: Tuple[float, List[dict], bool]) -> None:
+        if entry[2]:
+            self.hits += 1
+        else:
+            self.partial_hits += 1
+
+    def _store(self, key: str, entry: Tuple[float, List[dict], bool]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"gaql-{digest}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, List[dict], bool]]:
+        path = self._disk_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if payload.get("key") != key or payload.get("expires_at", 0) <= now:
+            return None
+        return payload["expires_at"], payload["rows"], payload["complete"]
+
+    def _write_disk(self, key: str, entry: Tuple[float, List[dict], bool]) -> None:
+        path = self._disk_path(key)
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"key": key, "expires_at": entry[0], "rows": entry[1], "complete": entry[2]}, handle)
+            os.replace(temp_path, path)
+        except OSError:
+            # Disk persistence is best-effort; the in-memory entry is still valid
+            pass
+
+
+result_cache = GaqlResultCache()
+
+
+# ============================================================================
+# RESULT CURSORS
+# ============================================================================
+
+class GaqlCursor:
+    """
+    An open, partially read GAQL result held between tool calls.
+
+    Wraps the row iterator (and with it the API pager, which fetches further
+    pages on demand) so each page continues where the previous one stopped.
+    """
+
+    def __init__(
+        self,
+        cursor_id: str,
+        customer_id: str,
+        query: str,
+        columns: List[str],
+        rows: Iterator[Any],
+        as_values: bool = False
+    ):
+        self.cursor_id = cursor_id
+        self.customer_id = customer_id
+        self.query = query
+        self.columns = columns
+        self.as_values = as_values
+        self.rows_returned = 0
+        self.exhausted = False
+        self.expires_at = 0.0
+        self.lock = threading.Lock()
+        self._rows = rows
+        self._pending: List[Any] = []
+
+    def take(self) -> Iterator[Any]:
+        """
+        Yield rows from the current position.
+
+        A row the consumer rejects (by closing the generator while it is
+        outstanding) is pushed back and becomes the first row of the next page.
+        """
+        while True:
+            if self._pending:
+                row = self._pending.pop()
+            else:
+                try:
+                    row = next(self._rows)
+                except StopIteration:
+                    self.exhausted = True
+                    return
+            try:
+                yield row
+            except GeneratorExit:
+                self._pending.append(row)
+                raise
+            self.rows_returned += 1
+
+    def close(self) -> None:
+        """Release the underlying iterator (cancels a live stream, caches what was read)."""
+        close = getattr(self._rows, "close", None)
+        if callable(close):
+            close()
+
+
+class GaqlCursorRegistry:
+    """
+    Open cursors by ID with an idle timeout.
+
+    Every access pushes a cursor's expiry out by ttl_seconds; idle cursors and
+    the least recently used ones beyond max_cursors are closed.
+    """
+
+    def __init__(self, ttl_seconds: int = GAQL_CURSOR_TTL_SECONDS, max_cursors: int = GAQL_MAX_CURSORS):
+        self.ttl_seconds = ttl_seconds
+        self.max_cursors = max_cursors
+        self._cursors: "OrderedDict[str, GaqlCursor]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.expired = 0
+
+    def open(
+        self,
+        customer_id: str,
+        query: str,
+        columns: List[str],
+        rows: Iterator[Any],
+        as_values: bool = False
+    ) -> GaqlCursor:
+        """Register a row iterator and return its cursor."""
+        cursor = GaqlCursor(secrets.token_urlsafe(12), customer_id, query, columns, rows, as_values)
+        cursor.expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._cursors[cursor.cursor_id] = cursor
+            self.opened += 1
+            stale = self._evict(time.time())
+        self._close_all(stale)
+        return cursor
+
+    def get(self, cursor_id: str) -> GaqlCursor:
+        """
+        Return an open cursor and extend its expiry.
+
+        Raises:
+            ValueError: If the cursor is unknown, expired or already exhausted
+        """
+        with self._lock:
+            stale = self._evict(time.time())
+            cursor = self._cursors.get(cursor_id)
+            if cursor is not None:
+                cursor.expires_at = time.time() + self.ttl_seconds
+                self._cursors.move_to_end(cursor_id)
+        self._close_all(stale)
+        if cursor is None:
+            raise ValueError(
+                f"Cursor '{cursor_id}' is unknown or expired. Re-run the query with run_google_ads_gaql."
+            )
+        return cursor
+
+    def close(self, cursor_id: str) -> None:
+        """Close and forget a cursor; unknown IDs are ignored."""
+        with self._lock:
+            cursor = self._cursors.pop(cursor_id, None)
+        if cursor is not None:
+            self._close_all([cursor])
+
+    def clear(self) -> None:
+        """Close every open cursor."""
+        with self._lock:
+            cursors = list(self._cursors.values())
+            self._cursors.clear()
+        self._close_all(cursors)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cursor counters for diagnostics."""
+        return {
+            "open": len(self._cursors),
+            "opened": self.opened,
+            "expired": self.expired,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+    def _evict(self, now: float) -> List[GaqlCursor]:
+        stale = [cursor for cursor in self._cursors.values() if cursor.expires_at <= now]
+        for cursor in stale:
+            del self._cursors[cursor.cursor_id]
+        self.expired += len(stale)
+        while len(self._cursors) > self.max_cursors:
+            stale.append(self._cursors.popitem(last=False)[1])
+        return stale
+
+    @staticmethod
+    def _close_all(cursors: List[GaqlCursor]) -> None:
+        # Closed outside the registry lock; the cursor lock waits out a page in progress
+        for cursor in cursors:
+            with cursor.lock:
+                cursor.close()
+
+
+cursor_registry = GaqlCursorRegistry()
+
+
+def build_cursor_page(cursor: GaqlCursor, header: Dict[str, Any], page_size: int) -> str:
+    """
+    Render the next page of a cursor and close the cursor once it is exhausted.
+
+    Args:
+        cursor: Cursor returned by cursor_registry.open() or .get()
+        header: Fields emitted before the rows
+        page_size: Maximum rows in this page
+
+    Returns:
+        str: JSON (or columnar JSON) page with "next_cursor" when rows remain
+    """
+    with cursor.lock:
+        offset = cursor.rows_returned
+        header = dict(header, offset=offset, page_size=page_size)
+        if cursor.as_values:
+            header["format"] = GaqlResponseFormat.COLUMNAR.value
+            text = build_columnar_response(
+                header, cursor.columns, cursor.take(), max_rows=page_size,
+                next_cursor=cursor.cursor_id, offset=offset
+            )
+        else:
+            text = build_json_response(
+                header, cursor.take(), max_rows=page_size, next_cursor=cursor.cursor_id, offset=offset
+            )
+        exhausted = cursor.exhausted
+
+    if exhausted:
+        cursor_registry.close(cursor.cursor_id)
+    return text
+
+
+# ============================================================================
+# ACCOUNT HIERARCHY
+# ============================================================================
+
+_HIERARCHY_QUERY = """
+    SELECT
+        customer_client.id,
+        customer_client.descriptive_name,
+        customer_client.currency_code,
+        customer_client.time_zone,
+        customer_client.status,
+        customer_client.manager,
+        customer_client.test_account,
+        customer_client.level
+    FROM customer_client
+    WHERE customer_client.level <= 1
+"""
+_HIERARCHY_EXTRACTOR = GaqlRowExtractor.for_query(_HIERARCHY_QUERY)
+
+
+class AccountHierarchyCache:
+    """
+    In-memory copy of the full account tree under each MCC.
+
+    The tree is walked manager by manager (including nested sub-managers)
+    and every account is stored with its level and manager path. Lookups
+    are answered from memory; a daemon thread rebuilds each tree on a fixed
+    schedule, keeping the previous copy if a refresh fails.
+    """
+
+    def __init__(
+        self,
+        refresh_interval_seconds: int = ACCOUNT_REFRESH_INTERVAL_SECONDS,
+        background_refresh: bool = True
+    ):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.background_refresh = background_refresh
+        # mcc_id -> (loaded_at, accounts, client used to load them)
+        self._trees: Dict[str, Tuple[float, List[Dict[str, Any]], "GoogleAdsClient"]] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self.loads = 0
+        self.refresh_errors = 0
+        self.last_error: Optional[str] = None
+
+    def get_accounts(
+        self,
+        client: "GoogleAdsClient",
+        mcc_id: str,
+        force_refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Return every account under the MCC (managers and inactive accounts included).
+
+        The first call per MCC walks the hierarchy; later calls are served
+        from memory until the background refresher replaces the tree.
+        """
+        mcc_id = format_customer_id(mcc_id)
+        if not force_refresh:
+            with self._lock:
+                tree = self._trees.get(mcc_id)
+            if tree is not None:
+                return tree[1]
+
+        with self._load_lock:
+            # Another caller may have loaded the tree while we waited
+            with self._lock:
+                tree = self._trees.get(mcc_id)
+            if tree is not None and not force_refresh:
+                return tree[1]
+            accounts = self._load(client, mcc_id)
+
+        self._ensure_refresher()
+        return accounts
+
+    def find_by_name(self, mcc_id: str, name: str) -> List[Dict[str, Any]]:
+        """Return cached accounts whose name contains the text (case-insensitive)."""
+        with self._lock:
+            tree = self._trees.get(format_customer_id(mcc_id))
+        if tree is None:
+            return []
+        needle = name.lower()
+        return [account for account in tree[1] if needle in (account["name"] or "").lower()]
+
+    def refresh_all(self) -> None:
+        """Rebuild every cached tree, keeping the old copy when a walk fails."""
+        with self._lock:
+            targets = [(mcc_id, tree[2]) for mcc_id, tree in self._trees.items()]
+        for mcc_id, client in targets:
+            try:
+                with self._load_lock:
+                    self._load(client, mcc_id, priority=RequestPriority.BULK)
+            except Exception as e:
+                self.refresh_errors += 1
+                self.last_error = str(e)
+
+    def clear(self) -> None:
+        """Forget all cached trees."""
+        with self._lock:
+            self._trees.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache state for diagnostics."""
+        with self._lock:
+            trees = {
+                mcc_id: {"accounts": len(tree[1]), "age_seconds": round(time.time() - tree[0])}
+                for mcc_id, tree in self._trees.items()
+            }
+        return {
+            "trees": trees,
+            "loads": self.loads,
+            "refresh_errors": self.refresh_errors,
+            "last_error": self.last_error
+        }
+
+    def _load(
+        self,
+        client: "GoogleAdsClient",
+        mcc_id: str,
+        priority: RequestPriority = RequestPriority.INTERACTIVE
+    ) -> List[Dict[str, Any]]:
+        accounts = walk_account_hierarchy(client, mcc_id, priority)
+        with self._lock:
+            self._trees[mcc_id] = (time.time(), accounts, client)
+        self.loads += 1
+        return accounts
+
+    def _ensure_refresher(self) -> None:
+        if not self.background_refresh or self._refresher is not None:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop,
+            name="google-ads-account-refresher",
+            daemon=True
+        )
+        self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            time.sleep(self.refresh_interval_seconds)
+            self.refresh_all()
+
+
+def walk_account_hierarchy(
+    client: "GoogleAdsClient",
+    mcc_id: str,
+    priority: RequestPriority = RequestPriority.INTERACTIVE
+) -> List[Dict[str, Any]]:
+    """
+    Walk the account tree under a manager, descending into sub-managers.
+
+    Each manager is queried for its direct children (customer_client.level <= 1),
+    so every account is recorded with its depth and the chain of managers
+    above it.
+
+    Args:
+        client: GoogleAdsClient instance
+        mcc_id: Root manager account ID (no dashes)
+        priority: Scheduling lane (background refreshes run as bulk)
+
+    Returns:
+        Account dicts in breadth-first order, starting with the root manager
+    """
+    accounts: List[Dict[str, Any]] = []
+    seen = set()
+    pending = [(mcc_id, [])]
+
+    while pending:
+        manager_id, manager_path = pending.pop(0)
+        for row in iter_gaql_rows(client, manager_id, _HIERARCHY_QUERY, priority=priority):
+            (account_id, name, currency, timezone_name, status,
+             is_manager, is_test_account, level) = _HIERARCHY_EXTRACTOR.values(row)
+            account_id = str(account_id)
+            is_root_row = level == 0
+            if account_id in seen or (is_root_row and manager_path):
+                continue
+            seen.add(account_id)
+
+            path = manager_path if is_root_row else manager_path + [manager_id]
+            account = {
+                "id": account_id,
+                "name": name,
+                "currency": currency,
+                "timezone": timezone_name,
+                "status": status,
+                "is_manager": is_manager,
+                "is_test_account": is_test_account,
+                "level": len(path),
+                "manager_path": path
+            }
+            accounts.append(account)
+            if account["is_manager"] and not is_root_row:
+                pending.append((account_id, path))
+
+    return accounts
+
+
+account_hierarchy = AccountHierarchyCache()
+
+
+# ============================================================================
+# AGGREGATION
+# ============================================================================
+
+# Derived metric -> (numerator field, denominator field, calculator)
+DERIVED_METRICS: Dict[str, Tuple[str, str, Callable[[float, float], Optional[float]]]] = {
+    "roas": ("metrics.conversions_value", "metrics.cost_micros",
+             lambda value, cost_micros: calculate_roas(value, cost_micros / 1_000_000)),
+    "cvr": ("metrics.conversions", "metrics.clicks", calculate_cvr),
+    "ctr": ("metrics.clicks", "metrics.impressions",
+            lambda clicks, impressions: round(clicks / impressions * 100, 2) if impressions else None),
+    "cpa": ("metrics.cost_micros", "metrics.conversions",
+            lambda cost_micros, conversions: round(cost_micros / 1_000_000 / conversions, 2) if conversions else None),
+    "cpc": ("metrics.cost_micros", "metrics.clicks",
+            lambda cost_micros, clicks: round(cost_micros / 1_000_000 / clicks, 2) if clicks else None),
+}
+
+_HAVING_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class GaqlAggregator:
+    """
+    Group-by aggregation over flat GAQL value rows.
+
+    Each group gets a slot index; every aggregate keeps its running values
+    in an array('d') indexed by slot, so memory grows with the number of
+    groups rather than the number of rows. Fields ending in _micros are
+    reported in currency units.
+    """
+
+    def __init__(
+        self,
+        columns: List[str],
+        group_by: List[str],
+        metrics: List[Tuple[str, str, Optional[str]]],
+        derived: List[str]
+    ):
+        """
+        Args:
+            columns: SELECT field paths, in row order
+            group_by: Field paths to group on
+            metrics: (output name, function, field path) with function in
+                sum/avg/min/max/count; field is ignored for count
+            derived: Derived metric names from DERIVED_METRICS
+        """
+        positions = {column: index for index, column in enumerate(columns)}
+        needed = list(group_by) + [field for _, function, field in metrics if function != "count"]
+        for name in derived:
+            if name not in DERIVED_METRICS:
+                raise ValueError(f"Unknown derived metric '{name}'. Available: {', '.join(sorted(DERIVED_METRICS))}")
+            needed.extend(DERIVED_METRICS[name][:2])
+        missing = sorted({field for field in needed if field not in positions})
+        if missing:
+            raise ValueError(f"Fields missing from the SELECT clause: {', '.join(missing)}")
+
+        self.group_by = list(group_by)
+        self.metrics = metrics
+        self.derived = list(derived)
+        self._group_key = (
+            operator.itemgetter(*[positions[field] for field in group_by]) if group_by else (lambda values: ())
+        )
+        self._single_group_field = len(group_by) == 1
+        self._groups: Dict[Any, int] = {}
+        self._counts = array("d")
+        self.rows_scanned = 0
+
+        # One accumulator per distinct (function, field), shared by metrics and derived inputs
+        self._accumulators: Dict[Tuple[str, str], array] = {}
+        self._updates: List[Tuple[str, int, array]] = []
+        for _, function, field in metrics:
+            if function != "count":
+                self._accumulator(function, field, positions)
+        for name in derived:
+            numerator, denominator, _ = DERIVED_METRICS[name]
+            self._accumulator("sum", numerator, positions)
+            self._accumulator("sum", denominator, positions)
+
+    @property
+    def group_count(self) -> int:
+        """Number of distinct groups seen so far."""
+        return len(self._groups)
+
+    def add(self, values: Any) -> None:
+        """Fold one value row into its group."""
+        key = self._group_key(values)
+        slot = self._groups.get(key)
+        if slot is None:
+            slot = self._groups[key] = len(self._counts)
+            self._counts.append(0.0)
+            for function, _, accumulator in self._updates:
+                accumulator.append(
+                    float("inf") if function == "min" else float("-inf") if function == "max" else 0.0
+                )
+        self._counts[slot] += 1
+        for function, position, accumulator in self._updates:
+            value = values[position] or 0
+            if function == "min":
+                if value < accumulator[slot]:
+                    accumulator[slot] = value
+            elif function == "max":
+                if value > accumulator[slot]:
+                    accumulator[slot] = value
+            else:
+                accumulator[slot] += value
+        self.rows_scanned += 1
+
+    def results(
+        self,
+        having: Optional[List[Tuple[str, str, float]]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = True,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Return (rows, groups_matching) after HAVING, ORDER BY and LIMIT.
+
+        Rows without a value for the ordering metric sort last.
+
+        Raises:
+            ValueError: If a HAVING or ORDER BY name is not an output column
+        """
+        columns = set(self.group_by) | {name for name, _, _ in self.metrics} | set(self.derived)
+        for name in [name for name, _, _ in having or []] + ([order_by] if order_by else []):
+            if name not in columns:
+                raise ValueError(f"Unknown aggregate column '{name}'. Available: {', '.join(sorted(columns))}")
+
+        rows = []
+        for key, slot in self._groups.items():
+            keys = (key,) if self._single_group_field else key
+            row: Dict[str, Any] = dict(zip(self.group_by, keys))
+            for name, function, field in self.metrics:
+                row[name] = self._metric_value(function, field, slot)
+            for name in self.derived:
+                numerator, denominator, calculate = DERIVED_METRICS[name]
+                row[name] = calculate(
+                    self._accumulators[("sum", numerator)][slot],
+                    self._accumulators[("sum", denominator)][slot]
+                )
+            rows.append(row)
+
+        for name, op, threshold in having or []:
+            compare = _HAVING_OPERATORS[op]
+            rows = [row for row in rows if row.get(name) is not None and compare(row[name], threshold)]
+
+        order_by = order_by or (self.metrics[0][0] if self.metrics else (self.derived[0] if self.derived else None))
+        if order_by:
+            present = [row for row in rows if row.get(order_by) is not None]
+            absent = [row for row in rows if row.get(order_by) is None]
+            present.sort(key=operator.itemgetter(order_by), reverse=descending)
+            rows = present + absent
+
+        matching = len(rows)
+        return (rows[:limit] if limit else rows), matching
+
+    def _accumulator(self, function: str, field: str, positions: Dict[str, int]) -> None:
+        if (function, field) not in self._accumulators:
+            accumulator = array("d")
+            self._accumulators[(function, field)] = accumulator
+            self._updates.append((function, positions[field], accumulator))
+
+    def _metric_value(self, function: str, field: Optional[str], slot: int) -> Any:
+        count = self._counts[slot]
+        if function == "count":
+            return int(count)
+        value = self._accumulators[(function, field)][slot]
+        if function == "avg":
+            value = value / count if count else 0.0
+        if field.endswith("_micros"):
+            return format_micros(value)
+        return round(value, 2)
+
+
+# ============================================================================
+# SEARCH TERM N-GRAMS
+# ============================================================================
+
+# Words that make no useful negative keyword on their own
+NGRAM_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "i", "in", "is",
+    "it", "me", "my", "near", "of", "on", "or", "the", "to", "what", "where", "with", "you"
+})
+
+
+class NgramSpendAnalyzer:
+    """
+    Wasted-spend analysis of search terms by the 1- to max_n-word n-grams they share.
+
+    Rows are first folded per search term (a term repeats across ad groups
+    and dates) into array('d') columns indexed by term slot. results() then
+    tokenizes each distinct term once: a first pass sums zero-conversion
+    spend per n-gram over the non-converting terms, and a second pass
+    collects full totals and example terms for the top candidates only, so
+    memory for the n-gram columns stays proportional to the wasted n-grams.
+    """
+
+    def __init__(self, max_n: int = 3, min_terms: int = 2):
+        """
+        Args:
+            max_n: Longest n-gram, in words
+            min_terms: Fewest non-converting terms an n-gram must appear in
+        """
+        self.max_n = max_n
+        self.min_terms = min_terms
+        self._slots: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._cost = array("d")
+        self._clicks = array("d")
+        self._conversions = array("d")
+        self._value = array("d")
+        self.rows_scanned = 0
+
+    @property
+    def term_count(self) -> int:
+        """Number of distinct search terms seen so far."""
+        return len(self._terms)
+
+    def add(self, term: Optional[str], cost_micros: float, clicks: float, conversions: float, value: float) -> None:
+        """Fold one search term row into its term totals."""
+        self.rows_scanned += 1
+        if not term:
+            return
+        slot = self._slots.get(term)
+        if slot is None:
+            slot = self._slots[term] = len(self._terms)
+            self._terms.append(term)
+            self._cost.append(0.0)
+            self._clicks.append(0.0)
+            self._conversions.append(0.0)
+            self._value.append(0.0)
+        self._cost[slot] += cost_micros or 0
+        self._clicks[slot] += clicks or 0
+        self._conversions[slot] += conversions or 0
+        self._value[slot] += value or 0
+
+    def ngrams(self, term: str, words: Optional[List[str]] = None) -> set:
+        """Return the distinct n-grams of a term, up to max_n words long."""
+        words = words if words is not None else term.lower().split()
+        grams = set(words)
+        if self.max_n >= 2 and len(words) > 1:
+            grams.update(map(" ".join, zip(words, words[1:])))
+            if self.max_n >= 3 and len(words) > 2:
+                grams.update(map(" ".join, zip(words, words[1:], words[2:])))
+        return grams
+
+    def results(self, limit: int = 50, examples: int = 3) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Return (candidates, summary) ranked by zero-conversion spend.
+
+        N-grams made only of stopwords are skipped. Each candidate reports
+        its wasted spend and its totals over every term containing it, so
+        converting traffic a negative would also block is visible.
+        """
+        cost, conversions, ngrams = self._cost, self._conversions, self.ngrams
+
+        # Pass 1: zero-conversion spend per n-gram over the non-converting terms
+        gram_slots: Dict[str, int] = {}
+        find_slot = gram_slots.get
+        wasted = array("d")
+        wasted_terms = array("d")
+        wasted_total = 0.0
+        for slot, term in enumerate(self._terms):
+            term_cost = cost[slot]
+            if conversions[slot] or not term_cost:
+                continue
+            wasted_total += term_cost
+            for gram in ngrams(term):
+                index = find_slot(gram)
+                if index is None:
+                    gram_slots[gram] = len(wasted)
+                    wasted.append(term_cost)
+                    wasted_terms.append(1.0)
+                else:
+                    wasted[index] += term_cost
+                    wasted_terms[index] += 1
+
+        min_terms = self.min_terms
+        ranked = heapq.nlargest(
+            limit,
+            (
+                (wasted[index], gram) for gram, index in gram_slots.items()
+                if wasted_terms[index] >= min_terms and not NGRAM_STOPWORDS.issuperset(gram.split())
+            )
+        )
+        summary = {
+            "rows_scanned": self.rows_scanned,
+            "search_terms": self.term_count,
+            "ngrams_with_waste": len(gram_slots),
+            "wasted_cost_total": format_micros(wasted_total)
+        }
+        if not ranked:
+            return [], summary
+
+        # Pass 2: full totals and the costliest non-converting example terms for the candidates
+        candidates = {gram: index for index, (_, gram) in enumerate(ranked)}
+        candidate_words = {word for _, gram in ranked for word in gram.split()}
+        totals = [[0.0] * 5 for _ in ranked]  # terms, cost, clicks, conversions, value
+        samples: List[List[Tuple[float, str]]] = [[] for _ in ranked]
+        for slot, term in enumerate(self._terms):
+            words = term.lower().split()
+            # Only terms sharing a word with some candidate can contain one
+            if candidate_words.isdisjoint(words):
+                continue
+            for gram in ngrams(term, words):
+                index = candidates.get(gram)
+                if index is None:
+                    continue
+                total = totals[index]
+                total[0] += 1
+                total[1] += cost[slot]
+                total[2] += self._clicks[slot]
+                total[3] += conversions[slot]
+                total[4] += self._value[slot]
+                if examples and not conversions[slot] and cost[slot]:
+                    heap = samples[index]
+                    if len(heap) < examples:
+                        heapq.heappush(heap, (cost[slot], term))
+                    elif cost[slot] > heap[0][0]:
+                        heapq.heapreplace(heap, (cost[slot], term))
+
+        results = []
+        for (wasted_cost, gram), (terms, total_cost, clicks, total_conversions, value), heap in zip(
+            ranked, totals, samples
+        ):
+            results.append({
+                "ngram": gram,
+                "n": gram.count(" ") + 1,
+                "terms": int(terms),
+                "wasted_terms": int(wasted_terms[gram_slots[gram]]),
+                "wasted_cost": format_micros(wasted_cost),
+                "wasted_share": round(wasted_cost / wasted_total * 100, 2) if wasted_total else None,
+                "cost": format_micros(total_cost),
+                "clicks": int(clicks),
+                "conversions": round(total_conversions, 2),
+                "conversions_value": round(value, 2),
+                "cvr": calculate_cvr(total_conversions, clicks),
+                "roas": calculate_roas(value, total_cost / 1_000_000),
+                "examples": [
+                    {"search_term": term, "cost": format_micros(term_cost)}
+                    for term_cost, term in sorted(heap, reverse=True)
+                ]
+            })
+        return results, summary
+
+
+# ============================================================================
+# ANOMALY DETECTION
+# ============================================================================
+
+ANOMALY_QUERY = (
+    "SELECT customer.id, campaign.id, campaign.name, segments.date, metrics.cost_micros, "
+    "metrics.clicks, metrics.impressions, metrics.conversions, metrics.conversions_value "
+    "FROM campaign WHERE segments.date BETWEEN '{start}' AND '{end}' AND campaign.status != 'REMOVED'"
+)
+
+# Daily base columns held in the campaign x day matrix, in ANOMALY_QUERY order
+_ANOMALY_COLUMNS = ("cost_micros", "clicks", "impressions", "conversions", "conversions_value")
+
+# Scales the MAD so robust z-scores match standard z-scores on normal data
+MAD_Z_SCALE = 0.6745
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator else math.nan
+
+
+# Metric -> daily value from the base columns (NaN where undefined)
+ANOMALY_METRICS: Dict[str, Callable[[float, float, float, float, float], float]] = {
+    "cost": lambda cost, clicks, impressions, conversions, value: cost / 1_000_000,
+    "conversions": lambda cost, clicks, impressions, conversions, value: conversions,
+    "ctr": lambda cost, clicks, impressions, conversions, value: _ratio(clicks * 100, impressions),
+    "roas": lambda cost, clicks, impressions, conversions, value: _ratio(value * 1_000_000, cost),
+}
+
+
+def _sorted_median(ordered: List[float]) -> float:
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def robust_z_score(value: float, baseline: List[float]) -> Optional[Tuple[float, float, float]]:
+    """
+    Return (z, median, mad) of value against baseline values, or None.
+
+    The modified z-score 0.6745 * (value - median) / MAD resists the
+    outliers it is looking for. When more than half the baseline is
+    identical (MAD of 0) the mean absolute deviation stands in; a
+    constant baseline returns None rather than an infinite score.
+    """
+    ordered = sorted(baseline)
+    median = _sorted_median(ordered)
+    deviations = sorted(abs(point - median) for point in ordered)
+    mad = _sorted_median(deviations)
+    if mad:
+        return MAD_Z_SCALE * (value - median) / mad, median, mad
+    mean_deviation = sum(deviations) / len(deviations)
+    if mean_deviation:
+        # 1.2533 = sqrt(pi / 2) scales the mean absolute deviation like the MAD
+        return (value - median) / (1.2533 * mean_deviation), median, mad
+    return None
+
+
+class CampaignAnomalyDetector:
+    """
+    Rolling robust z-scores over a dense campaign x day matrix.
+
+    Every base column is one array('d') of campaigns * days cells, row-major
+    by campaign, filled straight from the daily campaign stream (days with
+    no row stay 0, as the API omits them). scan() derives each metric for a
+    campaign's whole row at once and scores each of the last detect_days
+    against the baseline_days before it, so thousands of campaigns cost one
+    query per account.
+    """
+
+    def __init__(self, start: date, baseline_days: int = 28, detect_days: int = 7):
+        self.start = start
+        self.baseline_days = baseline_days
+        self.detect_days = detect_days
+        self.days = baseline_days + detect_days
+        self._columns = {column: array("d") for column in _ANOMALY_COLUMNS}
+        self._zeros = array("d", bytes(8 * self.days))
+        self._slots: Dict[Tuple[str, str], int] = {}
+        self._names: List[Optional[str]] = []
+        self._lock = threading.Lock()
+        self.rows_scanned = 0
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=self.days - 1)
+
+    @property
+    def campaign_count(self) -> int:
+        return len(self._names)
+
+    def add(self, values: Any) -> None:
+        """Place one ANOMALY_QUERY value row in its campaign x day cell. Thread-safe."""
+        customer_id, campaign_id, name, day = values[:4]
+        offset = (date.fromisoformat(day) - self.start).days
+        if not 0 <= offset < self.days:
+            return
+        key = (str(customer_id), str(campaign_id))
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = len(self._names)
+                self._names.append(name)
+                for column in self._columns.values():
+                    column.extend(self._zeros)
+            cell = slot * self.days + offset
+            for column, value in zip(self._columns.values(), values[4:]):
+                column[cell] += value or 0
+            self.rows_scanned += 1
+
+    def scan(
+        self,
+        metrics: Iterable[str] = tuple(ANOMALY_METRICS),
+        z_threshold: float = 3.5,
+        min_active_days: int = 7
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the flagged cells, largest |z| first.
+
+        A campaign is scored only if it had impressions on at least
+        min_active_days of a cell's baseline window; undefined ratio
+        days (no impressions or no cost) are left out of baselines.
+        """
+        days, baseline_days = self.days, self.baseline_days
+        columns = [self._columns[column] for column in _ANOMALY_COLUMNS]
+        impressions_column = self._columns["impressions"]
+        metric_functions = [(name, ANOMALY_METRICS[name]) for name in metrics]
+        flagged = []
+
+        for (customer_id, campaign_id), slot in self._slots.items():
+            row = slice(slot * days, (slot + 1) * days)
+            active = [1 if impressions else 0 for impressions in impressions_column[row]]
+            offsets = [
+                offset for offset in range(baseline_days, days)
+                if sum(active[offset - baseline_days:offset]) >= min_active_days
+            ]
+            if not offsets:
+                continue
+            series_columns = [column[row] for column in columns]
+            for name, function in metric_functions:
+                series = list(map(function, *series_columns))
+                for offset in offsets:
+                    value = series[offset]
+                    baseline = [point for point in series[offset - baseline_days:offset] if not math.isnan(point)]
+                    if math.isnan(value) or len(baseline) < min_active_days:
+                        continue
+                    score = robust_z_score(value, baseline)
+                    if score is None or abs(score[0]) < z_threshold:
+                        continue
+                    z, median, mad = score
+                    flagged.append({
+                        "customer_id": customer_id,
+                        "campaign_id": campaign_id,
+                        "campaign_name": self._names[slot],
+                        "date": (self.start + timedelta(days=offset)).isoformat(),
+                        "metric": name,
+                        "value": round(value, 2),
+                        "baseline_median": round(median, 2),
+                        "baseline_mad": round(mad, 2),
+                        "z_score": round(z, 2),
+                        "direction": "up" if z > 0 else "down",
+                        "change_pct": round((value - median) / median * 100, 1) if median else None
+                    })
+
+        flagged.sort(key=lambda cell: abs(cell["z_score"]), reverse=True)
+        return flagged
+
+
+# ============================================================================
+# BUDGET PACING
+# ============================================================================
+
+# Unsegmented, so every non-removed campaign returns one row with its month-to-date cost (zero included)
+BUDGET_PACING_QUERY = (
+    "SELECT campaign.id, campaign.status, campaign_budget.id, campaign_budget.amount_micros, "
+    "campaign_budget.period, metrics.cost_micros FROM campaign "
+    "WHERE segments.date BETWEEN '{start}' AND '{end}' AND campaign.status != 'REMOVED'"
+)
+
+
+class BudgetPacer:
+    """
+    Month-to-date spend against daily budgets, per account.
+
+    Campaign rows from BUDGET_PACING_QUERY are folded per account: cost is
+    summed over every campaign, and the daily budgets of enabled campaigns
+    are counted once per budget (shared budgets serve several campaigns).
+    Projections assume the month-to-date daily run rate continues and the
+    current budgets held all month.
+    """
+
+    def __init__(self, month_start: date, as_of: date):
+        """
+        Args:
+            month_start: First day of the month being paced
+            as_of: Last complete day included in the spend
+        """
+        self.month_start = month_start
+        self.as_of = as_of
+        next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        self.days_in_month = (next_month - month_start).days
+        self.days_elapsed = (as_of - month_start).days + 1
+        self._cost: Dict[str, float] = {}
+        self._budgets: Dict[str, Dict[Any, float]] = {}
+        self._campaigns: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, customer_id: str, values: Any) -> None:
+        """Fold one BUDGET_PACING_QUERY value row into its account. Thread-safe."""
+        _, status, budget_id, amount_micros, period, cost_micros = values
+        with self._lock:
+            self._cost[customer_id] = self._cost.get(customer_id, 0.0) + (cost_micros or 0)
+            budgets = self._budgets.setdefault(customer_id, {})
+            if status == "ENABLED" and period == "DAILY" and budget_id is not None:
+                budgets[budget_id] = amount_micros or 0
+                self._campaigns[customer_id] = self._campaigns.get(customer_id, 0) + 1
+
+    def results(self, accounts: List[Dict[str, Any]], tolerance_pct: float = 10.0) -> List[Dict[str, Any]]:
+        """
+        Return one pacing row per account, furthest from 100% pace first.
+
+        Status is "over" or "under" when projected spend is more than
+        tolerance_pct away from the monthly budget, "on_pace" otherwise,
+        and "no_budget" for accounts without enabled daily budgets.
+        """
+        rows = []
+        for account in accounts:
+            customer_id = account["id"]
+            cost = self._cost.get(customer_id, 0.0)
+            daily_budget = sum(self._budgets.get(customer_id, {}).values())
+            monthly_budget = daily_budget * self.days_in_month
+            projected = cost / self.days_elapsed * self.days_in_month
+            pace = round(projected / monthly_budget * 100, 1) if monthly_budget else None
+            if pace is None:
+                status = "no_budget"
+            elif pace > 100 + tolerance_pct:
+                status = "over"
+            elif pace < 100 - tolerance_pct:
+                status = "under"
+            else:
+                status = "on_pace"
+            rows.append({
+                "customer_id": customer_id,
+                "name": account.get("name"),
+                "currency": account.get("currency"),
+                "enabled_campaigns": self._campaigns.get(customer_id, 0),
+                "daily_budget": format_micros(daily_budget),
+                "monthly_budget": format_micros(monthly_budget),
+                "cost_to_date": format_micros(cost),
+                "expected_to_date": format_micros(daily_budget * self.days_elapsed),
+                "projected_month_end": format_micros(projected),
+                "pace_pct": pace,
+                "status": status
+            })
+        rows.sort(key=lambda row: -1 if row["pace_pct"] is None else abs(row["pace_pct"] - 100), reverse=True)
+        return rows
+
+
+# ============================================================================
+# SHOPPING PRODUCTS
+# ============================================================================
+
+# Product-level rows (no campaign or date segments, so one row per product)
+SHOPPING_PRODUCT_QUERY = (
+    "SELECT segments.product_item_id, segments.product_title, segments.product_brand, "
+    "segments.product_type_l1, metrics.impressions, metrics.clicks, metrics.cost_micros, "
+    "metrics.conversions, metrics.conversions_value FROM shopping_performance_view "
+    "WHERE segments.date DURING {date_range}"
+)
+
+# Sort metric -> value from (impressions, clicks, cost_micros, conversions, conversions_value); None is unranked
+SHOPPING_SORT_METRICS: Dict[str, Callable[[float, float, float, float, float], Optional[float]]] = {
+    "roas": lambda impressions, clicks, cost, conversions, value: calculate_roas(value, cost / 1_000_000),
+    "cost": lambda impressions, clicks, cost, conversions, value: cost / 1_000_000,
+    "conversions": lambda impressions, clicks, cost, conversions, value: conversions,
+    "conversions_value": lambda impressions, clicks, cost, conversions, value: value,
+    "clicks": lambda impressions, clicks, cost, conversions, value: clicks,
+    "cvr": lambda impressions, clicks, cost, conversions, value: calculate_cvr(conversions, clicks),
+    "cpa": lambda impressions, clicks, cost, conversions, value: (
+        round(cost / 1_000_000 / conversions, 2) if conversions else None
+    ),
+}
+
+
+class BoundedTopN:
+    """
+    The n items with the largest (or smallest) keys from a stream.
+
+    Keeps a heap of at most n entries whose root is the weakest kept item,
+    so each new item costs one comparison when it doesn't qualify and
+    O(log n) when it does; memory is fixed by n, not by the stream length.
+    Ties keep the earlier item.
+    """
+
+    def __init__(self, n: int, descending: bool = True):
+        self.n = n
+        self._sign = 1 if descending else -1
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._sequence = 0
+        self.offered = 0
+
+    def offer(self, key: float, item: Any) -> None:
+        """Consider one item for the top n."""
+        self.offered += 1
+        # Earlier items win ties: a smaller negated sequence ranks lower in the heap
+        entry = (self._sign * key, -self._sequence, item)
+        self._sequence += 1
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Any]:
+        """Return the kept items, best first."""
+        return [item for _, _, item in sorted(self._heap, reverse=True)]
+
+
+# ============================================================================
+# LOCAL RESULT STORE
+# ============================================================================
+
+_STORE_TABLE_PATTERN = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+_READ_ONLY_SQL_PATTERN = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+
+
+class GaqlResultStore:
+    """
+    Embedded SQLite store for GAQL result sets.
+
+    A streamed result is inserted in fixed-size batches, so tables with
+    millions of rows are written with bounded memory. Follow-up questions
+    run as read-only SQL on a separate query_only connection, and their
+    rows are streamed back the same way.
+    """
+
+    METADATA_TABLE = "_gaql_tables"
+
+    def __init__(self, path: str = GAQL_STORE_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+
+    def store_rows(
+        self,
+        table: str,
+        columns: List[str],
+        rows: Iterable[Any],
+        customer_id: str,
+        query: str
+    ) -> int:
+        """
+        Replace table with the given value rows.
+
+        The replacement is one transaction: if rows raises part-way, the
+        previous table and its metadata are left untouched.
+
+        Args:
+            table: Table name (lowercase letters, digits, underscores)
+            columns: Field paths; stored as column names with dots replaced by underscores
+            rows: Iterable of value sequences matching columns
+            customer_id: Account the rows came from (recorded in metadata)
+            query: GAQL query that produced the rows (recorded in metadata)
+
+        Returns:
+            Number of rows stored
+        """
+        table = validate_store_table_name(table)
+        column_names = [column.replace(".", "_") for column in columns]
+        column_sql = ", ".join(f'"{name}"' for name in column_names)
+        insert_sql = f'INSERT INTO "{table}" VALUES ({", ".join("?" for _ in column_names)})'
+
+        with self._write_lock:
+            connection = sqlite3.connect(self.path)
+            try:
+                # sqlite3 runs DDL in autocommit unless a transaction is open; open one so a
+                # failed stream rolls back to the previous table and its metadata row
+                connection.execute("BEGIN")
+                connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{self.METADATA_TABLE}" '
+                    "(table_name TEXT PRIMARY KEY, customer_id TEXT, query TEXT, "
+                    "columns TEXT, row_count INTEGER, stored_at TEXT)"
+                )
+                connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+                connection.execute(f'CREATE TABLE "{table}" ({column_sql})')
+
+                count = 0
+                batch: List[Tuple[Any, ...]] = []
+                for values in rows:
+                    batch.append(tuple(
+                        json.dumps(value) if isinstance(value, (list, dict)) else value
+                        for value in values
+                    ))
+                    if len(batch) >= STORE_INSERT_BATCH_SIZE:
+                        connection.executemany(insert_sql, batch)
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    connection.executemany(insert_sql, batch)
+                    count += len(batch)
+
+                connection.execute(
+                    f'INSERT OR REPLACE INTO "{self.METADATA_TABLE}" VALUES (?, ?, ?, ?, ?, datetime(\'now\'))',
+                    (table, customer_id, query, json.dumps(column_names), count)
+                )
+                connection.commit()
+                return count
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                connection.close()
+
+    def list_tables(self) -> List[Dict[str, Any]]:
+        """Return metadata for every stored table."""
+        if not os.path.exists(self.path):
+            return []
+        try:
+            cursor = self.query(
+                "SELECT table_name, customer_id, row_count, stored_at, columns, query "
+                f'FROM "{self.METADATA_TABLE}" ORDER BY stored_at DESC'
+            )
+        except sqlite3.OperationalError:
+            return []
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in iter_cursor_rows(cursor)]
+
+    def query(self, sql: str) -> sqlite3.Cursor:
+        """
+        Execute one read-only SELECT/WITH statement and return its cursor.
+
+        The connection is opened read-only with query_only set, so nothing
+        can be modified even by a crafted statement. The caller iterates the
+        cursor (rows are fetched lazily) and must close cursor.connection,
+        e.g. via iter_cursor_rows().
+
+        Raises:
+            ValueError: If the SQL is not a SELECT/WITH statement
+        """
+        statement = sql.strip().rstrip(";").strip()
+        if not _READ_ONLY_SQL_PATTERN.match(statement):
+            raise ValueError("Only a single SELECT (or WITH ... SELECT) statement is allowed.")
+        if not os.path.exists(self.path):
+            raise ValueError("No stored results yet. Run run_google_ads_gaql with store_as first.")
+
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            connection.execute("PRAGMA query_only = ON")
+            # sqlite3 refuses to execute more than one statement per call
+            return connection.execute(statement)
+        except Exception:
+            connection.close()
+            raise
+
+
+def validate_store_table_name(table: str) -> str:
+    """Return a lower-cased table name or raise ValueError if it is not a plain identifier."""
+    name = table.strip().lower()
+    if not _STORE_TABLE_PATTERN.match(name) or name == GaqlResultStore.METADATA_TABLE:
+        raise ValueError(
+            "Table names must start with a letter or underscore and contain only "
+            "letters, digits and underscores (max 63 characters)."
+        )
+    return name
+
+
+def iter_cursor_rows(cursor: sqlite3.Cursor, as_dicts: bool = False) -> Iterator[Any]:
+    """Yield rows from a store cursor, closing its connection when done or abandoned."""
+    names = [column[0] for column in cursor.description] if as_dicts else None
+    try:
+        for row in cursor:
+            yield dict(zip(names, row)) if as_dicts else row
+    finally:
+        cursor.connection.close()
+
+
+def _remove_session_store(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+result_store = GaqlResultStore()
+if not os.getenv("GOOGLE_ADS_STORE_PATH", "").strip():
+    # The default store is session-scoped: drop it when the server exits
+    atexit.register(_remove_session_store, result_store.path)
+
+
+# ============================================================================
+# INCREMENTAL METRICS SYNC
+# ============================================================================
+
+_SYNC_METRIC_FIELDS = (
+    "metrics.impressions, metrics.clicks, metrics.cost_micros, "
+    "metrics.conversions, metrics.conversions_value"
+)
+
+# resource -> (GAQL template with {start}/{end}, key field paths besides segments.date)
+SYNC_RESOURCES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "campaign": (
+        "SELECT segments.date, campaign.id, campaign.name, campaign.status, "
+        f"{_SYNC_METRIC_FIELDS} FROM campaign "
+        "WHERE segments.date BETWEEN '{start}' AND '{end}'",
+        ("campaign.id",),
+    ),
+    "ad_group": (
+        "SELECT segments.date, campaign.id, ad_group.id, ad_group.name, ad_group.status, "
+        f"{_SYNC_METRIC_FIELDS} FROM ad_group "
+        "WHERE segments.date BETWEEN '{start}' AND '{end}'",
+        ("ad_group.id",),
+    ),
+    "keyword": (
+        "SELECT segments.date, campaign.id, ad_group.id, ad_group_criterion.criterion_id, "
+        "ad_group_criterion.keyword.text, ad_group_criterion.keyword.match_type, "
+        f"{_SYNC_METRIC_FIELDS} FROM keyword_view "
+        "WHERE segments.date BETWEEN '{start}' AND '{end}'",
+        ("ad_group.id", "ad_group_criterion.criterion_id"),
+    ),
+}
+
+
+_TIME_ZONE_QUERY = "SELECT customer.time_zone FROM customer"
+
+
+def fetch_account_time_zone(client: "GoogleAdsClient", customer_id: str) -> Optional[str]:
+    """Return an account's reporting time zone (customer.time_zone), or None when it isn't set."""
+    rows = iter_serialized_gaql_rows(
+        client, customer_id, _TIME_ZONE_QUERY, as_values=True, priority=RequestPriority.BULK
+    )
+    try:
+        for (time_zone,) in rows:
+            return time_zone or None
+    finally:
+        rows.close()
+    return None
+
+
+class MetricsSyncEngine:
+    """
+    Incremental daily metrics sync into a persistent SQLite file.
+
+    For each (account, resource) a watermark records the last synced
+    segments.date. A sync fetches only the days after the watermark plus a
+    restatement window before it (conversions keep arriving for days after
+    the click), replaces those days in the table and moves the watermark
+    in the same transaction. Reports then read the local tables.
+    """
+
+    WATERMARK_TABLE = "_sync_watermarks"
+
+    def __init__(self, path: str = METRICS_SYNC_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+
+    def get_watermark(self, customer_id: str, resource: str) -> Optional[date]:
+        """Return the last synced date for an account and resource, if any."""
+        if not os.path.exists(self.path):
+            return None
+        connection = sqlite3.connect(self.path)
+        try:
+            row = connection.execute(
+                f'SELECT last_date FROM "{self.WATERMARK_TABLE}" WHERE customer_id = ? AND resource = ?',
+                (customer_id, resource)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        finally:
+            connection.close()
+        return date.fromisoformat(row[0]) if row else None
+
+    def plan_window(
+        self,
+        customer_id: str,
+        resource: str,
+        lookback_days: int,
+        restatement_days: int,
+        today: Optional[date] = None
+    ) -> Optional[Tuple[date, date]]:
+        """
+        Return the (start, end) dates to fetch, or None when already up to date.
+
+        The window ends the day before today, which should be the current date
+        in the account's time zone (the server's date when omitted), so only
+        complete days are synced and watermarked. Without a watermark it
+        covers lookback_days; otherwise it starts restatement_days before the
+        day after the watermark.
+        """
+        end = (today or date.today()) - timedelta(days=1)
+        watermark = self.get_watermark(customer_id, resource)
+        if watermark is None:
+            return end - timedelta(days=lookback_days - 1), end
+
+        start = watermark + timedelta(days=1) - timedelta(days=restatement_days)
+        start = max(start, end - timedelta(days=lookback_days - 1))
+        if start > end:
+            return None
+        return start, end
+
+    def sync(
+        self,
+        client: "GoogleAdsClient",
+        customer_id: str,
+        resource: str,
+        lookback_days: int = 90,
+        restatement_days: int = 7,
+        today: Optional[date] = None,
+        time_zone: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Sync one account and resource; returns a summary of the work done.
+
+        Without today, the current date is taken in the account's time zone
+        (time_zone, or customer.time_zone fetched from the API when omitted),
+        because segments.date is reported in that zone.
+
+        Raises:
+            ValueError: If resource is not in SYNC_RESOURCES, or the existing
+                table's primary key or columns no longer match it
+        """
+        if resource not in SYNC_RESOURCES:
+            raise ValueError(f"Unknown resource '{resource}'. Available: {', '.join(SYNC_RESOURCES)}")
+
+        customer_id = format_customer_id(customer_id)
+        if today is None:
+            if time_zone is None:
+                time_zone = fetch_account_time_zone(client, customer_id)
+            today = earliest_account_date([{"id": customer_id, "timezone": time_zone}])
+        window = self.plan_window(customer_id, resource, lookback_days, restatement_days, today)
+        if window is None:
+            return {"customer_id": customer_id, "resource": resource, "status": "up_to_date", "rows": 0}
+
+        start, end = window
+        template, key_fields = SYNC_RESOURCES[resource]
+        query = template.format(start=start.isoformat(), end=end.isoformat())
+        columns = parse_select_fields(query)
+        column_names = ["customer_id"] + [column.replace(".", "_") for column in columns]
+        key_names = ["customer_id", "segments_date"] + [field.replace(".", "_") for field in key_fields]
+        table = f"{resource}_daily"
+
+        column_sql = ", ".join(f'"{name}"' for name in column_names)
+        insert_sql = (
+            f'INSERT OR REPLACE INTO "{table}" ({column_sql}) '
+            f'VALUES ({", ".join("?" for _ in column_names)})'
+        )
+        rows = iter_serialized_gaql_rows(
+            client, customer_id, query, use_cache=False, as_values=True, priority=RequestPriority.BULK
+        )
+
+        count = 0
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path)
+            try:
+                connection.execute("BEGIN")
+                connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{self.WATERMARK_TABLE}" '
+                    "(customer_id TEXT, resource TEXT, last_date TEXT, synced_at TEXT, "
+                    "PRIMARY KEY (customer_id, resource))"
+                )
+                self._ensure_table(connection, table, column_names, key_names)
+                # Restated days are replaced wholesale so rows that disappeared upstream go too
+                connection.execute(
+                    f'DELETE FROM "{table}" WHERE customer_id = ? AND segments_date BETWEEN ? AND ?',
+                    (customer_id, start.isoformat(), end.isoformat())
+                )
+                # Rows stream into the open transaction in batches, so a failed fetch
+                # rolls back the delete and leaves the watermark where it was
+                batch: List[Tuple[Any, ...]] = []
+                for row in rows:
+                    batch.append((customer_id,) + tuple(row))
+                    if len(batch) >= STORE_INSERT_BATCH_SIZE:
+                        connection.executemany(insert_sql, batch)
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    connection.executemany(insert_sql, batch)
+                    count += len(batch)
+                connection.execute(
+                    f'INSERT OR REPLACE INTO "{self.WATERMARK_TABLE}" VALUES (?, ?, ?, datetime(\'now\'))',
+                    (customer_id, resource, end.isoformat())
+                )
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                rows.close()
+                connection.close()
+
+        return {
+            "customer_id": customer_id,
+            "resource": resource,
+            "status": "synced",
+            "table": table,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "days": (end - start).days + 1,
+            "rows": count
+        }
+
+    @staticmethod
+    def _ensure_table(
+        connection: sqlite3.Connection,
+        table: str,
+        column_names: List[str],
+        key_names: List[str]
+    ) -> None:
+        """
+        Create table, or bring an existing one up to the current column list.
+
+        Columns added to SYNC_RESOURCES are appended (older rows hold NULL until
+        restated). A changed primary key or a column that is no longer synced
+        can't be migrated in place and raises ValueError.
+        """
+        existing = connection.execute(f'PRAGMA table_info("{table}")').fetchall()
+        if not existing:
+            column_sql = ", ".join(f'"{name}"' for name in column_names)
+            connection.execute(f'CREATE TABLE "{table}" ({column_sql}, PRIMARY KEY ({", ".join(key_names)}))')
+            return
+
+        names = [column[1] for column in existing]
+        keys = [column[1] for column in sorted(existing, key=lambda column: column[5]) if column[5]]
+        if keys != key_names:
+            raise ValueError(
+                f"Table {table} has primary key ({', '.join(keys)}) but the sync now uses "
+                f"({', '.join(key_names)}). Drop or rename the table to resync it."
+            )
+        dropped = [name for name in names if name not in column_names]
+        if dropped:
+            raise ValueError(
+                f"Table {table} has columns that are no longer synced: {', '.join(dropped)}. "
+                "Drop or rename the table to resync it."
+            )
+        for name in column_names:
+            if name not in names:
+                connection.execute(f'ALTER TABLE "{table}" ADD COLUMN "{name}"')
+
+    def list_tables(self) -> List[Dict[str, Any]]:
+        """Return each synced table with its columns, row count and per-account watermarks."""
+        if not os.path.exists(self.path):
+            return []
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            try:
+                watermarks = connection.execute(
+                    f'SELECT resource, customer_id, last_date, synced_at FROM "{self.WATERMARK_TABLE}" '
+                    "ORDER BY resource, customer_id"
+                ).fetchall()
+            except sqlite3.OperationalError:
+                return []
+            names = [row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%\\_daily' ESCAPE '\\' ORDER BY name"
+            )]
+            tables = []
+            for name in names:
+                resource = name[:-len("_daily")]
+                tables.append({
+                    "table_name": name,
+                    "row_count": connection.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0],
+                    "columns": [column[1] for column in connection.execute(f'PRAGMA table_info("{name}")')],
+                    "accounts": [
+                        {"customer_id": customer_id, "last_date": last_date, "synced_at": synced_at}
+                        for table_resource, customer_id, last_date, synced_at in watermarks
+                        if table_resource == resource
+                    ]
+                })
+            return tables
+        finally:
+            connection.close()
+
+
+metrics_sync = MetricsSyncEngine()
+metrics_store = GaqlResultStore(METRICS_SYNC_PATH)
+
+
+# ============================================================================
+# INPUT MODELS
+# ============================================================================
+
+class DateRange(str, Enum):
+    """Predefined date ranges for Google Ads queries."""
+    TODAY = "TODAY"
+    YESTERDAY = "YESTERDAY"
+    LAST_7_DAYS = "LAST_7_DAYS"
+    LAST_14_DAYS = "LAST_14_DAYS"
+    LAST_30_DAYS = "LAST_30_DAYS"
+    LAST_BUSINESS_WEEK = "LAST_BUSINESS_WEEK"
+    THIS_MONTH = "THIS_MONTH"
+    LAST_MONTH = "LAST_MONTH"
+    THIS_WEEK_SUN_TODAY = "THIS_WEEK_SUN_TODAY"
+    THIS_WEEK_MON_TODAY = "THIS_WEEK_MON_TODAY"
+
+
+class ResponseFormat(str, Enum):
+    """Output format for tool responses."""
+    MARKDOWN = "markdown"
+    JSON = "json"
+
+
+class GaqlResponseFormat(str, Enum):
+    """Output format for GAQL query results."""
+    JSON = "json"
+    COLUMNAR = "columnar"
+
+
+class RunGoogleAdsGaqlInput(BaseModel):
+    """Input for running a raw GAQL query."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    customer_id: str = Field(
+        ...,
+        description="Google Ads customer ID (format: 1234567890 or 123-456-7890)",
+        min_length=10,
+        max_length=12
+    )
+    query: str = Field(
+        ...,
+        description="The Google Ads Query Language (GAQL) query to execute."
+    )
+    page_size: int = Field(
+        default=100,
+        description=(
+            "Rows per page. When more rows remain the response ends with next_cursor; pass it to "
+            "run_google_ads_gaql_next_page to continue without re-running the query."
+        ),
+        ge=1,
+        le=10000
+    )
+    use_streaming: bool = Field(
+        default=False,
+        description="Use streaming mode to fetch as many rows as fit in one response (ignores page_size, no cursor)."
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Serve repeated queries from the short-lived result cache. Set false to force fresh data from the API."
+    )
+    response_format: GaqlResponseFormat = Field(
+        default=GaqlResponseFormat.JSON,
+        description=(
+            "'json' returns one nested object per row; 'columnar' returns field paths once, "
+            "rows as value arrays and repeated strings dictionary-encoded - several times more rows per response."
+        )
+    )
+    store_as: Optional[str] = Field(
+        default=None,
+        description=(
+            "Store the FULL result in a local SQLite table with this name instead of returning rows. "
+            "Query it afterwards with google_ads_query_store - no further API calls."
+        )
+    )
+    auto_fix: bool = Field(
+        default=True,
+        description=(
+            "Repair unambiguous query problems before sending (duplicate fields, enum value case). "
+            "Applied fixes are listed in query_fixes."
+        )
+    )
+
+    @field_validator("store_as")
+    @classmethod
+    def validate_store_as(cls, value: Optional[str]) -> Optional[str]:
+        return validate_store_table_name(value) if value else value
+
+
+class ValidateGaqlInput(BaseModel):
+    """Input for validating a GAQL query without running it."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    query: str = Field(
+        ...,
+        description="The Google Ads Query Language (GAQL) query to check."
+    )
+    auto_fix: bool = Field(
+        default=True,
+        description="Return a repaired query when the only problems are unambiguous (duplicate fields, enum case)."
+    )
+
+
+class GaqlNextPageInput(BaseModel):
+    """Input for fetching the next page of a paged GAQL result."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    cursor: str = Field(
+        ...,
+        description="The next_cursor value from a previous run_google_ads_gaql or run_google_ads_gaql_next_page response",
+        min_length=1
+    )
+    page_size: int = Field(
+        default=100,
+        description="Rows in this page",
+        ge=1,
+        le=10000
+    )
+
+
+class ListAccountsInput(BaseModel):
+    """Input for listing Google Ads accounts under MCC."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    response_format: ResponseFormat = Field(
+        default=ResponseFormat.MARKDOWN,
+        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+    )
+    name_contains: Optional[str] = Field(
+        default=None,
+        description="Only return accounts whose name contains this text (case-insensitive)."
+    )
+    include_managers: bool = Field(
+        default=False,
+        description="Include manager (MCC) accounts from the hierarchy."
+    )
+    include_inactive: bool = Field(
+        default=False,
+        description="Include accounts that are not ENABLED (cancelled, suspended, closed)."
+    )
+    refresh: bool = Field(
+        default=False,
+        description="Rebuild the cached account hierarchy before answering."
+    )
+
+
+class RunGaqlAcrossAccountsInput(BaseModel):
+    """Input for running one GAQL query across many accounts."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    query: str = Field(
+        ...,
+        description="The GAQL query to run in every selected account."
+    )
+    customer_ids: Optional[List[str]] = Field(
+        default=None,
+        description="Account IDs to query (e.g. ['1234567890', '123-456-7891']). Omit to query all accounts under the MCC."
+    )
+    account_name_pattern: Optional[str] = Field(
+        default=None,
+        description="Case-insensitive name pattern with * wildcards (e.g. '*shoes*') to select accounts."
+    )
+    max_parallel: int = Field(
+        default=8,
+        description="Maximum number of accounts queried at the same time (also bounded by GOOGLE_ADS_BULK_CONCURRENCY).",
+        ge=1,
+        le=50
+    )
+    max_rows_per_account: int = Field(
+        default=1000,
+        description="Maximum rows read from each account.",
+        ge=1,
+        le=100000
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Serve repeated per-account queries from the result cache."
+    )
+
+
+class AggregateFunction(str, Enum):
+    """Aggregate functions for server-side aggregation."""
+    SUM = "sum"
+    AVG = "avg"
+    MIN = "min"
+    MAX = "max"
+    COUNT = "count"
+
+
+class AggregateMetricSpec(BaseModel):
+    """One aggregate column."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    name: str = Field(..., description="Output column name (e.g. 'cost')", min_length=1)
+    function: AggregateFunction = Field(default=AggregateFunction.SUM, description="sum, avg, min, max or count")
+    field: Optional[str] = Field(
+        default=None,
+        description="SELECT field path to aggregate (e.g. 'metrics.cost_micros'); not needed for count"
+    )
+
+    @field_validator("field")
+    @classmethod
+    def lowercase_field(cls, value: Optional[str]) -> Optional[str]:
+        return value.lower() if value else value
+
+
+class HavingSpec(BaseModel):
+    """Filter applied to aggregated rows."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    metric: str = Field(..., description="Aggregate or derived metric name (e.g. 'cost', 'roas')")
+    operator: str = Field(..., description="One of >, >=, <, <=, =, !=")
+    value: float = Field(..., description="Threshold value")
+
+    @field_validator("operator")
+    @classmethod
+    def validate_operator(cls, value: str) -> str:
+        if value not in _HAVING_OPERATORS:
+            raise ValueError(f"operator must be one of {', '.join(_HAVING_OPERATORS)}")
+        return value
+
+
+class AggregateGaqlInput(BaseModel):
+    """Input for aggregating GAQL results on the server."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    customer_id: str = Field(
+        ...,
+        description="Google Ads customer ID (format: 1234567890 or 123-456-7890)",
+        min_length=10,
+        max_length=12
+    )
+    query: str = Field(
+        ...,
+        description="GAQL query whose SELECT clause includes every group-by and metric field."
+    )
+    group_by: List[str] = Field(
+        default_factory=list,
+        description="Field paths to group on (e.g. ['search_term_view.search_term']). Empty for one total row."
+    )
+    metrics: List[AggregateMetricSpec] = Field(
+        default_factory=list,
+        description="Aggregate columns, e.g. [{'name': 'cost', 'function': 'sum', 'field': 'metrics.cost_micros'}]. _micros fields are returned in currency units."
+    )
+    derived: List[str] = Field(
+        default_factory=list,
+        description="Derived ratios computed from summed fields: roas, cvr, ctr, cpa, cpc."
+    )
+    having: List[HavingSpec] = Field(
+        default_factory=list,
+        description="Filters on aggregated values, e.g. [{'metric': 'cost', 'operator': '>', 'value': 50}]"
+    )
+    order_by: Optional[str] = Field(
+        default=None,
+        description="Metric to sort by (defaults to the first metric)"
+    )
+    descending: bool = Field(default=True, description="Sort descending (largest first)")
+    limit: int = Field(default=50, description="Maximum groups to return", ge=1, le=1000)
+    response_format: ResponseFormat = Field(
+        default=ResponseFormat.MARKDOWN,
+        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+    )
+    use_cache: bool = Field(default=True, description="Serve repeated queries from the result cache.")
+
+    @field_validator("group_by")
+    @classmethod
+    def lowercase_group_by(cls, value: List[str]) -> List[str]:
+        return [field.lower() for field in value]
+
+    @model_validator(mode="after")
+    def validate_output_names(self) -> "AggregateGaqlInput":
+        """Reject order_by and having names that aren't output columns, which would silently mis-sort or drop every row."""
+        columns = [metric.name for metric in self.metrics] + self.derived + self.group_by
+        available = ", ".join(columns) or "none"
+        if self.order_by is not None and self.order_by not in columns:
+            raise ValueError(f"order_by '{self.order_by}' is not a metric, derived metric or group_by field. Available: {available}")
+        for spec in self.having:
+            if spec.metric not in columns:
+                raise ValueError(f"having metric '{spec.metric}' is not a metric, derived metric or group_by field. Available: {available}")
+        return self
+
+
+class NgramWastedSpendInput(BaseModel):
+    """Input for n-gram wasted-spend analysis of search terms."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    customer_id: str = Field(
+        ...,
+        description="Google Ads customer ID (format: 1234567890 or 123-456-7890)",
+        min_length=10,
+        max_length=12
+    )
+    date_range: DateRange = Field(default=DateRange.LAST_30_DAYS, description="Search term date range")
+    campaign_id: Optional[str] = Field(default=None, description="Limit the analysis to one campaign ID")
+    max_n: int = Field(default=3, description="Longest n-gram in words (1-3)", ge=1, le=3)
+    min_terms: int = Field(
+        default=2,
+        description="Fewest non-converting search terms an n-gram must appear in to be reported",
+        ge=1
+    )
+    limit: int = Field(default=50, description="Maximum n-grams to return", ge=1, le=500)
+    examples: int = Field(default=3, description="Costliest non-converting example terms per n-gram", ge=0, le=10)
+    response_format: ResponseFormat = Field(
+        default=ResponseFormat.MARKDOWN,
+        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+    )
+    use_cache: bool = Field(default=True, description="Serve repeated queries from the result cache.")
+
+    @field_validator("campaign_id")
+    @classmethod
+    def validate_campaign_id(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and not value.isdigit():
+            raise ValueError("campaign_id must be numeric")
+        return value
+
+
+class DetectAnomaliesInput(BaseModel):
+    """Input for detecting daily campaign anomalies."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    customer_ids: Optional[List[str]] = Field(
+        default=None,
+        description="Accounts to scan (e.g. ['1234567890']). Omit to scan every enabled account under the MCC."
+    )
+    metrics: List[str] = Field(
+        default_factory=lambda: list(ANOMALY_METRICS),
+        description="Metrics to score: cost, conversions, ctr, roas"
+    )
+    baseline_days: int = Field(default=28, description="Days in the rolling baseline before each scored day", ge=7, le=90)
+    detect_days: int = Field(default=7, description="Most recent complete days to score (ending yesterday)", ge=1, le=30)
+    z_threshold: float = Field(default=3.5, description="Flag cells whose robust z-score is at least this far from 0", ge=1.0)
+    min_active_days: int = Field(
+        default=7,
+        description="Days with impressions a campaign needs in the baseline window to be scored",
+        ge=3
+    )
+    limit: int = Field(default=100, description="Maximum flagged cells to return", ge=1, le=1000)
+    max_parallel: int = Field(
+        default=8,
+        description="Maximum number of accounts queried at the same time (also bounded by GOOGLE_ADS_BULK_CONCURRENCY).",
+        ge=1,
+        le=50
+    )
+    response_format: ResponseFormat = Field(
+        default=ResponseFormat.MARKDOWN,
+        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+    )
+    use_cache: bool = Field(default=True, description="Serve repeated per-account queries from the result cache.")
+
+    @field_validator("metrics")
+    @classmethod
+    def validate_metrics(cls, value: List[str]) -> List[str]:
+        metrics = [metric.lower() for metric in value]
+        unknown = [metric for metric in metrics if metric not in ANOMALY_METRICS]
+        if unknown or not metrics:
+            raise ValueError(f"Unknown metrics {unknown}. Available: {', '.join(ANOMALY_METRICS)}")
+        return list(dict.fromkeys(metrics))
+
+
+class BudgetPacingInput(BaseModel):
+    """Input for month-to-date budget pacing across accounts."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    customer_ids: Optional[List[str]] = Field(
+        default=None,
+        description="Accounts to pace (e.g. ['1234567890']). Omit to pace every enabled account under the MCC."
+    )
+    account_name_pattern: Optional[str] = Field(
+        default=None,
+        description="Case-insensitive name pattern with * wildcards (e.g. '*shoes*') to select accounts."
+    )
+    tolerance_pct: float = Field(
+        default=10.0,
+        description="Projected spend within this many percent of the monthly budget counts as on pace",
+        ge=0,
+        le=100
+    )
+    flagged_only: bool = Field(default=False, description="Return only accounts pacing over or under")
+    limit: int = Field(default=300, description="Maximum accounts to return", ge=1, le=2000)
+    max_parallel: int = Field(
+        default=8,
+        description="Maximum number of accounts queried at the same time (also bounded by GOOGLE_ADS_BULK_CONCURRENCY).",
+        ge=1,
+        le=50
+    )
+    response_format: ResponseFormat = Field(
+        default=ResponseFormat.MARKDOWN,
+        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+    )
+    use_cache: bool = Field(default=True, description="Serve repeated per-account queries from the result cache.")
+
+
+class ShoppingSortMetric(str, Enum):
+    """Metrics google_ads_shopping_top_products can rank by."""
+    ROAS = "roas"
+    COST = "cost"
+    CONVERSIONS = "conversions"
+    CONVERSIONS_VALUE = "conversions_value"
+    CLICKS = "clicks"
+    CVR = "cvr"
+    CPA = "cpa"
+
+
+class ShoppingTopProductsInput(BaseModel):
+    """Input for ranking Shopping products without materializing the report."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    customer_id: str = Field(
+        ...,
+        description="Google Ads customer ID (format: 1234567890 or 123-456-7890)",
+        min_length=10,
+        max_length=12
+    )
+    date_range: DateRange = Field(default=DateRange.LAST_30_DAYS, description="Reporting date range")
+    metric: ShoppingSortMetric = Field(default=ShoppingSortMetric.ROAS, description="Metric to rank products by")
+    descending: bool = Field(
+        default=False,
+        description="Largest first. The default (False) returns the worst products for roas/cvr, smallest first."
+    )
+    limit: int = Field(default=100, description="Products to return", ge=1, le=1000)
+    min_cost: float = Field(default=0.0, description="Only products that spent more than this (currency units)", ge=0)
+    min_clicks: int = Field(default=0, description="Only products with more clicks than this", ge=0)
+    campaign_id: Optional[str] = Field(default=None, description="Limit to one Shopping campaign ID")
+    brand: Optional[str] = Field(default=None, description="Case-insensitive brand pattern with * wildcards")
+    product_type: Optional[str] = Field(default=None, description="Case-insensitive product type (level 1) pattern")
+    item_id: Optional[str] = Field(default=None, description="Case-insensitive item ID pattern (e.g. 'sku-12*')")
+    title: Optional[str] = Field(default=None, description="Case-insensitive title pattern (e.g. '*blue*')")
+    response_format: ResponseFormat = Field(
+        default=ResponseFormat.MARKDOWN,
+        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+    )
+    use_cache: bool = Field(default=True, description="Serve repeated queries from the result cache.")
+
+    @field_validator("campaign_id")
+    @classmethod
+    def validate_campaign_id(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and not value.isdigit():
+            raise ValueError("campaign_id must be numeric")
+        return value
+
+
+class ServerStatsInput(BaseModel):
+    """Input for reading server instrumentation."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    reset: bool = Field(
+        default=False,
+        description="Clear the latency/size histograms after reading them (component counters are kept)"
+    )
+
+
+class StoreName(str, Enum):
+    """Local databases available to google_ads_query_store."""
+    SESSION = "session"
+    METRICS = "metrics"
+
+
+class SyncMetricsInput(BaseModel):
+    """Input for incrementally syncing daily metrics into the local metrics store."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    customer_ids: Optional[List[str]] = Field(
+        default=None,
+        description="Accounts to sync. Omit to sync every enabled account under the MCC."
+    )
+    resources: List[str] = Field(
+        default_factory=lambda: ["campaign"],
+        description="Resources to sync: campaign, ad_group, keyword"
+    )
+    lookback_days: int = Field(
+        default=90,
+        description="Days to load on the first sync of an account/resource",
+        ge=1,
+        le=730
+    )
+    restatement_days: int = Field(
+        default=7,
+        description="Days before the watermark to re-fetch for late conversions",
+        ge=0,
+        le=90
+    )
+    max_parallel: int = Field(
+        default=4,
+        description="Maximum accounts synced at the same time",
+        ge=1,
+        le=20
+    )
+
+    @field_validator("resources")
+    @classmethod
+    def validate_resources(cls, value: List[str]) -> List[str]:
+        resources = [resource.lower() for resource in value]
+        unknown = [resource for resource in resources if resource not in SYNC_RESOURCES]
+        if unknown:
+            raise ValueError(f"Unknown resources {unknown}. Available: {', '.join(SYNC_RESOURCES)}")
+        return resources
+
+
+class QueryStoreInput(BaseModel):
+    """Input for querying locally stored GAQL results."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+
+    sql: Optional[str] = Field(
+        default=None,
+        description=(
+            "Read-only SQLite SELECT over stored tables, e.g. 'SELECT search_term_view_search_term, "
+            "SUM(metrics_cost_micros) FROM terms GROUP BY 1 ORDER BY 2 DESC LIMIT 20'. "
+            "Column names are field paths with dots replaced by underscores. Omit to list stored tables."
+        )
+    )
+    response_format: GaqlResponseFormat = Field(
+        default=GaqlResponseFormat.JSON,
+        description="'json' for one object per row or 'columnar' for compact value arrays"
+    )
+    store: StoreName = Field(
+        default=StoreName.SESSION,
+        description=(
+            "'session' for tables saved with run_google_ads_gaql(store_as=...); 'metrics' for the "
+            "persistent daily tables (campaign_daily, ad_group_daily, keyword_daily) kept by google_ads_sync_metrics"
+        )
+    )
+
+
+# ============================================================================
+# TOOL IMPLEMENTATIONS
+# ============================================================================
+
+@mcp.tool(
+    name="run_google_ads_gaql",
+    annotations={
+        "title": "Run Google Ads GAQL Query",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+@instrumented
+async def run_google_ads_gaql(params: RunGoogleAdsGaqlInput) -> str:
+    """
+    Run any Google Ads Query Language (GAQL) query for data retrieval (read-only).
+    This tool is for advanced users who are familiar with GAQL.
+    For simpler use cases, consider using 'list_google_ads_resources'.
+
+    Results are paged: each response holds up to page_size rows (and never
+    more than CHARACTER_LIMIT characters). When rows remain it ends with
+    "more_rows_available": true and a "next_cursor" for
+    run_google_ads_gaql_next_page, which continues the same result. With
+    use_streaming the response is cut at CHARACTER_LIMIT and no cursor is kept.
+    Use response_format='columnar' to fit several times more rows: decode
+    row[i] with columns[i], and string cells via dictionaries[column][index].
+    """
+    try:
+        client = await run_blocking(get_google_ads_client)
+        customer_id = format_customer_id(params.customer_id)
+
+        # Parse and check the query locally so bad queries never reach the API
+        query, fixes = await run_blocking(prepare_gaql_query, client, params.query, params.auto_fix)
+
+        if params.store_as:
+            columns = parse_select_fields(query)
+            rows = iter_serialized_gaql_rows(
+                client, customer_id, query,
+                use_streaming=True, use_cache=params.use_cache, as_values=True, record=False
+            )
+            stored = await run_blocking(
+                result_store.store_rows, params.store_as, columns, rows, customer_id, query
+            )
+            return json.dumps({
+                "customer_id": customer_id,
+                "query": query,
+                **({"query_fixes": fixes} if fixes else {}),
+                "stored_as": params.store_as,
+                "rows_stored": stored,
+                "columns": [column.replace(".", "_") for column in columns],
+                "next_step": "Query this table with google_ads_query_store using read-only SQL."
+            }, indent=2)
+
+        columnar = params.response_format == GaqlResponseFormat.COLUMNAR
+        header = {
+            "customer_id": customer_id,
+            "query": query,
+            "streaming_used": params.use_streaming
+        }
+        if fixes:
+            header["query_fixes"] = fixes
+
+        rows = iter_serialized_gaql_rows(
+            client,
+            customer_id,
+            query,
+            use_streaming=params.use_streaming,
+            use_cache=params.use_cache,
+            as_values=columnar
+        )
+
+        # Paged search: hold the row iterator (and its API pager) behind a cursor
+        if not params.use_streaming:
+            columns = parse_select_fields(query) if columnar else []
+            cursor = cursor_registry.open(customer_id, query, columns, rows, as_values=columnar)
+            return await run_blocking(build_cursor_page, cursor, header, params.page_size)
+
+        # Stream rows straight into the response and stop reading at CHARACTER_LIMIT
+        if columnar:
+            header["format"] = GaqlResponseFormat.COLUMNAR.value
+            return await run_blocking(
+                build_columnar_response, header, parse_select_fields(query), rows
+            )
+        return await run_blocking(build_json_response, header, rows)
+
+    except Exception as e:
+        return f"Error executing GAQL query: {str(e)}\nQuery: {params.query}"
+
+
+@mcp.tool(
+    name="google_ads_validate_gaql",
+    annotations={
+        "title": "Validate GAQL Query",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False
+    }
+)
+@instrumented
+async def google_ads_validate_gaql(params: ValidateGaqlInput) -> str:
+    """
+    Check a GAQL query locally without running it.
+
+    Validates syntax, field names, selectability, filterability, resource and
+    segment compatibility and enum values against the GoogleAdsFieldService
+    catalog for the current API version (fetched once and cached on disk).
+    Typos come back with "did you mean" suggestions.
+
+    Args:
+        params (ValidateGaqlInput): Query and auto-fix preference
+
+    Returns:
+        str: JSON with "valid", errors, applied fixes and the query to send
+    """
+    try:
+        client = await run_blocking(get_google_ads_client)
+        catalog = await run_blocking(field_catalog.get, client)
+        validation = validate_gaql(params.query, catalog, auto_fix=params.auto_fix)
+        return json.dumps({
+            "valid": validation.valid,
+            "query": validation.query,
+            "errors": validation.errors,
+            "fixes": validation.fixes,
+            "catalog_version": validation.catalog_version,
+            "checks": "full" if catalog else "syntax only (field catalog unavailable)"
+        }, indent=2)
+
+    except Exception as e:
+        return f"Error validating GAQL query: {str(e)}"
+
+
+@mcp.tool(
+    name="run_google_ads_gaql_next_page",
+    annotations={
+        "title": "Next Page of GAQL Results",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": True
+    }
+)
+@instrumented
+async def run_google_ads_gaql_next_page(params: GaqlNextPageInput) -> str:
+    """
+    Fetch the next page of a paged run_google_ads_gaql result.
+
+    Continues from where the previous page stopped without re-running the
+    query. Cursors expire after a few idle minutes and close once the last
+    row has been returned.
+
+    Args:
+        params (GaqlNextPageInput): Cursor from the previous page and page size
+
+    Returns:
+        str: The next page, with a new next_cursor while rows remain
+    """
+    try:
+        cursor = cursor_registry.get(params.cursor)
+        header = {
+            "customer_id": cursor.customer_id,
+            "query": cursor.query,
+            "streaming_used": False
+        }
+        return await run_blocking(build_cursor_page, cursor, header, params.page_size)
+
+    except Exception as e:
+        return f"Error fetching next page: {str(e)}"
+
+
+@mcp.tool(
+    name="google_ads_list_accounts",
+    annotations={
+        "title": "List Google Ads Accounts",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+@instrumented
+async def google_ads_list_accounts(params: ListAccountsInput) -> str:
+    """
+    List all Google Ads accounts accessible under the MCC account.
+
+    Returns a list of customer accounts with basic information including
+    account ID, name, currency, timezone, status, and hierarchy level.
+    Answered from the cached account hierarchy, which includes accounts
+    under nested sub-managers and refreshes in the background.
+
+    Args:
+        params (ListAccountsInput): Query parameters including output format
+
+    Returns:
+        str: Account list in JSON or Markdown format
+    """
+    try:
+        mcc_id = get_mcc_id()
+        client = await run_blocking(get_google_ads_client)
+        hierarchy = await run_blocking(
+            account_hierarchy.get_accounts, client, mcc_id, force_refresh=params.refresh
+        )
+        if params.name_contains:
+            hierarchy = account_hierarchy.find_by_name(mcc_id, params.name_contains)
+        accounts = filter_accounts(hierarchy, params.include_managers, params.include_inactive)
+
+        if params.response_format == ResponseFormat.JSON:
+            header = {"mcc_account_id": mcc_id, "total_accounts": len(accounts)}
+            return build_json_response(header, accounts, rows_key="accounts", count_key="account_count")
+        else:
+            # Markdown format
+            if not accounts:
+                return f"# Google Ads Accounts\n\nNo accessible accounts found under MCC {mcc_id}."
+
+            return build_markdown_response(
+                f"# Google Ads Accounts\n\n**MCC Account:** {mcc_id}\n**Total Accounts:** {len(accounts)}\n\n",
+                ["Account ID", "Name", "Currency", "Status", "Timezone", "Level", "Manager"],
+                accounts,
+                lambda account: (
+                    account["id"], account.get("name") or "N/A", account["currency"], account["status"],
+                    account["timezone"], account["level"], account["manager_path"][-1] if account["manager_path"] else None
+                ),
+                hint="Narrow the list with name_contains."
+            )
+
+    except Exception as e:
+        return f"Error listing accounts: {str(e)}"
+
+
+@mcp.tool(
+    name="run_google_ads_gaql_across_accounts",
+    annotations={
+        "title": "Run GAQL Query Across Accounts",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+@instrumented
+async def run_google_ads_gaql_across_accounts(params: RunGaqlAcrossAccountsInput) -> str:
+    """
+    Run one read-only GAQL query in many accounts concurrently and merge the rows.
+
+    Accounts are selected from the MCC (all, an explicit list, or a name
+    pattern) and queried with at most max_parallel requests in flight. A
+    failing account is counted and sampled in "failed_accounts" without
+    affecting the others. Every merged row carries a "customer_id" column.
+    Accounts share one response budget and stop reading once it is spent;
+    accounts whose rows didn't all make it into the response are listed in
+    "accounts_with_more_rows". The header lists only the slowest accounts
+    and a sample of errors so it stays small however many accounts are
+    queried.
+
+    Args:
+        params (RunGaqlAcrossAccountsInput): Query, account selection and limits
+
+    Returns:
+        str: JSON with merged rows, the slowest accounts and sampled errors
+    """
+    try:
+        client = await run_blocking(get_google_ads_client)
+        query, fixes = await run_blocking(prepare_gaql_query, client, params.query)
+        if params.customer_ids and not params.account_name_pattern:
+            accounts = select_accounts([], customer_ids=params.customer_ids)
+        else:
+            all_accounts = await run_blocking(fetch_client_accounts, client, get_mcc_id())
+            accounts = select_accounts(all_accounts, params.customer_ids, params.account_name_pattern)
+
+        if not accounts:
+            return "Error running query across accounts: no accounts matched the selection."
+
+        semaphore = asyncio.Semaphore(params.max_parallel)
+        budget = ResponseBudget()
+
+        async def query_account(account: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    rows, more = await run_bulk(
+                        collect_gaql_rows,
+                        client,
+                        account["id"],
+                        query,
+                        params.max_rows_per_account,
+                        use_cache=params.use_cache,
+                        priority=RequestPriority.BULK,
+                        budget=budget
+                    )
+                    error = None
+                except Exception as e:
+                    rows, more, error = [], False, str(e)
+                return {
+                    "customer_id": account["id"],
+                    "rows": rows,
+                    "more_rows_available": more,
+                    "error": error,
+                    "elapsed_ms": round((time.perf_counter() - start) * 1000)
+                }
+
+        sweep_start = time.perf_counter()
+        outcomes = await asyncio.gather(*(query_account(account) for account in accounts))
+        sweep_ms = round((time.perf_counter() - sweep_start) * 1000)
+
+        failed = [outcome for outcome in outcomes if outcome["error"]]
+        read_more = [outcome["customer_id"] for outcome in outcomes if outcome["more_rows_available"]]
+        slowest = heapq.nlargest(FANOUT_HEADER_SAMPLE, outcomes, key=lambda outcome: outcome["elapsed_ms"])
+        owners = [outcome["customer_id"] for outcome in outcomes for _ in outcome["rows"]]
+
+        def render(cut_off: List[str], max_rows: Optional[int]) -> Tuple[str, int]:
+            """Build the response; returns it with the number of merged rows it holds."""
+            with_more = read_more + cut_off
+            header = {
+                "query": query,
+                **({"query_fixes": fixes} if fixes else {}),
+                "accounts_queried": len(outcomes),
+                "accounts_succeeded": len(outcomes) - len(failed),
+                "accounts_failed": len(failed),
+                "elapsed_ms": sweep_ms,
+                "slowest_accounts_ms": {outcome["customer_id"]: outcome["elapsed_ms"] for outcome in slowest},
+                "failed_accounts": {
+                    outcome["customer_id"]: summarize_account_error(outcome["error"], query)
+                    for outcome in failed[:FANOUT_HEADER_SAMPLE]
+                },
+                "accounts_with_more_rows": with_more[:FANOUT_HEADER_SAMPLE],
+                "accounts_with_more_rows_total": len(with_more)
+            }
+            progress = {"yielded": 0, "rejected": False}
+
+            def merged_rows() -> Iterator[Dict[str, Any]]:
+                for outcome in outcomes:
+                    for row in outcome["rows"]:
+                        progress["yielded"] += 1
+                        try:
+                            # New dicts keep the cached per-account rows untouched
+                            yield {"customer_id": outcome["customer_id"], **row}
+                        except GeneratorExit:
+                            progress["rejected"] = True
+                            raise
+
+            text = build_json_response(header, merged_rows(), max_rows=max_rows)
+            return text, progress["yielded"] - (1 if progress["rejected"] else 0)
+
+        def build_response() -> str:
+            # Accounts cut off by the final truncation have more rows too; listing
+            # them grows the header, which can cut further rows, so repeat until stable
+            cut_off: List[str] = []
+            max_rows = None
+            while True:
+                text, kept = render(cut_off, max_rows)
+                dropped = [
+                    customer_id for customer_id in dict.fromkeys(owners[kept:])
+                    if customer_id not in read_more
+                ]
+                if all(customer_id in cut_off for customer_id in dropped):
+                    return text
+                cut_off, max_rows = dropped, kept
+
+        return await run_blocking(build_response)
+
+    except Exception as e:
+        return f"Error running query across accounts: {str(e)}\nQuery: {params.query}"
+
+
+@mcp.tool(
+    name="google_ads_detect_anomalies",
+    annotations={
+        "title": "Detect Campaign Anomalies",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+@instrumented
+async def google_ads_detect_anomalies(params: DetectAnomaliesInput) -> str:
+    """
+    Flag unusual days in campaign cost, conversions, CTR and ROAS.
+
+    Pulls daily metrics for all campaigns with one streamed query per
+    account (accounts run concurrently on the bulk lane), fills a dense
+    campaign x day matrix and scores each of the last detect_days against
+    the baseline_days before it with a robust z-score (median and MAD), so
+    a single past spike doesn't hide the next one. Only flagged cells are
+    returned, largest deviation first.
+
+    The window ends on the last day that is complete in every account's
+    time zone (from the MCC hierarchy). Accounts given by customer_ids are
+    not looked up in the hierarchy, so their window ends yesterday in the
+    server's local time zone.
+
+    Args:
+        params (DetectAnomaliesInput): Accounts, metrics and thresholds
+
+    Returns:
+        str: Flagged campaign-days in Markdown or JSON format
+    """
+    try:
+        client = await run_blocking(get_google_ads_client)
+        if params.customer_ids:
+            accounts = select_accounts([], customer_ids=params.customer_ids)
+        else:
+            accounts = await run_blocking(fetch_client_accounts, client, get_mcc_id())
+        if not accounts:
+            return "Error detecting anomalies: no accounts matched the selection."
+
+        end = earliest_account_date(accounts) - timedelta(days=1)
+        detector = CampaignAnomalyDetector(
+            end - timedelta(days=params.baseline_days + params.detect_days - 1),
+            params.baseline_days,
+            params.detect_days
+        )
+        query = ANOMALY_QUERY.format(start=detector.start.isoformat(), end=end.isoformat())
+        semaphore = asyncio.Semaphore(params.max_parallel)
+
+        def load_account(customer_id: str) -> None:
+            rows = iter_serialized_gaql_rows(
+                client, customer_id, query,
+                use_cache=params.use_cache, as_values=True, priority=RequestPriority.BULK, record=False
+            )
+            try:
+                for values in rows:
+                    detector.add(values)
+            finally:
+                rows.close()
+
+        async def scan_account(account: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+            async with semaphore:
+                try:
+                    await run_bulk(load_account, account["id"])
+                    return None
+                except Exception as e:
+                    return account["id"], str(e)
+
+        outcomes = await asyncio.gather(*(scan_account(account) for account in accounts))
+        failed = dict(outcome for outcome in outcomes if outcome)
+        flagged = await run_blocking(
+            detector.scan, params.metrics, params.z_threshold, params.min_active_days
+        )
+        shown = flagged[:params.limit]
+
+        if params.response_format == ResponseFormat.JSON:
+            header = {
+                "period": {"start": detector.start.isoformat(), "end": end.isoformat()},
+                "scored_days": params.detect_days,
+                "metrics": params.metrics,
+                "z_threshold": params.z_threshold,
+                "accounts_queried": len(accounts),
+                "accounts_failed": len(failed),
+                "failed_accounts": failed_accounts_sample(failed, query),
+                "rows_scanned": detector.rows_scanned,
+                "campaigns": detector.campaign_count,
+                "anomalies_total": len(flagged)
+            }
+            return build_json_response(header, shown, rows_key="anomalies", count_key="anomaly_count")
+
+        scored_from = (end - timedelta(days=params.detect_days - 1)).isoformat()
+        preamble = (
+            f"# Campaign Anomalies\n\n**Scored days:** {scored_from} to {end.isoformat()} | "
+            f"**Baseline:** {params.baseline_days} days | **Accounts:** {len(accounts):,} | "
+            f"**Campaigns:** {detector.campaign_count:,} | **Flagged:** {len(flagged):,}\n\n"
+            + failed_accounts_line(failed, query)
+        )
+        if not shown:
+            return preamble + f"No anomalies with |z| >= {params.z_threshold}."
+
+        return build_markdown_response(
+            preamble,
+            ["Date", "Account", "Campaign", "Metric", "Value", "Baseline median", "Change", "z"],
+            shown,
+            lambda cell: (
+                cell["date"], cell["customer_id"], f"{cell['campaign_name']} ({cell['campaign_id']})",
+                cell["metric"], f"{cell['value']:,}", f"{cell['baseline_median']:,}",
+                None if cell["change_pct"] is None else f"{cell['change_pct']:+}%", cell["z_score"]
+            ),
+            hint="Lower the limit or raise z_threshold."
+        )
+
+    except Exception as e:
+        return f"Error detecting anomalies: {str(e)}"
+
+
+@mcp.tool(
+    name="google_ads_budget_pacing",
+    annotations={
+        "title": "Check Budget Pacing Across Accounts",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+@instrumented
+async def google_ads_budget_pacing(params: BudgetPacingInput) -> str:
     """
-    Format a value for safe inclusion in GAQL queries.
+    Compare month-to-date spend with campaign budgets for many accounts at once.
 
-    Handles proper escaping for strings, boolean conversion, and type validation.
+    Each account is read with one streamed campaign query (budgets and
+    month-to-date cost through yesterday), run concurrently on the bulk
+    lane. Projected month-end spend assumes the daily run rate so far
+    continues; accounts are flagged "over" or "under" when the projection
+    is more than tolerance_pct from the monthly budget (daily budgets of
+    enabled campaigns x days in the month). Furthest off pace first.
+
+    "Today" is the earliest current date among the selected accounts' time
+    zones, so every account is paced through a day it has fully reported.
 
     Args:
-        value: The value to format
+        params (BudgetPacingInput): Account selection and thresholds
 
     Returns:
-        str: Properly formatted GAQL value
+        str: Pacing table in Markdown or JSON format
     """
-    if isinstance(value, bool):
-        return "TRUE" if value else "FALSE"
-    elif isinstance(value, str):
-        # Escape single quotes by doubling them
-        escaped_value = value.replace("'", "''")
-        return f"'{escaped_value}'"
-    elif isinstance(value, (int, float)):
-        return str(value)
-    else:
-        # For other types, convert to string and escape
-        str_value = str(value)
-        escaped_value = str_value.replace("'", "''")
-        return f"'{escaped_value}'"
+    try:
+        client = await run_blocking(get_google_ads_client)
+        all_accounts = await run_blocking(fetch_client_accounts, client, get_mcc_id())
+        accounts = select_accounts(all_accounts, params.customer_ids, params.account_name_pattern)
+        if not accounts:
+            return "Error checking budget pacing: no accounts matched the selection."
 
+        today = earliest_account_date(accounts)
+        month_start = today.replace(day=1)
+        as_of = today - timedelta(days=1)
+        if as_of < month_start:
+            return "Error checking budget pacing: no complete day in the current month yet (pacing starts on the 2nd)."
 
-def calculate_roas(conversions_value: float, cost: float) -> Optional[float]:
-    """Calculate ROAS (Return on Ad Spend)."""
-    if cost == 0:
-        return None
-    return round(conversions_value / cost, 2)
+        pacer = BudgetPacer(month_start, as_of)
+        query = BUDGET_PACING_QUERY.format(start=month_start.isoformat(), end=as_of.isoformat())
+        semaphore = asyncio.Semaphore(params.max_parallel)
 
+        def load_account(customer_id: str) -> None:
+            rows = iter_serialized_gaql_rows(
+                client, customer_id, query,
+                use_cache=params.use_cache, as_values=True, priority=RequestPriority.BULK, record=False
+            )
+            try:
+                for values in rows:
+                    pacer.add(customer_id, values)
+            finally:
+                rows.close()
 
-def calculate_cvr(conversions: float, clicks: int) -> Optional[float]:
-    """Calculate conversion rate."""
-    if clicks == 0:
-        return None
-    return round((conversions / clicks) * 100, 2)
+        async def pace_account(account: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+            async with semaphore:
+                try:
+                    await run_bulk(load_account, account["id"])
+                    return None
+                except Exception as e:
+                    return account["id"], str(e)
 
+        outcomes = await asyncio.gather(*(pace_account(account) for account in accounts))
+        failed = dict(outcome for outcome in outcomes if outcome)
+        results = pacer.results([account for account in accounts if account["id"] not in failed], params.tolerance_pct)
+        counts = {status: 0 for status in ("over", "under", "on_pace", "no_budget")}
+        for row in results:
+            counts[row["status"]] += 1
+        if params.flagged_only:
+            results = [row for row in results if row["status"] in ("over", "under")]
+        shown = results[:params.limit]
 
-def get_proto_attr(entity: Any, attr: str) -> Any:
-    """Return proto field, handling trailing underscore that Python reserves."""
-    if entity is None:
-        return None
+        if params.response_format == ResponseFormat.JSON:
+            header = {
+                "month_start": month_start.isoformat(),
+                "as_of": as_of.isoformat(),
+                "days_elapsed": pacer.days_elapsed,
+                "days_in_month": pacer.days_in_month,
+                "tolerance_pct": params.tolerance_pct,
+                "accounts_queried": len(accounts),
+                "accounts_failed": len(failed),
+                "failed_accounts": failed_accounts_sample(failed, query),
+                "status_counts": counts
+            }
+            return build_json_response(header, shown, rows_key="accounts", count_key="account_count")
 
-    sentinel = object()
-    value = getattr(entity, attr, sentinel)
-    if value is sentinel:
-        value = getattr(entity, f"{attr}_", sentinel)
-    return None if value is sentinel else value
+        preamble = (
+            f"# Budget Pacing\n\n**Through:** {as_of.isoformat()} (day {pacer.days_elapsed} of {pacer.days_in_month}) | "
+            f"**Accounts:** {len(accounts):,} | **Over:** {counts['over']} | **Under:** {counts['under']} | "
+            f"**On pace:** {counts['on_pace']} | **No budget:** {counts['no_budget']}\n\n"
+            + failed_accounts_line(failed, query)
+        )
+        if not shown:
+            return preamble + "No accounts to show."
+
+        return build_markdown_response(
+            preamble,
+            ["Account", "Name", "Cur.", "Spend MTD", "Expected MTD", "Monthly budget", "Projected", "Pace", "Status"],
+            shown,
+            lambda row: (
+                row["customer_id"], row["name"] or None, row["currency"] or None,
+                f"{row['cost_to_date']:,.2f}", f"{row['expected_to_date']:,.2f}", f"{row['monthly_budget']:,.2f}",
+                f"{row['projected_month_end']:,.2f}", None if row["pace_pct"] is None else f"{row['pace_pct']}%",
+                row["status"]
+            ),
+            hint="Lower the limit or set flagged_only."
+        )
+
+    except Exception as e:
+        return f"Error checking budget pacing: {str(e)}"
 
 
-def truncate_response(data: str, message: str = "") -> str:
+@mcp.tool(
+    name="google_ads_shopping_top_products",
+    annotations={
+        "title": "Rank Shopping Products",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+@instrumented
+async def google_ads_shopping_top_products(params: ShoppingTopProductsInput) -> str:
     """
-    Truncate response if it exceeds CHARACTER_LIMIT.
-    
+    Return the best or worst Shopping products by ROAS, cost, conversions, CVR or CPA.
+
+    Streams product-level shopping_performance_view rows through a
+    BoundedTopN heap of `limit` entries, so catalogs of any size are ranked
+    in constant memory. min_cost and min_clicks are sent to the API as
+    WHERE filters; brand, product type, item ID and title patterns are
+    matched on each row as it streams. Products without a value for the
+    metric (e.g. ROAS with no spend) are skipped.
+
     Args:
-        data: The response string to potentially truncate
-        message: Additional context message about truncation
-        
+        params (ShoppingTopProductsInput): Account, metric, order and filters
+
     Returns:
-        Original or truncated response with truncation notice
+        str: Ranked products in Markdown or JSON format
     """
-    if len(data) <= CHARACTER_LIMIT:
-        return data
-    
-    truncation_notice = (
-        f"\n\n⚠️ RESPONSE TRUNCATED\n"
-        f"Original size: {len(data):,} characters\n"
-        f"Truncated to: {CHARACTER_LIMIT:,} characters\n"
-        f"{message}"
-    )
-    
-    # Truncate and add notice
-    return data[:CHARACTER_LIMIT - len(truncation_notice)] + truncation_notice
+    try:
+        client = await run_blocking(get_google_ads_client)
+        customer_id = format_customer_id(params.customer_id)
+        query = SHOPPING_PRODUCT_QUERY.format(date_range=params.date_range.value)
+        if params.min_cost:
+            query += f" AND metrics.cost_micros > {int(params.min_cost * 1_000_000)}"
+        if params.min_clicks:
+            query += f" AND metrics.clicks > {params.min_clicks}"
+        if params.campaign_id:
+            query += f" AND campaign.id = {params.campaign_id}"
 
+        # (position in the value row, lower-cased pattern) for each attribute filter
+        patterns = [
+            (position, pattern.lower())
+            for position, pattern in enumerate((params.item_id, params.title, params.brand, params.product_type))
+            if pattern
+        ]
+        sort_key = SHOPPING_SORT_METRICS[params.metric.value]
+        top = BoundedTopN(params.limit, descending=params.descending)
 
-def format_customer_id(customer_id: str) -> str:
-    """Format customer ID by removing dashes."""
-    return customer_id.replace("-", "")
+        def rank() -> int:
+            scanned = 0
+            rows = iter_serialized_gaql_rows(
+                client, customer_id, query, use_cache=params.use_cache, as_values=True, record=False
+            )
+            try:
+                for values in rows:
+                    scanned += 1
+                    if patterns and not all(
+                        fnmatch.fnmatchcase((values[position] or "").lower(), pattern)
+                        for position, pattern in patterns
+                    ):
+                        continue
+                    key = sort_key(*(value or 0 for value in values[4:]))
+                    if key is not None:
+                        top.offer(key, values)
+            finally:
+                rows.close()
+            return scanned
 
+        rows_scanned = await run_blocking(rank)
+        products = []
+        for item_id, title, brand, product_type, impressions, clicks, cost, conversions, value in top.items():
+            cost = cost or 0
+            products.append({
+                "item_id": item_id,
+                "title": title,
+                "brand": brand,
+                "product_type_l1": product_type,
+                "impressions": impressions or 0,
+                "clicks": clicks or 0,
+                "cost": format_micros(cost),
+                "conversions": round(conversions or 0, 2),
+                "conversions_value": round(value or 0, 2),
+                "roas": calculate_roas(value or 0, cost / 1_000_000),
+                "cvr": calculate_cvr(conversions or 0, clicks or 0),
+                "cpa": round(cost / 1_000_000 / conversions, 2) if conversions else None
+            })
 
-def get_enum_name(
-    value: Any,
-    enum_converter: Optional[Callable[[Any], Enum]] = None,
-    default: str = "UNSPECIFIED"
-) -> str:
+        if params.response_format == ResponseFormat.JSON:
+            header = {
+                "customer_id": customer_id,
+                "query": query,
+                "metric": params.metric.value,
+                "descending": params.descending,
+                "rows_scanned": rows_scanned,
+                "products_matching": top.offered
+            }
+            return build_json_response(header, products, rows_key="products", count_key="product_count")
+
+        if not products:
+            return f"# Shopping Products\n\nNo products matched ({rows_scanned:,} rows scanned)."
+
+        order = "highest" if params.descending else "lowest"
+        preamble = (
+            f"# Shopping Products: {order} {params.metric.value}\n\n"
+            f"**Account:** {customer_id} | **Period:** {params.date_range.value} | "
+            f"**Rows scanned:** {rows_scanned:,} | **Matching:** {top.offered:,} | "
+            f"**Shown:** {len(products):,}\n\n"
+        )
+        return build_markdown_response(
+            preamble,
+            ["Item ID", "Title", "Brand", "Clicks", "Cost", "Conv.", "Value", "ROAS", "CPA"],
+            products,
+            lambda product: (
+                product["item_id"], product["title"] or None, product["brand"] or None,
+                f"{product['clicks']:,}", f"{product['cost']:,.2f}", product["conversions"],
+                f"{product['conversions_value']:,.2f}", product["roas"], product["cpa"]
+            ),
+            hint="Lower the limit or narrow the filters."
+        )
+
+    except Exception as e:
+        return f"Error ranking Shopping products: {str(e)}"
+
+
+@mcp.tool(
+    name="google_ads_aggregate_gaql",
+    annotations={
+        "title": "Aggregate GAQL Results",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+@instrumented
+async def google_ads_aggregate_gaql(params: AggregateGaqlInput) -> str:
     """
-    Safely resolve the name of a Google Ads enum, handling int fallbacks.
+    Run a GAQL query and return only a grouped summary (group-by, sum/avg, top-N).
+
+    Every row is streamed through array-backed accumulators on the server,
+    so analyses like "top 50 search terms by wasted spend" return 50 rows
+    instead of the raw report. Derived ratios (roas via calculate_roas, cvr
+    via calculate_cvr, ctr, cpa, cpc) are computed from summed fields.
 
     Args:
-        value: Enum value returned by Google Ads API (may be proto enum or int)
-        enum_converter: Callable that can convert raw value into enum instance
-        default: Fallback string when value is None
+        params (AggregateGaqlInput): Query and aggregation spec
 
     Returns:
-        Enum name string or fallback representation.
+        str: Aggregated rows in Markdown or JSON format
     """
-    if value is None:
-        return default
-
-    # Some proto enums expose `name`, others only provide `value`
-    # or require using the enum descriptor's Name() helper.
-    name = getattr(value, "name", None)
-    if name:
-        return name
-
-    raw_value = getattr(value, "value", value)
+    try:
+        client = await run_blocking(get_google_ads_client)
+        query, fixes = await run_blocking(prepare_gaql_query, client, params.query)
 
-    if enum_converter:
-        try:
-            name_helper = getattr(enum_converter, "Name", None)
-            if callable(name_helper):
-                return name_helper(raw_value)
-        except Exception:
-            pass
+        columns = parse_select_fields(query)
+        if not columns:
+            raise ValueError("Aggregation needs an explicit SELECT field list.")
+        for metric in params.metrics:
+            if metric.function == AggregateFunction.COUNT:
+                continue
+            if not metric.field:
+                raise ValueError(f"Metric '{metric.name}' needs a field for {metric.function.value}.")
+            if not is_numeric_gaql_field(metric.field):
+                raise ValueError(
+                    f"Metric '{metric.name}' can't {metric.function.value} non-numeric field '{metric.field}'."
+                )
+        if not params.metrics and not params.derived:
+            raise ValueError("Provide at least one metric or derived metric.")
 
-        try:
-            converted = enum_converter(raw_value)
-            converted_name = getattr(converted, "name", None)
-            if converted_name:
-                return converted_name
-        except Exception:
-            pass
+        aggregator = GaqlAggregator(
+            columns,
+            params.group_by,
+            [(metric.name, metric.function.value, metric.field) for metric in params.metrics],
+            [name.lower() for name in params.derived]
+        )
+        customer_id = format_customer_id(params.customer_id)
 
-    return str(raw_value)
+        def aggregate() -> None:
+            rows = iter_serialized_gaql_rows(
+                client, customer_id, query, use_cache=params.use_cache, as_values=True, record=False
+            )
+            try:
+                for values in rows:
+                    aggregator.add(values)
+            finally:
+                rows.close()
 
+        await run_blocking(aggregate)
+        results, matching = aggregator.results(
+            having=[(spec.metric, spec.operator, spec.value) for spec in params.having],
+            order_by=params.order_by,
+            descending=params.descending,
+            limit=params.limit
+        )
 
-def resolve_enum_converter(
-    client: GoogleAdsClient,
-    candidates: List[Tuple[str, str]]
-) -> Optional[Callable[[Any], Enum]]:
-    """Return the first available enum converter from the provided candidates."""
-    enums_container = getattr(client, "enums", None)
-    if not enums_container:
-        return None
+        if params.response_format == ResponseFormat.JSON:
+            header = {
+                "customer_id": customer_id,
+                "query": query,
+                "group_by": params.group_by,
+                "rows_scanned": aggregator.rows_scanned,
+                "groups_total": aggregator.group_count,
+                "groups_matching": matching
+            }
+            return build_json_response(header, results)
 
-    for enum_name, member_name in candidates:
-        enum_class = getattr(enums_container, enum_name, None)
-        if not enum_class:
-            continue
+        if not results:
+            return (
+                f"# Aggregated Results\n\nNo groups matched "
+                f"({aggregator.rows_scanned:,} rows scanned)."
+            )
 
-        converter = getattr(enum_class, member_name, None)
-        if converter:
-            return converter
+        preamble = (
+            f"# Aggregated Results\n\n**Rows scanned:** {aggregator.rows_scanned:,} | "
+            f"**Groups:** {aggregator.group_count:,} | **Matching:** {matching:,} | "
+            f"**Shown:** {len(results):,}\n\n"
+        )
+        return build_markdown_response(
+            preamble, list(results[0].keys()), results, dict.values,
+            hint="Lower the limit or add HAVING filters."
+        )
 
-    return None
+    except Exception as e:
+        return f"Error aggregating GAQL results: {str(e)}\nQuery: {params.query}"
 
 
-# ============================================================================
-# INPUT MODELS
-# ============================================================================
+@mcp.tool(
+    name="google_ads_ngram_wasted_spend",
+    annotations={
+        "title": "Find Wasted Spend by Search Term N-gram",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+@instrumented
+async def google_ads_ngram_wasted_spend(params: NgramWastedSpendInput) -> str:
+    """
+    Rank search term n-grams (1-3 words) by spend on terms with zero conversions.
 
-class DateRange(str, Enum):
-    """Predefined date ranges for Google Ads queries."""
-    TODAY = "TODAY"
-    YESTERDAY = "YESTERDAY"
-    LAST_7_DAYS = "LAST_7_DAYS"
-    LAST_14_DAYS = "LAST_14_DAYS"
-    LAST_30_DAYS = "LAST_30_DAYS"
-    LAST_BUSINESS_WEEK = "LAST_BUSINESS_WEEK"
-    THIS_MONTH = "THIS_MONTH"
-    LAST_MONTH = "LAST_MONTH"
-    THIS_WEEK_SUN_TODAY = "THIS_WEEK_SUN_TODAY"
-    THIS_WEEK_MON_TODAY = "THIS_WEEK_MON_TODAY"
+    Streams every search term with spend in the date range through
+    NgramSpendAnalyzer on the server and returns only the top candidates,
+    so accounts with millions of search terms fit in one response. Each
+    n-gram reports wasted spend, its totals across all matching terms
+    (conversions there would also be blocked by a negative) and example
+    terms. Use it to find negative keyword patterns; check individual
+    terms with run_google_ads_gaql.
 
+    Args:
+        params (NgramWastedSpendInput): Account, date range and ranking options
 
-class ResponseFormat(str, Enum):
-    """Output format for tool responses."""
-    MARKDOWN = "markdown"
-    JSON = "json"
+    Returns:
+        str: Ranked n-grams in Markdown or JSON format
+    """
+    try:
+        client = await run_blocking(get_google_ads_client)
+        customer_id = format_customer_id(params.customer_id)
+        query = (
+            "SELECT search_term_view.search_term, metrics.cost_micros, metrics.clicks, "
+            "metrics.conversions, metrics.conversions_value FROM search_term_view "
+            f"WHERE segments.date DURING {params.date_range.value} AND metrics.cost_micros > 0"
+        )
+        if params.campaign_id:
+            query += f" AND campaign.id = {params.campaign_id}"
 
+        analyzer = NgramSpendAnalyzer(max_n=params.max_n, min_terms=params.min_terms)
 
-class RunGoogleAdsGaqlInput(BaseModel):
-    """Input for running a raw GAQL query."""
-    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+        def analyze() -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+            rows = iter_serialized_gaql_rows(
+                client, customer_id, query, use_cache=params.use_cache, as_values=True, record=False
+            )
+            try:
+                for term, cost_micros, clicks, conversions, value in rows:
+                    analyzer.add(term, cost_micros, clicks, conversions, value)
+            finally:
+                rows.close()
+            return analyzer.results(limit=params.limit, examples=params.examples)
 
-    customer_id: str = Field(
-        ...,
-        description="Google Ads customer ID (format: 1234567890 or 123-456-7890)",
-        min_length=10,
-        max_length=12
-    )
-    query: str = Field(
-        ...,
-        description="The Google Ads Query Language (GAQL) query to execute."
-    )
-    page_size: int = Field(
-        default=100,
-        description="DEPRECATED: Not supported by Google Ads API. This parameter is ignored as the API handles pagination internally. Kept for backward compatibility.",
-        ge=1,
-        le=10000
-    )
-    use_streaming: bool = Field(
-        default=False,
-        description="Use streaming mode to fetch ALL results (ignores page_size). Enable only for large exports."
-    )
+        results, summary = await run_blocking(analyze)
 
+        if params.response_format == ResponseFormat.JSON:
+            header = {
+                "customer_id": customer_id,
+                "date_range": params.date_range.value,
+                "campaign_id": params.campaign_id,
+                **summary
+            }
+            return build_json_response(header, results)
 
-class ListAccountsInput(BaseModel):
-    """Input for listing Google Ads accounts under MCC."""
-    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True)
+        if not results:
+            return (
+                f"# Wasted Spend by N-gram\n\nNo n-grams with zero-conversion spend in at least "
+                f"{params.min_terms} search terms ({summary['search_terms']:,} terms scanned)."
+            )
 
-    response_format: ResponseFormat = Field(
-        default=ResponseFormat.MARKDOWN,
-        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
-    )
+        preamble = (
+            f"# Wasted Spend by N-gram\n\n**Account:** {customer_id} | **Period:** {params.date_range.value} | "
+            f"**Search terms:** {summary['search_terms']:,} | "
+            f"**Zero-conversion spend:** ${summary['wasted_cost_total']:,.2f}\n\n"
+        )
+        return build_markdown_response(
+            preamble,
+            ["N-gram", "Terms", "Wasted", "Share", "Cost", "Clicks", "Conv.", "ROAS", "Examples"],
+            results,
+            lambda row: (
+                row["ngram"], f"{row['wasted_terms']:,}/{row['terms']:,}", f"${row['wasted_cost']:,.2f}",
+                f"{row['wasted_share']}%", f"${row['cost']:,.2f}", f"{row['clicks']:,}", row["conversions"],
+                row["roas"],
+                "; ".join(f"{example['search_term']} (${example['cost']:,.2f})" for example in row["examples"])
+            ),
+            hint="Lower the limit or the number of examples."
+        )
 
+    except Exception as e:
+        return f"Error analyzing search term n-grams: {str(e)}"
 
-# ============================================================================
-# TOOL IMPLEMENTATIONS
-# ============================================================================
 
 @mcp.tool(
-    name="run_google_ads_gaql",
+    name="google_ads_query_store",
     annotations={
-        "title": "Run Google Ads GAQL Query",
+        "title": "Query Stored GAQL Results",
         "readOnlyHint": True,
         "destructiveHint": False,
         "idempotentHint": True,
-        "openWorldHint": True
+        "openWorldHint": False
     }
 )
-async def run_google_ads_gaql(params: RunGoogleAdsGaqlInput) -> str:
-    """
-    Run any Google Ads Query Language (GAQL) query for data retrieval (read-only).
-    This tool is for advanced users who are familiar with GAQL.
-    For simpler use cases, consider using 'list_google_ads_resources'.
+@instrumented
+async def google_ads_query_store(params: QueryStoreInput) -> str:
     """
-    try:
-        # Basic check to prevent mutations
-        query_lower = params.query.lower()
-        if any(op in query_lower for op in ["create", "update", "remove", "mutate"]):
-            raise ValueError("This tool is read-only and does not support mutation operations.")
+    Run read-only SQL against GAQL results stored with run_google_ads_gaql(store_as=...).
 
-        client = get_google_ads_client()
-        customer_id = format_customer_id(params.customer_id)
+    One expensive pull (e.g. a full search_term_view export) can answer any
+    number of follow-up slices here without calling the Google Ads API.
+    Without sql, lists the stored tables with their columns and row counts.
 
-        # Note: page_size is not supported by Google Ads API search method
-        # The page_size parameter is ignored as the API handles pagination internally
-        results = execute_gaql_query(
-            client,
-            customer_id,
-            params.query,
-            use_streaming=params.use_streaming,
-            page_size=None  # Always None as the API doesn't support page_size parameter
-        )
+    Args:
+        params (QueryStoreInput): SQL statement and output format
 
-        # Serialize results using the robust helper function
-        serialized_results = [serialize_gaql_row(row) for row in results]
+    Returns:
+        str: Query results (budgeted to CHARACTER_LIMIT) or the table list
+    """
+    try:
+        store = metrics_store if params.store == StoreName.METRICS else result_store
+        if not params.sql:
+            if params.store == StoreName.METRICS:
+                tables = await run_blocking(metrics_sync.list_tables)
+            else:
+                tables = await run_blocking(store.list_tables)
+                for table in tables:
+                    table["columns"] = json.loads(table["columns"])
+            return build_json_response({"store_path": store.path}, tables, rows_key="tables", count_key="table_count")
 
-        return json.dumps({
-            "customer_id": customer_id,
-            "query": params.query,
-            "results": serialized_results,
-            "result_count": len(serialized_results),
-            "streaming_used": params.use_streaming
-        }, indent=2)
+        cursor = await run_blocking(store.query, params.sql)
+        header = {"sql": params.sql}
+
+        if params.response_format == GaqlResponseFormat.COLUMNAR:
+            header["format"] = GaqlResponseFormat.COLUMNAR.value
+            columns = [column[0] for column in cursor.description]
+            return await run_blocking(build_columnar_response, header, columns, iter_cursor_rows(cursor))
+        return await run_blocking(build_json_response, header, iter_cursor_rows(cursor, as_dicts=True))
 
     except Exception as e:
-        return f"Error executing GAQL query: {str(e)}\nQuery: {params.query}"
+        return f"Error querying stored results: {str(e)}"
 
 
 @mcp.tool(
-    name="google_ads_list_accounts",
+    name="google_ads_sync_metrics",
     annotations={
-        "title": "List Google Ads Accounts",
-        "readOnlyHint": True,
+        "title": "Sync Daily Metrics",
+        "readOnlyHint": False,
         "destructiveHint": False,
         "idempotentHint": True,
         "openWorldHint": True
     }
 )
-async def google_ads_list_accounts(params: ListAccountsInput) -> str:
+@instrumented
+async def google_ads_sync_metrics(params: SyncMetricsInput) -> str:
     """
-    List all Google Ads accounts accessible under the MCC account.
+    Incrementally sync daily campaign/ad group/keyword metrics into the local metrics store.
 
-    Returns a list of customer accounts with basic information including
-    account ID, name, currency, timezone, and status.
+    Only days after each account's watermark are fetched, plus a restatement
+    window for conversion lag, so a daily run touches a few days instead of
+    the full lookback. Read the results with google_ads_query_store
+    (store='metrics').
 
     Args:
-        params (ListAccountsInput): Query parameters including output format
+        params (SyncMetricsInput): Accounts, resources and windows
 
     Returns:
-        str: Account list in JSON or Markdown format
+        str: JSON summary of synced windows and row counts per account
     """
     try:
-        client = get_google_ads_client()
-
-        # Get MCC account ID from environment
-        mcc_id = os.getenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID")
-        if not mcc_id:
-            raise ValueError("MCC account ID not configured. Set GOOGLE_ADS_LOGIN_CUSTOMER_ID environment variable.")
-
-        # Query for all accessible customer accounts
-        accounts_query = """
-            SELECT
-                customer_client.id,
-                customer_client.descriptive_name,
-                customer_client.currency_code,
-                customer_client.time_zone,
-                customer_client.status,
-                customer_client.manager,
-                customer_client.test_account
-            FROM customer_client
-            WHERE customer_client.status = 'ENABLED'
-                AND customer_client.manager = FALSE
-            ORDER BY customer_client.id
-        """
-
-        results = execute_gaql_query(client, format_customer_id(mcc_id), accounts_query)
-
-        # Convert results to JSON format first
-        accounts = []
-        for row in results:
-            account = {
-                "id": str(row.customer_client.id),
-                "name": row.customer_client.descriptive_name,
-                "currency": row.customer_client.currency_code,
-                "timezone": row.customer_client.time_zone,
-                "status": row.customer_client.status.name if hasattr(row.customer_client.status, 'name') else str(row.customer_client.status),
-                "is_manager": row.customer_client.manager,
-                "is_test_account": row.customer_client.test_account
-            }
-            accounts.append(account)
-
-        if params.response_format == ResponseFormat.JSON:
-            return json.dumps({
-                "mcc_account_id": mcc_id,
-                "total_accounts": len(accounts),
-                "accounts": accounts
-            }, indent=2)
+        client = await run_blocking(get_google_ads_client)
+        if params.customer_ids:
+            # Time zones are looked up per account by the sync
+            time_zones = {format_customer_id(customer_id): None for customer_id in params.customer_ids}
         else:
-            # Markdown format
-            if not accounts:
-                return f"# Google Ads Accounts\n\nNo accessible accounts found under MCC {mcc_id}."
+            accounts = await run_blocking(fetch_client_accounts, client, get_mcc_id())
+            time_zones = {account["id"]: account.get("timezone") for account in accounts}
+        customer_ids = list(time_zones)
+
+        semaphore = asyncio.Semaphore(params.max_parallel)
+
+        async def sync_account(customer_id: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                summaries = []
+                for resource in params.resources:
+                    try:
+                        summaries.append(await run_bulk(
+                            metrics_sync.sync,
+                            client,
+                            customer_id,
+                            resource,
+                            lookback_days=params.lookback_days,
+                            restatement_days=params.restatement_days,
+                            time_zone=time_zones[customer_id]
+                        ))
+                    except Exception as e:
+                        summaries.append({
+                            "customer_id": customer_id,
+                            "resource": resource,
+                            "status": "error",
+                            "error": str(e)
+                        })
+                return summaries
+
+        outcomes = await asyncio.gather(*(sync_account(customer_id) for customer_id in customer_ids))
+        summaries = [summary for outcome in outcomes for summary in outcome]
+        header = {
+            "store_path": metrics_sync.path,
+            "accounts": len(customer_ids),
+            "rows_synced": sum(summary.get("rows", 0) for summary in summaries),
+            "errors": sum(1 for summary in summaries if summary["status"] == "error")
+        }
+        return build_json_response(header, summaries, rows_key="syncs", count_key="sync_count")
 
-            md_output = f"# Google Ads Accounts\n\n"
-            md_output += f"**MCC Account:** {mcc_id}\n"
-            md_output += f"**Total Accounts:** {len(accounts)}\n\n"
+    except Exception as e:
+        return f"Error syncing metrics: {str(e)}"
+
+
+@mcp.tool(
+    name="google_ads_server_stats",
+    annotations={
+        "title": "Server Statistics",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": False
+    }
+)
+@instrumented
+async def google_ads_server_stats(params: ServerStatsInput) -> str:
+    """
+    Report where time goes inside the server, for sizing and regression checks.
 
-            md_output += "| Account ID | Name | Currency | Status | Timezone |\n"
-            md_output += "|------------|------|----------|--------|----------|\n"
+    Includes latency histograms (count, mean, p50/p95/p99, max) per tool and
+    per stage - client setup, OAuth refresh, scheduler wait, GAQL API time
+    and time to first row, row serialization, JSON/columnar encoding and
+    markdown rendering - rows and response bytes per call, and the counters
+    of the client pool, result cache, scheduler, single-flight coalescing,
+    cursors, account hierarchy and field catalog. No API calls are made.
 
-            for account in accounts:
-                name = account.get("name", "N/A") or "N/A"
-                md_output += f"| {account['id']} | {name} | {account['currency']} | {account['status']} | {account['timezone']} |\n"
+    Args:
+        params (ServerStatsInput): Whether to reset histograms after reading
 
-            return md_output
+    Returns:
+        str: JSON statistics
+    """
+    try:
+        stats = server_metrics.snapshot()
+        stats["components"] = {
+            "client_pool": client_pool.stats(),
+            "result_cache": result_cache.stats(),
+            "scheduler": gaql_scheduler.stats(),
+            "single_flight": gaql_single_flight.stats(),
+            "cursors": cursor_registry.stats(),
+            "account_hierarchy": account_hierarchy.stats(),
+            "field_catalog": field_catalog.stats()
+        }
+        stats["exports"] = {
+            "prometheus_file": server_metrics.prometheus_path,
+            "jsonl_log": server_metrics.jsonl_path
+        }
+        if params.reset:
+            server_metrics.reset()
+        return json.dumps(stats, indent=2)
 
     except Exception as e:
-        return f"Error listing accounts: {str(e)}"
+        return f"Error reading server stats: {str(e)}"
 
 
 def serialize_gaql_row(row) -> dict:
@@ -528,6 +6254,8 @@ def serialize_gaql_row(row) -> dict:
     Returns:
         dict: Serialized row data
     """
+    from google.protobuf.json_format import MessageToJson
+
     try:
         # Try using MessageToJson on the row directly first
         return json.loads(MessageToJson(row))
@@ -571,5 +6299,7 @@ def serialize_gaql_row(row) -> dict:
 # ============================================================================
 
 if __name__ == "__main__":
+    if GOOGLE_ADS_PREWARM:
+        install_prewarm_hook(mcp)
     # Run the MCP server using stdio transport
     mcp.run()
@@ -0,0 +1 @@
+"""Test suite for google-ads plugin."""
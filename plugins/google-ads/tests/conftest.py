@@ -0,0 +1,114 @@
+"""Pytest configuration and fixtures for google-ads tests."""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+@pytest.fixture(autouse=True)
+def reset_result_cache():
+    """Start every test with an empty GAQL result cache."""
+    import google_ads_mcp
+
+    google_ads_mcp.result_cache.clear()
+    yield
+    google_ads_mcp.result_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_field_catalog(tmp_path, monkeypatch):
+    """Keep GAQL field catalogs in a per-test directory, away from the user's cache."""
+    import google_ads_mcp
+
+    monkeypatch.setattr(
+        google_ads_mcp, "field_catalog", google_ads_mcp.GaqlFieldCatalogCache(str(tmp_path / "catalog"))
+    )
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_scheduler(monkeypatch):
+    """Admit GAQL calls immediately and never sleep between retries."""
+    import google_ads_mcp
+
+    scheduler = google_ads_mcp.GaqlScheduler(developer_qps=0, customer_qps=0, sleep=lambda seconds: None)
+    monkeypatch.setattr(google_ads_mcp, "gaql_scheduler", scheduler)
+    return scheduler
+
+
+@pytest.fixture(autouse=True)
+def fresh_single_flight(monkeypatch):
+    """Never let one test join a GAQL stream left open by another."""
+    import google_ads_mcp
+
+    single_flight = google_ads_mcp.GaqlSingleFlight()
+    monkeypatch.setattr(google_ads_mcp, "gaql_single_flight", single_flight)
+    return single_flight
+
+
+@pytest.fixture
+def mock_credentials_env(monkeypatch):
+    """Set the OAuth environment variables required by get_google_ads_client."""
+    env = {
+        "GOOGLE_ADS_DEVELOPER_TOKEN": "test-developer-token",
+        "GOOGLE_ADS_LOGIN_CUSTOMER_ID": "1234567890",
+        "GOOGLE_ADS_CLIENT_ID": "test-client-id.apps.googleusercontent.com",
+        "GOOGLE_ADS_CLIENT_SECRET": "test-client-secret",
+        "GOOGLE_ADS_REFRESH_TOKEN": "1//test-refresh-token",
+    }
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return env
+
+
+@pytest.fixture
+def mock_no_credentials_env(monkeypatch):
+    """Remove the OAuth environment variables."""
+    for name in (
+        "GOOGLE_ADS_DEVELOPER_TOKEN",
+        "GOOGLE_ADS_LOGIN_CUSTOMER_ID",
+        "GOOGLE_ADS_CLIENT_ID",
+        "GOOGLE_ADS_CLIENT_SECRET",
+        "GOOGLE_ADS_REFRESH_TOKEN",
+    ):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def make_campaign_row():
+    """Factory for raw GoogleAdsRow protobufs with campaign fields and metrics."""
+    from google.ads.googleads.v21.services.types.google_ads_service import GoogleAdsRow
+
+    row_class = GoogleAdsRow.pb()
+
+    def factory(campaign_id=1, name="Campaign", status=2, cost_micros=0, clicks=0):
+        row = row_class()
+        row.campaign.id = campaign_id
+        row.campaign.name = name
+        row.campaign.status = status
+        row.metrics.cost_micros = cost_micros
+        row.metrics.clicks = clicks
+        return row
+
+    return factory
+
+
+@pytest.fixture
+def make_stream_client():
+    """Factory for a mock client whose search_stream yields the given rows in batches."""
+    from types import SimpleNamespace
+    from unittest.mock import Mock
+
+    def factory(rows, batch_size=2):
+        batches = [
+            SimpleNamespace(results=rows[i:i + batch_size])
+            for i in range(0, len(rows), batch_size)
+        ]
+        client = Mock()
+        client.get_service.return_value.search_stream.return_value = iter(batches)
+        client.get_service.return_value.search.return_value = iter(rows)
+        return client
+
+    return factory
@@ -0,0 +1,146 @@
+# File: plugins/google-ads/tests/test_accounts.py
+"""Tests for the cached MCC account hierarchy."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    AccountHierarchyCache,
+    ListAccountsInput,
+    ResponseFormat,
+    google_ads_list_accounts,
+    walk_account_hierarchy,
+)
+
+# manager id -> [(id, name, status, is_manager, level)]
+TREE = {
+    "1000000000": [
+        ("1000000000", "Root MCC", 2, True, 0),
+        ("2000000000", "Agency Sub-MCC", 2, True, 1),
+        ("3000000000", "Direct Client", 2, False, 1),
+        ("4000000000", "Closed Client", 4, False, 1),
+    ],
+    "2000000000": [
+        ("2000000000", "Agency Sub-MCC", 2, True, 0),
+        ("5000000000", "Nested Shoes", 2, False, 1),
+    ],
+}
+
+
+@pytest.fixture
+def hierarchy_client():
+    """Mock client serving customer_client rows for TREE."""
+    from google.ads.googleads.v21.services.types.google_ads_service import GoogleAdsRow
+
+    row_class = GoogleAdsRow.pb()
+
+    def search_stream(customer_id, query):
+        rows = []
+        for account_id, name, status, manager, level in TREE[customer_id]:
+            row = row_class()
+            row.customer_client.id = int(account_id)
+            row.customer_client.descriptive_name = name
+            row.customer_client.status = status
+            row.customer_client.manager = manager
+            row.customer_client.level = level
+            rows.append(row)
+        return iter([SimpleNamespace(results=rows)])
+
+    client = Mock()
+    client.get_service.return_value.search_stream.side_effect = search_stream
+    return client
+
+
+@pytest.fixture
+def fresh_hierarchy(monkeypatch):
+    """Replace the module hierarchy cache with one that never refreshes in the background."""
+    cache = AccountHierarchyCache(background_refresh=False)
+    monkeypatch.setattr(google_ads_mcp, "account_hierarchy", cache)
+    return cache
+
+
+class TestWalkAccountHierarchy:
+    """Tests for walking nested managers."""
+
+    def test_includes_nested_accounts_with_paths(self, hierarchy_client):
+        """Test sub-manager children are recorded with level and manager path."""
+        accounts = {a["id"]: a for a in walk_account_hierarchy(hierarchy_client, "1000000000")}
+
+        assert set(accounts) == {"1000000000", "2000000000", "3000000000", "4000000000", "5000000000"}
+        assert accounts["1000000000"]["level"] == 0
+        assert accounts["3000000000"]["manager_path"] == ["1000000000"]
+        assert accounts["5000000000"]["level"] == 2
+        assert accounts["5000000000"]["manager_path"] == ["1000000000", "2000000000"]
+
+
+class TestAccountHierarchyCache:
+    """Tests for serving accounts from memory."""
+
+    def test_second_lookup_is_served_from_memory(self, hierarchy_client, fresh_hierarchy):
+        """Test the tree is walked once and then reused."""
+        fresh_hierarchy.get_accounts(hierarchy_client, "1000000000")
+        calls = hierarchy_client.get_service.return_value.search_stream.call_count
+        fresh_hierarchy.get_accounts(hierarchy_client, "100-000-0000")
+
+        assert hierarchy_client.get_service.return_value.search_stream.call_count == calls
+        assert fresh_hierarchy.stats()["loads"] == 1
+
+    def test_find_by_name(self, hierarchy_client, fresh_hierarchy):
+        """Test name lookups are case-insensitive substring matches."""
+        fresh_hierarchy.get_accounts(hierarchy_client, "1000000000")
+        assert [a["id"] for a in fresh_hierarchy.find_by_name("1000000000", "shoes")] == ["5000000000"]
+
+    def test_failed_refresh_keeps_previous_tree(self, hierarchy_client, fresh_hierarchy):
+        """Test a refresh error leaves the cached accounts in place."""
+        fresh_hierarchy.get_accounts(hierarchy_client, "1000000000")
+        hierarchy_client.get_service.return_value.search_stream.side_effect = RuntimeError("UNAVAILABLE")
+        fresh_hierarchy.refresh_all()
+
+        assert len(fresh_hierarchy.get_accounts(hierarchy_client, "1000000000")) == 5
+        assert fresh_hierarchy.stats()["refresh_errors"] == 1
+
+
+class TestListAccountsTool:
+    """Tests for google_ads_list_accounts filtering."""
+
+    def _run(self, monkeypatch, client, **kwargs):
+        monkeypatch.setenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID", "1000000000")
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+        params = ListAccountsInput(response_format=ResponseFormat.JSON, **kwargs)
+        return json.loads(asyncio.run(google_ads_list_accounts(params)))
+
+    def test_default_lists_enabled_clients(self, monkeypatch, hierarchy_client, fresh_hierarchy):
+        """Test defaults match the original enabled, non-manager listing."""
+        output = self._run(monkeypatch, hierarchy_client)
+        assert [a["id"] for a in output["accounts"]] == ["3000000000", "5000000000"]
+
+    def test_include_managers_and_inactive(self, monkeypatch, hierarchy_client, fresh_hierarchy):
+        """Test managers and closed accounts can be requested."""
+        output = self._run(monkeypatch, hierarchy_client, include_managers=True, include_inactive=True)
+        assert output["total_accounts"] == 5
+
+    def test_name_filter(self, monkeypatch, hierarchy_client, fresh_hierarchy):
+        """Test name filtering is answered from the cached tree."""
+        output = self._run(monkeypatch, hierarchy_client, name_contains="direct")
+        assert [a["id"] for a in output["accounts"]] == ["3000000000"]
+
+    def test_markdown_table(self, monkeypatch, hierarchy_client, fresh_hierarchy):
+        """Test the Markdown listing shows level and the direct manager."""
+        monkeypatch.setenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID", "1000000000")
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: hierarchy_client)
+
+        output = asyncio.run(google_ads_list_accounts(ListAccountsInput()))
+
+        assert output.startswith("# Google Ads Accounts")
+        assert "| 5000000000 | Nested Shoes |" in output
+        assert output.rstrip().endswith("| 2 | 2000000000 |")
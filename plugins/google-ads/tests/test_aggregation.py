@@ -0,0 +1,163 @@
+# File: plugins/google-ads/tests/test_aggregation.py
+"""Tests for server-side GAQL aggregation."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    AggregateGaqlInput,
+    GaqlAggregator,
+    ResponseFormat,
+    google_ads_aggregate_gaql,
+)
+
+COLUMNS = ["campaign.name", "metrics.clicks", "metrics.cost_micros", "metrics.conversions", "metrics.conversions_value"]
+ROWS = [
+    ("Brand", 10, 5_000_000, 2.0, 40.0),
+    ("Brand", 30, 15_000_000, 1.0, 20.0),
+    ("Generic", 100, 80_000_000, 0.0, 0.0),
+    ("Shopping", 5, 1_000_000, 1.0, 30.0),
+]
+
+
+def aggregate(rows=ROWS, **kwargs):
+    aggregator = GaqlAggregator(
+        COLUMNS,
+        ["campaign.name"],
+        [("cost", "sum", "metrics.cost_micros"), ("clicks", "sum", "metrics.clicks"), ("rows", "count", None)],
+        ["roas", "cvr"]
+    )
+    for values in rows:
+        aggregator.add(values)
+    return aggregator, aggregator.results(**kwargs)
+
+
+class TestGaqlAggregator:
+    """Tests for the array-backed aggregator."""
+
+    def test_group_sums_and_derived_metrics(self):
+        """Test sums, counts and derived ratios per group."""
+        _, (rows, matching) = aggregate()
+        brand = next(row for row in rows if row["campaign.name"] == "Brand")
+
+        assert matching == 3
+        assert brand == {"campaign.name": "Brand", "cost": 20.0, "clicks": 40, "rows": 2, "roas": 3.0, "cvr": 7.5}
+
+    def test_order_and_limit(self):
+        """Test ordering by a metric and limiting the groups."""
+        _, (rows, _) = aggregate(order_by="cost", limit=2)
+        assert [row["campaign.name"] for row in rows] == ["Generic", "Brand"]
+
+    def test_having_filters(self):
+        """Test HAVING filters drop groups before the limit."""
+        _, (rows, matching) = aggregate(having=[("roas", ">=", 3.0)], order_by="roas")
+
+        assert [row["campaign.name"] for row in rows] == ["Shopping", "Brand"]
+        assert matching == 2
+
+    def test_missing_values_sort_last(self):
+        """Test groups without a ROAS (no spend) sort after real values."""
+        rows = ROWS + [("Paused", 0, 0, 0.0, 0.0)]
+        _, (result, _) = aggregate(rows=rows, order_by="roas", descending=False)
+        assert result[-1]["campaign.name"] == "Paused"
+
+    def test_min_max_avg(self):
+        """Test min/max/avg accumulators."""
+        aggregator = GaqlAggregator(
+            COLUMNS, [],
+            [("min", "min", "metrics.clicks"), ("max", "max", "metrics.clicks"), ("avg", "avg", "metrics.cost_micros")],
+            []
+        )
+        for values in ROWS:
+            aggregator.add(values)
+        rows, _ = aggregator.results()
+
+        assert rows == [{"min": 5, "max": 100, "avg": 25.25}]
+
+    def test_missing_select_field(self):
+        """Test fields absent from the SELECT clause are reported."""
+        with pytest.raises(ValueError, match="metrics.impressions"):
+            GaqlAggregator(COLUMNS, [], [], ["ctr"])
+
+    def test_unknown_order_by_rejected(self):
+        """Test ordering by a column the aggregator doesn't produce is an error."""
+        with pytest.raises(ValueError, match="'conversions'"):
+            aggregate(order_by="conversions")
+
+
+class TestAggregateInput:
+    """Tests for AggregateGaqlInput validation."""
+
+    def _params(self, **kwargs):
+        return AggregateGaqlInput(
+            customer_id="1234567890",
+            query="SELECT campaign.name, metrics.cost_micros FROM campaign",
+            group_by=["campaign.name"],
+            metrics=[{"name": "cost", "field": "metrics.cost_micros"}],
+            derived=["cpc"],
+            **kwargs
+        )
+
+    def test_known_names_accepted(self):
+        """Test metrics, derived metrics and group_by fields can be referenced."""
+        params = self._params(order_by="cpc", having=[{"metric": "cost", "operator": ">", "value": 1}])
+        assert params.order_by == "cpc"
+        assert self._params(order_by="campaign.name").order_by == "campaign.name"
+
+    def test_unknown_order_by_rejected(self):
+        """Test a typo in order_by fails validation instead of leaving rows unsorted."""
+        with pytest.raises(ValueError, match="order_by 'costs'.*Available: cost, cpc, campaign.name"):
+            self._params(order_by="costs")
+
+    def test_unknown_having_metric_rejected(self):
+        """Test a HAVING on an unknown metric fails validation instead of dropping every group."""
+        with pytest.raises(ValueError, match="having metric 'roas'"):
+            self._params(having=[{"metric": "roas", "operator": ">=", "value": 2}])
+
+
+class TestAggregateTool:
+    """Tests for the google_ads_aggregate_gaql tool."""
+
+    def test_json_summary(self, monkeypatch, make_campaign_row, make_stream_client):
+        """Test the tool returns only the aggregated groups."""
+        rows = [make_campaign_row(campaign_id=i, name=f"C{i % 2}", cost_micros=1_000_000, clicks=1) for i in range(10)]
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: make_stream_client(rows))
+        params = AggregateGaqlInput(
+            customer_id="1234567890",
+            query="SELECT campaign.name, metrics.cost_micros, metrics.clicks FROM campaign",
+            group_by=["campaign.name"],
+            metrics=[{"name": "cost", "field": "metrics.cost_micros"}, {"name": "clicks", "field": "metrics.clicks"}],
+            response_format=ResponseFormat.JSON
+        )
+
+        payload = json.loads(asyncio.run(google_ads_aggregate_gaql(params)))
+
+        assert payload["rows_scanned"] == 10
+        assert payload["results"] == [
+            {"campaign.name": "C0", "cost": 5.0, "clicks": 5},
+            {"campaign.name": "C1", "cost": 5.0, "clicks": 5},
+        ]
+
+    def test_non_numeric_field_rejected_before_querying(self, monkeypatch, make_stream_client):
+        """Test summing a text field names the field instead of failing mid-stream."""
+        client = make_stream_client([])
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+        params = AggregateGaqlInput(
+            customer_id="1234567890",
+            query="SELECT campaign.name, metrics.clicks FROM campaign",
+            metrics=[{"name": "names", "function": "sum", "field": "campaign.name"}]
+        )
+
+        result = asyncio.run(google_ads_aggregate_gaql(params))
+
+        assert result.startswith("Error aggregating GAQL results:")
+        assert "non-numeric field 'campaign.name'" in result
+        client.get_service.return_value.search_stream.assert_not_called()
@@ -0,0 +1,161 @@
+# File: plugins/google-ads/tests/test_anomalies.py
+"""Tests for robust z-score anomaly detection over campaign x day metrics."""
+
+import asyncio
+import json
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    CampaignAnomalyDetector,
+    DetectAnomaliesInput,
+    ResponseFormat,
+    earliest_account_date,
+    google_ads_detect_anomalies,
+    robust_z_score,
+)
+
+START = date(2025, 3, 1)
+
+
+def daily_rows(campaign_id, days=35, start=START, cost=100.0, conversions=4.0, spike=None):
+    """Rows for one campaign with a small weekly wobble and an optional {offset: cost multiplier}."""
+    rows = []
+    for offset in range(days):
+        multiplier = (spike or {}).get(offset, 1.0)
+        wobble = 1 + (offset % 7 - 3) / 100
+        day_cost = cost * wobble * multiplier
+        rows.append((
+            1234567890, campaign_id, f"Campaign {campaign_id}", (start + timedelta(days=offset)).isoformat(),
+            day_cost * 1_000_000, 50, 1000, conversions + offset % 3, day_cost * (3 + offset % 4 / 10)
+        ))
+    return rows
+
+
+def detect(rows, **kwargs):
+    detector = CampaignAnomalyDetector(START, baseline_days=28, detect_days=7)
+    for values in rows:
+        detector.add(values)
+    return detector, detector.scan(**kwargs)
+
+
+class TestRobustZScore:
+    """Tests for the median/MAD score."""
+
+    def test_outlier(self):
+        z, median, mad = robust_z_score(50.0, [10, 11, 9, 10, 12, 8, 10])
+
+        assert median == 10
+        assert mad == 1
+        assert z == pytest.approx(0.6745 * 40)
+
+    def test_mean_deviation_fallback(self):
+        """Test a mostly constant baseline still scores."""
+        z, median, mad = robust_z_score(5.0, [0, 0, 0, 0, 0, 2])
+
+        assert mad == 0
+        assert z == pytest.approx(5 / (1.2533 * 2 / 6))
+
+    def test_constant_baseline(self):
+        assert robust_z_score(3.0, [1, 1, 1, 1]) is None
+
+
+class TestCampaignAnomalyDetector:
+    """Tests for the dense matrix scan."""
+
+    def test_flags_spike_only(self):
+        """Test a cost spike in the scored window is the only flagged cost cell."""
+        _, flagged = detect(daily_rows(1) + daily_rows(2, spike={33: 4.0}), metrics=["cost"])
+
+        assert len(flagged) == 1
+        cell = flagged[0]
+        assert cell["campaign_id"] == "2"
+        assert cell["date"] == (START + timedelta(days=33)).isoformat()
+        assert cell["direction"] == "up"
+        assert cell["change_pct"] > 250
+
+    def test_roas_drop(self):
+        """Test ratio metrics derive from the summed base columns."""
+        rows = daily_rows(1)
+        day = list(rows[30])
+        day[8] = 0.0  # no conversion value on day 30
+        rows[30] = tuple(day)
+
+        _, flagged = detect(rows, metrics=["roas"])
+
+        assert [(cell["date"], cell["direction"]) for cell in flagged] == [
+            ((START + timedelta(days=30)).isoformat(), "down")
+        ]
+
+    def test_rows_fold_and_ignore_out_of_range(self):
+        """Test rows for the same cell add up and dates outside the matrix are dropped."""
+        detector = CampaignAnomalyDetector(START, baseline_days=7, detect_days=1)
+        detector.add((1, 5, "C", "2025-03-01", 1_000_000, 1, 10, 0.0, 0.0))
+        detector.add((1, 5, "C", "2025-03-01", 2_000_000, 1, 10, 0.0, 0.0))
+        detector.add((1, 5, "C", "2025-04-01", 2_000_000, 1, 10, 0.0, 0.0))
+
+        assert detector.rows_scanned == 2
+        assert detector.campaign_count == 1
+        assert detector._columns["cost_micros"][0] == 3_000_000
+
+    def test_new_campaign_not_scored(self):
+        """Test campaigns without enough active baseline days are skipped."""
+        rows = daily_rows(1)[-8:]
+        _, flagged = detect(rows)
+
+        assert flagged == []
+
+
+class TestEarliestAccountDate:
+    """Tests for picking the reporting date across account time zones."""
+
+    def test_uses_the_westernmost_account(self):
+        accounts = [
+            {"id": "1", "timezone": "Pacific/Kiritimati"},
+            {"id": "2", "timezone": "Pacific/Pago_Pago"},
+        ]
+        assert earliest_account_date(accounts) == datetime.now(ZoneInfo("Pacific/Pago_Pago")).date()
+
+    def test_unknown_timezone_falls_back_to_server_date(self):
+        assert earliest_account_date([{"id": "1"}, {"id": "2", "timezone": "Not/AZone"}]) == date.today()
+        assert earliest_account_date([]) == date.today()
+
+
+class TestDetectAnomaliesTool:
+    """Tests for the google_ads_detect_anomalies tool."""
+
+    def test_json(self, monkeypatch, make_stream_client):
+        from google.ads.googleads.v21.services.types.google_ads_service import GoogleAdsRow
+
+        start = date.today() - timedelta(days=35)
+        rows = []
+        for values in daily_rows(7, start=start, spike={34: 5.0}):
+            row = GoogleAdsRow.pb()()
+            (row.customer.id, row.campaign.id, row.campaign.name, row.segments.date,
+             cost_micros, row.metrics.clicks, row.metrics.impressions,
+             row.metrics.conversions, row.metrics.conversions_value) = values
+            row.metrics.cost_micros = int(cost_micros)
+            rows.append(row)
+        client = make_stream_client(rows)
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+
+        params = DetectAnomaliesInput(customer_ids=["123-456-7890"], metrics=["cost"], response_format=ResponseFormat.JSON)
+        payload = json.loads(asyncio.run(google_ads_detect_anomalies(params)))
+
+        query = client.get_service.return_value.search_stream.call_args.kwargs["query"]
+        assert f"BETWEEN '{start.isoformat()}'" in query
+        assert payload["campaigns"] == 1
+        assert payload["failed_accounts"] == {}
+        assert [(cell["campaign_id"], cell["metric"]) for cell in payload["anomalies"]] == [("7", "cost")]
+
+    def test_unknown_metric(self):
+        with pytest.raises(ValueError, match="Unknown metrics"):
+            DetectAnomaliesInput(metrics=["cpm"])
@@ -0,0 +1,206 @@
+# File: plugins/google-ads/tests/test_cache.py
+"""Tests for the GAQL result cache."""
+
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    AggregateGaqlInput,
+    GaqlResultCache,
+    gaql_cache_key,
+    google_ads_aggregate_gaql,
+    iter_serialized_gaql_rows,
+    normalize_gaql,
+    resolve_date_range,
+)
+
+QUERY = "SELECT campaign.id, campaign.name FROM campaign WHERE segments.date DURING LAST_7_DAYS"
+
+
+class TestResolveDateRange:
+    """Tests for relative date range resolution."""
+
+    def test_last_n_days_excludes_today(self):
+        """Test LAST_7_DAYS ends yesterday."""
+        assert resolve_date_range("LAST_7_DAYS", date(2025, 3, 10)) == (date(2025, 3, 3), date(2025, 3, 9))
+
+    def test_last_month(self):
+        """Test LAST_MONTH spans the whole previous month."""
+        assert resolve_date_range("last_month", date(2025, 3, 10)) == (date(2025, 2, 1), date(2025, 2, 28))
+
+    def test_last_business_week(self):
+        """Test LAST_BUSINESS_WEEK is Monday to Friday of the previous week."""
+        assert resolve_date_range("LAST_BUSINESS_WEEK", date(2025, 3, 5)) == (date(2025, 2, 24), date(2025, 2, 28))
+
+    def test_unknown_range(self):
+        """Test unknown ranges resolve to None."""
+        assert resolve_date_range("NEXT_YEAR", date(2025, 3, 5)) is None
+
+
+class TestNormalizeGaql:
+    """Tests for cache key normalization."""
+
+    def test_whitespace_and_case_insensitive(self):
+        """Test formatting differences produce the same key."""
+        compact = "select campaign.id,campaign.name from campaign"
+        spaced = "SELECT\n   campaign.id ,  campaign.name\nFROM campaign"
+        assert normalize_gaql(compact) == normalize_gaql(spaced)
+
+    def test_literals_preserved(self):
+        """Test quoted values keep their case and spacing."""
+        assert "'My  Campaign'" in normalize_gaql("SELECT campaign.id FROM campaign WHERE campaign.name = 'My  Campaign'")
+
+    def test_relative_ranges_roll_over_at_midnight(self):
+        """Test the same relative query gets a new key on a new day."""
+        monday = gaql_cache_key("123-456-7890", QUERY, date(2025, 3, 10))
+        tuesday = gaql_cache_key("1234567890", QUERY, date(2025, 3, 11))
+        assert monday != tuesday
+        assert "between '2025-03-03' and '2025-03-09'" in monday
+
+
+class TestGaqlResultCache:
+    """Tests for the LRU/TTL cache."""
+
+    def test_hit_and_miss_counters(self):
+        """Test hits and misses feed the hit ratio."""
+        cache = GaqlResultCache(ttl_seconds=60, max_entries=4, cache_dir=None)
+        assert cache.get("a") is None
+        cache.put("a", [{"x": 1}])
+
+        assert cache.get("a") == ([{"x": 1}], True)
+        assert cache.stats()["hit_ratio"] == 0.5
+
+    def test_expired_entries_miss(self, monkeypatch):
+        """Test entries expire after the TTL."""
+        cache = GaqlResultCache(ttl_seconds=60, max_entries=4, cache_dir=None)
+        cache.put("a", [])
+        now = google_ads_mcp.time.time()
+        monkeypatch.setattr(google_ads_mcp.time, "time", lambda: now + 61)
+
+        assert cache.get("a") is None
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first."""
+        cache = GaqlResultCache(ttl_seconds=60, max_entries=2, cache_dir=None)
+        cache.put("a", [])
+        cache.put("b", [])
+        cache.get("a")
+        cache.put("c", [])
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+    def test_disk_backing(self, tmp_path):
+        """Test entries survive a new cache instance via the disk directory."""
+        GaqlResultCache(ttl_seconds=60, max_entries=2, cache_dir=str(tmp_path)).put("a", [{"x": 1}], complete=False)
+        reloaded = GaqlResultCache(ttl_seconds=60, max_entries=2, cache_dir=str(tmp_path))
+
+        assert reloaded.get("a") == ([{"x": 1}], False)
+        assert reloaded.stats()["disk_hits"] == 1
+
+
+class TestCachedPipeline:
+    """Tests for caching in iter_serialized_gaql_rows."""
+
+    def test_repeat_query_makes_no_api_call(self, make_campaign_row, make_stream_client):
+        """Test a repeated query is served entirely from the cache."""
+        client = make_stream_client([make_campaign_row(campaign_id=i) for i in range(3)])
+        first = list(iter_serialized_gaql_rows(client, "1234567890", QUERY))
+        second = list(iter_serialized_gaql_rows(client, "123-456-7890", QUERY.lower()))
+
+        assert first == second
+        assert client.get_service.return_value.search_stream.call_count == 1
+
+    def test_use_cache_false_refetches(self, make_campaign_row, make_stream_client):
+        """Test use_cache=False always calls the API."""
+        client = make_stream_client([make_campaign_row()])
+        list(iter_serialized_gaql_rows(client, "1234567890", QUERY))
+        client.get_service.return_value.search_stream.return_value = iter([])
+        list(iter_serialized_gaql_rows(client, "1234567890", QUERY, use_cache=False))
+
+        assert client.get_service.return_value.search_stream.call_count == 2
+
+    def test_partial_prefix_resumes(self, make_campaign_row, make_stream_client):
+        """Test reading past a cached prefix re-queries and skips served rows."""
+        rows = [make_campaign_row(campaign_id=i) for i in range(4)]
+        client = make_stream_client(rows)
+        stream = iter_serialized_gaql_rows(client, "1234567890", QUERY)
+        next(stream)
+        stream.close()
+
+        client.get_service.return_value.search_stream.return_value = make_stream_client(rows).get_service().search_stream()
+        ids = [row["campaign"]["id"] for row in iter_serialized_gaql_rows(client, "1234567890", QUERY)]
+
+        assert ids == [0, 1, 2, 3]
+
+    def test_resumed_prefix_keeps_its_expiry(self, monkeypatch, make_campaign_row, make_stream_client):
+        """Test extending a prefix doesn't restart its TTL or count as a hit."""
+        rows = [make_campaign_row(campaign_id=i) for i in range(4)]
+        client = make_stream_client(rows)
+        stream = iter_serialized_gaql_rows(client, "1234567890", QUERY)
+        next(stream)
+        stream.close()
+        cache = google_ads_mcp.result_cache
+        key = google_ads_mcp.gaql_cache_key("1234567890", QUERY)
+        expires_at = cache.lookup(key)[0]
+        hits, partial_hits, misses = cache.hits, cache.partial_hits, cache.misses
+
+        now = google_ads_mcp.time.time()
+        monkeypatch.setattr(google_ads_mcp.time, "time", lambda: now + 30)
+        client.get_service.return_value.search_stream.return_value = make_stream_client(rows).get_service().search_stream()
+        list(iter_serialized_gaql_rows(client, "1234567890", QUERY))
+
+        assert (cache.hits, cache.partial_hits, cache.misses) == (hits, partial_hits + 1, misses + 1)
+        assert cache.lookup(key)[0] == expires_at
+
+    def test_record_false_reads_cache_without_filling_it(self, make_campaign_row, make_stream_client):
+        """Test record=False replays a cached result but doesn't store one."""
+        rows = [make_campaign_row(campaign_id=i) for i in range(3)]
+        client = make_stream_client(rows)
+        key = google_ads_mcp.gaql_cache_key("1234567890", QUERY)
+
+        assert len(list(iter_serialized_gaql_rows(client, "1234567890", QUERY, record=False))) == 3
+        assert google_ads_mcp.result_cache.lookup(key) is None
+
+        client.get_service.return_value.search_stream.return_value = make_stream_client(rows).get_service().search_stream()
+        list(iter_serialized_gaql_rows(client, "1234567890", QUERY))
+        assert len(list(iter_serialized_gaql_rows(client, "1234567890", QUERY, record=False))) == 3
+        assert client.get_service.return_value.search_stream.call_count == 2
+
+    def test_record_false_resumes_a_prefix_without_extending_it(self, make_campaign_row, make_stream_client):
+        """Test record=False still skips the cached prefix when it reads past it."""
+        rows = [make_campaign_row(campaign_id=i) for i in range(4)]
+        client = make_stream_client(rows)
+        stream = iter_serialized_gaql_rows(client, "1234567890", QUERY)
+        next(stream)
+        stream.close()
+
+        client.get_service.return_value.search_stream.return_value = make_stream_client(rows).get_service().search_stream()
+        ids = [row["campaign"]["id"] for row in iter_serialized_gaql_rows(client, "1234567890", QUERY, record=False)]
+
+        assert ids == [0, 1, 2, 3]
+        key = google_ads_mcp.gaql_cache_key("1234567890", QUERY)
+        assert len(google_ads_mcp.result_cache.lookup(key)[1]) == 1
+
+    def test_aggregate_tool_does_not_fill_the_cache(self, monkeypatch, make_campaign_row, make_stream_client):
+        """Test aggregating a report keeps only the summary, not the raw rows."""
+        rows = [make_campaign_row(campaign_id=i, name=f"C{i % 2}", clicks=1) for i in range(5)]
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: make_stream_client(rows))
+        query = "SELECT campaign.name, metrics.clicks FROM campaign"
+        params = AggregateGaqlInput(
+            customer_id="1234567890",
+            query=query,
+            group_by=["campaign.name"],
+            metrics=[{"name": "clicks", "field": "metrics.clicks"}]
+        )
+
+        assert "Aggregated Results" in asyncio.run(google_ads_aggregate_gaql(params))
+        key = gaql_cache_key("1234567890", query)
+        assert google_ads_mcp.result_cache.lookup(key + "|values") is None
+        assert google_ads_mcp.result_cache.lookup(key) is None
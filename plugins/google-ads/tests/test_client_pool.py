@@ -0,0 +1,118 @@
+# File: plugins/google-ads/tests/test_client_pool.py
+"""Tests for the pooled Google Ads client."""
+
+import pytest
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    GoogleAdsClientPool,
+    PooledGoogleAdsClient,
+    get_google_ads_client,
+)
+
+
+@pytest.fixture
+def fresh_pool(monkeypatch):
+    """Replace the module pool with one that never refreshes in the background."""
+    pool = GoogleAdsClientPool(background_refresh=False)
+    monkeypatch.setattr(google_ads_mcp, "client_pool", pool)
+    yield pool
+    pool.clear()
+
+
+class TestGetGoogleAdsClient:
+    """Tests for get_google_ads_client pooling."""
+
+    def test_missing_env_raises(self, mock_no_credentials_env, fresh_pool):
+        """Test error when OAuth variables are missing."""
+        with pytest.raises(ValueError, match="Missing required environment variables"):
+            get_google_ads_client()
+
+    def test_reuses_client_across_calls(self, mock_credentials_env, fresh_pool):
+        """Test repeated calls return the same pooled client."""
+        first = get_google_ads_client()
+        second = get_google_ads_client()
+
+        assert first is second
+        assert isinstance(first, PooledGoogleAdsClient)
+        assert fresh_pool.stats()["hits"] == 1
+        assert fresh_pool.stats()["misses"] == 1
+
+    def test_keyed_by_login_customer_id(self, mock_credentials_env, fresh_pool, monkeypatch):
+        """Test different login customer IDs get separate clients."""
+        first = get_google_ads_client()
+        monkeypatch.setenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID", "9999999999")
+        second = get_google_ads_client()
+
+        assert first is not second
+        assert fresh_pool.stats()["clients"] == 2
+
+
+class TestPooledService:
+    """Tests for service memoization on pooled clients."""
+
+    def test_service_is_cached(self, mock_credentials_env, fresh_pool):
+        """Test get_service reuses the service (and its channel)."""
+        client = get_google_ads_client()
+        first = client.get_service("GoogleAdsService")
+        second = client.get_service("GoogleAdsService")
+
+        assert first is second
+
+
+class TestTokenRefresh:
+    """Tests for proactive access token refresh."""
+
+    def _pool_with_credentials(self, credentials):
+        pool = GoogleAdsClientPool(refresh_margin_seconds=300, background_refresh=False)
+        client = Mock()
+        client.credentials = credentials
+        pool.get_client("1234567890", None, lambda: client)
+        return pool
+
+    def test_refreshes_missing_token(self):
+        """Test credentials without an access token are refreshed."""
+        credentials = Mock(token=None, expiry=None)
+        pool = self._pool_with_credentials(credentials)
+
+        pool.refresh_expiring_tokens()
+
+        credentials.refresh.assert_called_once()
+        assert pool.stats()["token_refreshes"] == 1
+
+    def test_refreshes_token_near_expiry(self):
+        """Test tokens inside the refresh margin are refreshed."""
+        expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=60)
+        credentials = Mock(token="ya29.token", expiry=expiry)
+        pool = self._pool_with_credentials(credentials)
+
+        pool.refresh_expiring_tokens()
+
+        credentials.refresh.assert_called_once()
+
+    def test_skips_fresh_token(self):
+        """Test tokens with plenty of lifetime left are not refreshed."""
+        expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+        credentials = Mock(token="ya29.token", expiry=expiry)
+        pool = self._pool_with_credentials(credentials)
+
+        pool.refresh_expiring_tokens()
+
+        credentials.refresh.assert_not_called()
+
+    def test_refresh_errors_are_counted(self):
+        """Test refresh failures are recorded rather than raised."""
+        credentials = Mock(token=None, expiry=None)
+        credentials.refresh.side_effect = RuntimeError("invalid_grant")
+        pool = self._pool_with_credentials(credentials)
+
+        pool.refresh_expiring_tokens()
+
+        assert pool.stats()["token_refresh_errors"] == 1
@@ -0,0 +1,73 @@
+# File: plugins/google-ads/tests/test_execution.py
+"""Tests for GAQL execution off the event loop."""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    RunGoogleAdsGaqlInput,
+    run_blocking,
+    run_google_ads_gaql,
+)
+
+
+def make_slow_client(delay: float) -> Mock:
+    """Build a client whose search_stream blocks for the given delay."""
+    def search_stream(customer_id, query):
+        time.sleep(delay)
+        return iter([])
+
+    client = Mock()
+    client.get_service.return_value.search_stream.side_effect = search_stream
+    return client
+
+
+class TestRunBlocking:
+    """Tests for the bounded GAQL thread pool."""
+
+    def test_runs_outside_event_loop_thread(self):
+        """Test blocking work executes on a GAQL worker thread."""
+        async def main():
+            return await run_blocking(lambda: threading.current_thread().name)
+
+        assert asyncio.run(main()).startswith("google-ads-gaql")
+
+    def test_passes_arguments(self):
+        """Test positional and keyword arguments reach the callable."""
+        async def main():
+            return await run_blocking(lambda a, b=0: a + b, 2, b=3)
+
+        assert asyncio.run(main()) == 5
+
+
+class TestConcurrentTools:
+    """Tests that concurrent tool calls overlap."""
+
+    def test_concurrent_queries_overlap(self, monkeypatch):
+        """Test two slow queries finish in roughly the time of one."""
+        delay = 0.3
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: make_slow_client(delay))
+        params = RunGoogleAdsGaqlInput(
+            customer_id="1234567890",
+            query="SELECT campaign.id FROM campaign",
+            use_streaming=True
+        )
+
+        async def main():
+            start = time.perf_counter()
+            results = await asyncio.gather(run_google_ads_gaql(params), run_google_ads_gaql(params))
+            return results, time.perf_counter() - start
+
+        results, elapsed = asyncio.run(main())
+
+        assert all(json.loads(result)["result_count"] == 0 for result in results)
+        assert elapsed < delay * 1.8
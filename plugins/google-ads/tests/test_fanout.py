@@ -0,0 +1,207 @@
+# File: plugins/google-ads/tests/test_fanout.py
+"""Tests for cross-account GAQL fan-out."""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    ResponseBudget,
+    RunGaqlAcrossAccountsInput,
+    build_json_response,
+    run_google_ads_gaql_across_accounts,
+    select_accounts,
+)
+
+ACCOUNTS = [
+    {"id": "1111111111", "name": "Acme Shoes US"},
+    {"id": "2222222222", "name": "Acme Shoes UK"},
+    {"id": "3333333333", "name": "Widgets Inc"},
+]
+
+
+class TestSelectAccounts:
+    """Tests for account selection."""
+
+    def test_all_accounts_by_default(self):
+        """Test no selector keeps every account."""
+        assert select_accounts(ACCOUNTS) == ACCOUNTS
+
+    def test_name_pattern_is_case_insensitive(self):
+        """Test glob patterns match names regardless of case."""
+        assert [a["id"] for a in select_accounts(ACCOUNTS, name_pattern="*SHOES*")] == ["1111111111", "2222222222"]
+
+    def test_explicit_ids_with_dashes(self):
+        """Test explicit IDs are normalized and de-duplicated."""
+        selected = select_accounts(ACCOUNTS, customer_ids=["333-333-3333", "3333333333", "4444444444"])
+        assert [a["id"] for a in selected] == ["3333333333", "4444444444"]
+
+
+class TestRunGaqlAcrossAccounts:
+    """Tests for the fan-out tool."""
+
+    def _client(self, make_campaign_row, delay=0.0, failing=()):
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def search_stream(customer_id, query):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            try:
+                time.sleep(delay)
+                if customer_id in failing:
+                    raise RuntimeError("PERMISSION_DENIED")
+                row = make_campaign_row(campaign_id=int(customer_id[0]), name=f"Campaign {customer_id}")
+                return iter([SimpleNamespace(results=[row])])
+            finally:
+                with lock:
+                    state["active"] -= 1
+
+        client = Mock()
+        client.get_service.return_value.search_stream.side_effect = search_stream
+        return client, state
+
+    def _params(self, monkeypatch, client, **kwargs):
+        monkeypatch.setenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID", "9999999999")
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+        return RunGaqlAcrossAccountsInput(query="SELECT campaign.id, campaign.name FROM campaign", **kwargs)
+
+    def _run(self, monkeypatch, client, **kwargs):
+        monkeypatch.setenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID", "9999999999")
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+        monkeypatch.setattr(google_ads_mcp, "fetch_client_accounts", lambda client, mcc_id: ACCOUNTS)
+        params = RunGaqlAcrossAccountsInput(query="SELECT campaign.id, campaign.name FROM campaign", **kwargs)
+        return json.loads(asyncio.run(run_google_ads_gaql_across_accounts(params)))
+
+    def test_merges_rows_with_customer_id(self, monkeypatch, make_campaign_row):
+        """Test rows from every account are merged with a customer_id column."""
+        client, _ = self._client(make_campaign_row)
+        output = self._run(monkeypatch, client)
+
+        assert output["accounts_succeeded"] == 3
+        assert [row["customer_id"] for row in output["results"]] == ["1111111111", "2222222222", "3333333333"]
+        assert set(output["slowest_accounts_ms"]) == {"1111111111", "2222222222", "3333333333"}
+
+    def test_errors_are_isolated(self, monkeypatch, make_campaign_row):
+        """Test one failing account does not fail the sweep."""
+        client, _ = self._client(make_campaign_row, failing={"2222222222"})
+        output = self._run(monkeypatch, client)
+
+        assert output["accounts_failed"] == 1
+        assert "PERMISSION_DENIED" in output["failed_accounts"]["2222222222"]
+        assert output["result_count"] == 2
+
+    def test_header_stays_small_when_many_accounts_fail(self, monkeypatch):
+        """Test errors are sampled and shortened, so the response stays within budget."""
+        accounts = [{"id": f"{i:010d}", "name": f"Account {i}"} for i in range(1, 301)]
+        client = Mock()
+        client.get_service.return_value.search_stream.side_effect = (
+            lambda customer_id, query: (_ for _ in ()).throw(RuntimeError(f"PERMISSION_DENIED for {query} " + "x" * 500))
+        )
+        monkeypatch.setattr(google_ads_mcp, "fetch_client_accounts", lambda client, mcc_id: accounts)
+        output = asyncio.run(run_google_ads_gaql_across_accounts(self._params(monkeypatch, client)))
+        parsed = json.loads(output)
+
+        assert len(output) <= google_ads_mcp.CHARACTER_LIMIT
+        assert parsed["accounts_failed"] == 300
+        assert len(parsed["failed_accounts"]) == google_ads_mcp.FANOUT_HEADER_SAMPLE
+        assert all("SELECT" not in error for error in parsed["failed_accounts"].values())
+
+    def test_accounts_stop_reading_when_response_is_full(self, monkeypatch, make_campaign_row, make_stream_client):
+        """Test the shared budget stops accounts long before max_rows_per_account."""
+        rows = [make_campaign_row(campaign_id=i, name="x" * 100) for i in range(5_000)]
+        client = make_stream_client(rows, batch_size=100)
+        client.get_service.return_value.search_stream.side_effect = (
+            lambda customer_id, query: make_stream_client(rows, batch_size=100).get_service().search_stream()
+        )
+        served = []
+        serialize = google_ads_mcp.iter_serialized_gaql_rows
+
+        def counting(*args, **kwargs):
+            for row in serialize(*args, **kwargs):
+                served.append(row)
+                yield row
+
+        monkeypatch.setattr(google_ads_mcp, "iter_serialized_gaql_rows", counting)
+        monkeypatch.setattr(google_ads_mcp, "fetch_client_accounts", lambda client, mcc_id: ACCOUNTS)
+        parsed = json.loads(asyncio.run(run_google_ads_gaql_across_accounts(
+            self._params(monkeypatch, client, max_rows_per_account=5_000)
+        )))
+
+        assert parsed["truncated"] is True
+        assert len(served) < 1_000
+        assert parsed["accounts_with_more_rows_total"] == 3
+
+    def test_budget_matches_the_emitted_rows(self):
+        """Test the shared budget admits exactly the merged rows the final response can hold."""
+        rows = [{"campaign": {"id": str(i), "name": "x" * 40}} for i in range(2_000)]
+        budget = ResponseBudget(5_000)
+        admitted = sum(1 for row in rows if budget.charge("1111111111", row))
+
+        merged = [{"customer_id": "1111111111", **row} for row in rows]
+        emitted = json.loads(build_json_response({}, merged, budget=5_000))["result_count"]
+        # Footer and brackets take a few rows' worth of the same budget
+        assert emitted <= admitted <= emitted + 5
+
+    def test_accounts_cut_by_final_truncation_are_listed(self, monkeypatch, make_campaign_row, make_stream_client):
+        """Test accounts whose rows were dropped when the response was built are reported as having more rows."""
+        rows = [make_campaign_row(campaign_id=i, name="x" * 100) for i in range(200)]
+        client = make_stream_client(rows)
+        client.get_service.return_value.search_stream.side_effect = (
+            lambda customer_id, query: make_stream_client(rows, batch_size=100).get_service().search_stream()
+        )
+        # A budget too large to stop any account, so only the final truncation cuts rows
+        monkeypatch.setattr(google_ads_mcp, "ResponseBudget", lambda: ResponseBudget(10 ** 9))
+        monkeypatch.setattr(google_ads_mcp, "fetch_client_accounts", lambda client, mcc_id: ACCOUNTS)
+
+        parsed = json.loads(asyncio.run(run_google_ads_gaql_across_accounts(
+            self._params(monkeypatch, client, max_rows_per_account=1_000)
+        )))
+
+        assert parsed["truncated"] is True
+        assert parsed["result_count"] < 200
+        assert parsed["accounts_with_more_rows"] == ["1111111111", "2222222222", "3333333333"]
+        assert parsed["accounts_with_more_rows_total"] == 3
+
+    def test_accounts_fully_returned_are_not_listed(self, monkeypatch, make_campaign_row, make_stream_client):
+        """Test only accounts past the cut are listed when earlier ones fit."""
+        small = [make_campaign_row(campaign_id=1, name="small")]
+        large = [make_campaign_row(campaign_id=i, name="x" * 100) for i in range(200)]
+        client = Mock()
+        client.get_service.return_value.search_stream.side_effect = lambda customer_id, query: iter(
+            [SimpleNamespace(results=large if customer_id == "2222222222" else small)]
+        )
+        monkeypatch.setattr(google_ads_mcp, "ResponseBudget", lambda: ResponseBudget(10 ** 9))
+        monkeypatch.setattr(google_ads_mcp, "fetch_client_accounts", lambda client, mcc_id: ACCOUNTS)
+
+        parsed = json.loads(asyncio.run(run_google_ads_gaql_across_accounts(
+            self._params(monkeypatch, client, max_rows_per_account=1_000)
+        )))
+
+        assert parsed["results"][0]["customer_id"] == "1111111111"
+        assert parsed["accounts_with_more_rows"] == ["2222222222", "3333333333"]
+
+    def test_parallelism_cap(self, monkeypatch, make_campaign_row):
+        """Test no more than max_parallel accounts run at once."""
+        client, state = self._client(make_campaign_row, delay=0.05)
+        self._run(monkeypatch, client, max_parallel=2)
+
+        assert state["peak"] == 2
+
+    def test_name_pattern_selection(self, monkeypatch, make_campaign_row):
+        """Test only accounts matching the pattern are queried."""
+        client, _ = self._client(make_campaign_row)
+        output = self._run(monkeypatch, client, account_name_pattern="widgets*")
+
+        assert output["accounts_queried"] == 1
+        assert output["results"][0]["customer_id"] == "3333333333"
@@ -0,0 +1,124 @@
+# File: plugins/google-ads/tests/test_instrumentation.py
+"""Tests for latency/size histograms and the server stats tool."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    Histogram,
+    RunGoogleAdsGaqlInput,
+    ServerMetrics,
+    ServerStatsInput,
+    google_ads_server_stats,
+    run_google_ads_gaql,
+)
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    """A fresh metrics registry installed as the module registry."""
+    server_metrics = ServerMetrics(prometheus_path=None, jsonl_path=None)
+    monkeypatch.setattr(google_ads_mcp, "server_metrics", server_metrics)
+    return server_metrics
+
+
+class TestHistogram:
+    """Tests for bucketed summaries."""
+
+    def test_summary(self):
+        histogram = Histogram((1, 10, 100))
+        for value in (0.5, 2, 3, 50, 500):
+            histogram.observe(value)
+
+        summary = histogram.summary()
+        assert summary["count"] == 5
+        assert summary["min"] == 0.5
+        assert summary["max"] == 500
+        assert summary["mean"] == pytest.approx(111.1)
+        assert histogram.counts == [1, 2, 1, 1]
+        assert 1 <= summary["p50"] <= 10
+        assert summary["p99"] <= 500
+
+    def test_empty(self):
+        assert Histogram((1,)).summary()["p50"] is None
+
+
+class TestServerMetrics:
+    """Tests for recording and exporting."""
+
+    def test_span_and_snapshot(self, metrics):
+        with metrics.span("render_markdown"):
+            pass
+        metrics.observe("rows", 42, "stage", "serialize")
+
+        snapshot = metrics.snapshot()
+        assert snapshot["stages"]["render_markdown"]["duration_seconds"]["count"] == 1
+        assert snapshot["stages"]["serialize"]["rows"]["max"] == 42
+
+    def test_prometheus_text(self, metrics):
+        metrics.observe("rows", 5, "stage", "gaql_api")
+        metrics.observe("rows", 5000, "stage", "gaql_api")
+        metrics.record_tool_call("run_google_ads_gaql", 0.2, "Error executing GAQL query: boom")
+
+        text = metrics.prometheus_text()
+        assert "# TYPE google_ads_mcp_stage_rows histogram" in text
+        assert 'google_ads_mcp_stage_rows_bucket{stage="gaql_api",le="10.0"} 1' in text
+        assert 'google_ads_mcp_stage_rows_bucket{stage="gaql_api",le="+Inf"} 2' in text
+        assert 'google_ads_mcp_stage_rows_count{stage="gaql_api"} 2' in text
+        assert 'google_ads_mcp_tool_errors_total{tool="run_google_ads_gaql"} 1' in text
+
+    def test_file_exports(self, tmp_path):
+        prometheus_path = tmp_path / "metrics.prom"
+        jsonl_path = tmp_path / "calls.jsonl"
+        metrics = ServerMetrics(str(prometheus_path), str(jsonl_path), flush_interval_seconds=0)
+
+        metrics.record_tool_call("google_ads_list_accounts", 0.05, "# Accounts")
+        metrics.record_tool_call("google_ads_list_accounts", 0.07, "# Accounts")
+
+        events = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+        assert [event["tool"] for event in events] == ["google_ads_list_accounts"] * 2
+        assert events[0]["response_bytes"] == 10
+        assert events[0]["error"] is False
+        assert 'google_ads_mcp_tool_duration_seconds_count{tool="google_ads_list_accounts"} 2' in (
+            prometheus_path.read_text()
+        )
+
+
+class TestToolInstrumentation:
+    """Tests for spans recorded during tool calls."""
+
+    def test_gaql_call_records_stages(self, metrics, monkeypatch, make_campaign_row, make_stream_client):
+        rows = [make_campaign_row(campaign_id=i) for i in range(3)]
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: make_stream_client(rows))
+
+        output = asyncio.run(run_google_ads_gaql(RunGoogleAdsGaqlInput(
+            customer_id="1234567890", query="SELECT campaign.id FROM campaign"
+        )))
+
+        snapshot = metrics.snapshot()
+        tool = snapshot["tools"]["run_google_ads_gaql"]
+        assert tool["duration_seconds"]["count"] == 1
+        assert tool["response_bytes"]["max"] == len(output)
+        for stage in ("gaql_api", "gaql_first_row", "serialize", "encode_json"):
+            assert stage in snapshot["stages"]
+        assert snapshot["stages"]["gaql_api"]["rows"]["max"] == 3
+        assert snapshot["tool_calls"]["run_google_ads_gaql"] == {"calls": 1, "errors": 0}
+
+    def test_server_stats_tool(self, metrics):
+        stats = json.loads(asyncio.run(google_ads_server_stats(ServerStatsInput(reset=True))))
+
+        assert set(stats["components"]) == {
+            "client_pool", "result_cache", "scheduler", "single_flight",
+            "cursors", "account_hierarchy", "field_catalog"
+        }
+        assert "uptime_seconds" in stats
+        # The stats call itself is recorded after the reset
+        assert list(metrics.snapshot()["tool_calls"]) == ["google_ads_server_stats"]
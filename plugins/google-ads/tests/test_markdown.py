@@ -0,0 +1,101 @@
+# File: plugins/google-ads/tests/test_markdown.py
+"""Tests for the budget-aware Markdown table renderer."""
+
+import sys
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from google_ads_mcp import build_markdown_response, failed_accounts_line
+
+COLUMNS = ["ID", "Name", "Spend"]
+
+
+def account_rows(count):
+    return [(f"{i:010d}", f"Account {i}", f"{i * 1.5:,.2f}") for i in range(count)]
+
+
+class TestBuildMarkdownResponse:
+    """Tests for build_markdown_response()."""
+
+    def test_renders_whole_table_within_budget(self):
+        output = build_markdown_response("# Accounts\n\n", COLUMNS, account_rows(2))
+
+        assert output == (
+            "# Accounts\n\n"
+            "| ID | Name | Spend |\n"
+            "|---|---|---|\n"
+            "| 0000000000 | Account 0 | 0.00 |\n"
+            "| 0000000001 | Account 1 | 1.50 |\n"
+        )
+
+    def test_stops_at_budget_with_accurate_footer(self):
+        """Test whole rows are dropped and the footer counts exactly the rows left out."""
+        rows = account_rows(20_000)
+        output = build_markdown_response("# Accounts\n\n", COLUMNS, rows, budget=5_000, hint="Filter by name.")
+
+        shown = output.count("| Account ")
+        assert len(output) <= 5_000
+        assert 0 < shown < len(rows)
+        assert output.endswith(f"⚠️ {len(rows) - shown:,} more rows not shown (response limit of 5,000 characters). Filter by name.\n")
+        assert output.splitlines()[-3].endswith(" |")
+
+    def test_generator_is_closed_and_formatted_lazily(self):
+        """Test rows past the budget are never formatted and the stream is closed."""
+        formatted = []
+        closed = []
+
+        def rows():
+            try:
+                for row in account_rows(10_000):
+                    yield row
+            finally:
+                closed.append(True)
+
+        def format_row(row):
+            formatted.append(row)
+            return row
+
+        output = build_markdown_response("", COLUMNS, rows(), format_row, budget=2_000)
+
+        assert closed == [True]
+        assert len(formatted) == output.count("| Account ") + 1
+        assert "More rows not shown" in output
+
+    def test_total_rows_for_streams(self):
+        output = build_markdown_response("", COLUMNS, iter(account_rows(1_000)), total_rows=1_000, budget=1_000)
+        shown = output.count("| Account ")
+        assert f"{1_000 - shown:,} more rows not shown" in output
+
+    def test_cells_cannot_break_the_table(self):
+        """Test None renders as a dash and pipes or newlines are neutralized."""
+        output = build_markdown_response("", COLUMNS, [("1", "A | B\nC", None)])
+        assert output.splitlines()[-1] == "| 1 | A \\| B C | - |"
+
+    def test_long_preamble_counts_against_budget(self):
+        """Test a preamble bigger than the budget is cut instead of overflowing it."""
+        output = build_markdown_response("x" * 10_000, COLUMNS, account_rows(10), budget=2_000)
+
+        assert len(output) <= 2_000
+        assert "| ID | Name | Spend |" in output
+        assert "more rows not shown" in output
+
+
+class TestFailedAccountsLine:
+    """Tests for failed_accounts_line()."""
+
+    def test_empty(self):
+        assert failed_accounts_line({}, "SELECT ...") == ""
+
+    def test_caps_accounts_and_errors(self):
+        """Test only a sample of accounts is named, errors are shortened and the rest are counted."""
+        query = "SELECT campaign.id FROM campaign"
+        failed = {f"{i:010d}": f"quota exceeded for {query} " + "x" * 500 for i in range(500)}
+
+        line = failed_accounts_line(failed, query)
+
+        assert len(line) < 3_000
+        assert line.count("quota exceeded for <query>") == 10
+        assert query not in line
+        assert line.endswith(" and 490 more\n\n")
@@ -0,0 +1,139 @@
+# File: plugins/google-ads/tests/test_ngrams.py
+"""Tests for n-gram wasted-spend analysis of search terms."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    NgramSpendAnalyzer,
+    NgramWastedSpendInput,
+    ResponseFormat,
+    google_ads_ngram_wasted_spend,
+)
+
+# (search term, cost micros, clicks, conversions, conversions value)
+TERMS = [
+    ("free red shoes", 5_000_000, 3, 0.0, 0.0),
+    ("free blue shoes", 4_000_000, 2, 0.0, 0.0),
+    ("free red shoes", 1_000_000, 1, 0.0, 0.0),
+    ("red shoes sale", 9_000_000, 5, 1.0, 80.0),
+    ("shoes for kids", 2_000_000, 1, 0.0, 0.0),
+    ("boots for kids", 3_000_000, 2, 0.0, 0.0),
+]
+
+
+def analyze(rows=TERMS, **kwargs):
+    analyzer = NgramSpendAnalyzer(**kwargs)
+    for row in rows:
+        analyzer.add(*row)
+    return analyzer
+
+
+class TestNgramSpendAnalyzer:
+    """Tests for the array-backed n-gram analyzer."""
+
+    def test_ngrams(self):
+        """Test 1- to 3-grams are distinct per term."""
+        assert NgramSpendAnalyzer().ngrams("Red red shoes") == {"red", "shoes", "red red", "red shoes", "red red shoes"}
+        assert NgramSpendAnalyzer(max_n=1).ngrams("red shoes") == {"red", "shoes"}
+
+    def test_ranked_by_zero_conversion_spend(self):
+        """Test ranking, totals across converting terms and term folding."""
+        analyzer = analyze()
+        results, summary = analyzer.results(limit=3)
+
+        assert summary["rows_scanned"] == 6
+        assert summary["search_terms"] == 5
+        assert summary["wasted_cost_total"] == 15.0
+        assert [row["ngram"] for row in results] == ["shoes", "free", "kids"]
+
+        shoes = results[0]
+        assert shoes["wasted_cost"] == 12.0
+        assert shoes["wasted_terms"] == 3
+        assert shoes["terms"] == 4
+        assert shoes["cost"] == 21.0
+        assert shoes["conversions"] == 1.0
+        assert shoes["roas"] == 3.81
+        assert shoes["wasted_share"] == 80.0
+
+    def test_min_terms_and_stopwords(self):
+        """Test single-term n-grams and stopword-only n-grams are skipped."""
+        results, _ = analyze(min_terms=2).results(limit=100)
+        grams = {row["ngram"] for row in results}
+
+        assert "for" not in grams
+        assert "for kids" in grams
+        assert "boots" not in grams
+        assert "free red shoes" not in grams
+
+    def test_examples_are_costliest_wasted_terms(self):
+        """Test examples exclude converting terms and are ordered by cost."""
+        results, _ = analyze().results(limit=1, examples=2)
+
+        assert results[0]["examples"] == [
+            {"search_term": "free red shoes", "cost": 6.0},
+            {"search_term": "free blue shoes", "cost": 4.0},
+        ]
+
+    def test_no_waste(self):
+        """Test an account where every term converts."""
+        results, summary = analyze([("red shoes", 1_000_000, 1, 1.0, 10.0)]).results()
+
+        assert results == []
+        assert summary["wasted_cost_total"] == 0.0
+
+
+class TestNgramTool:
+    """Tests for the google_ads_ngram_wasted_spend tool."""
+
+    @pytest.fixture
+    def search_term_client(self, monkeypatch, make_stream_client):
+        from google.ads.googleads.v21.services.types.google_ads_service import GoogleAdsRow
+
+        rows = []
+        for term, cost_micros, clicks, conversions, value in TERMS:
+            row = GoogleAdsRow.pb()()
+            row.search_term_view.search_term = term
+            row.metrics.cost_micros = cost_micros
+            row.metrics.clicks = clicks
+            row.metrics.conversions = conversions
+            row.metrics.conversions_value = value
+            rows.append(row)
+        client = make_stream_client(rows)
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+        return client
+
+    def test_json(self, search_term_client):
+        """Test the query sent and the ranked n-grams returned."""
+        params = NgramWastedSpendInput(
+            customer_id="123-456-7890", campaign_id="42", limit=2, response_format=ResponseFormat.JSON
+        )
+
+        payload = json.loads(asyncio.run(google_ads_ngram_wasted_spend(params)))
+
+        query = search_term_client.get_service.return_value.search_stream.call_args.kwargs["query"]
+        assert "FROM search_term_view" in query
+        assert "DURING LAST_30_DAYS" in query
+        assert "campaign.id = 42" in query
+        assert payload["search_terms"] == 5
+        assert [row["ngram"] for row in payload["results"]] == ["shoes", "free"]
+
+    def test_markdown(self, search_term_client):
+        """Test the Markdown table."""
+        output = asyncio.run(google_ads_ngram_wasted_spend(NgramWastedSpendInput(customer_id="1234567890")))
+
+        assert output.startswith("# Wasted Spend by N-gram")
+        assert "| shoes | 3/4 | $12.00 | 80.0% |" in output
+
+    def test_invalid_campaign_id(self):
+        """Test non-numeric campaign IDs are rejected."""
+        with pytest.raises(ValueError):
+            NgramWastedSpendInput(customer_id="1234567890", campaign_id="42 OR 1=1")
@@ -0,0 +1,137 @@
+# File: plugins/google-ads/tests/test_pacing.py
+"""Tests for month-to-date budget pacing across accounts."""
+
+import asyncio
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    BudgetPacer,
+    BudgetPacingInput,
+    ResponseFormat,
+    google_ads_budget_pacing,
+)
+
+ACCOUNTS = [
+    {"id": "1111111111", "name": "Shoes", "currency": "USD"},
+    {"id": "2222222222", "name": "Boots", "currency": "EUR"},
+    {"id": "3333333333", "name": "Hats", "currency": "USD"},
+]
+
+
+def pacer_with(rows_by_account):
+    # June 2025: 30 days, paced through the 10th
+    pacer = BudgetPacer(date(2025, 6, 1), date(2025, 6, 10))
+    for customer_id, rows in rows_by_account.items():
+        for values in rows:
+            pacer.add(customer_id, values)
+    return pacer
+
+
+class TestBudgetPacer:
+    """Tests for per-account pacing math."""
+
+    def test_month_length(self):
+        assert BudgetPacer(date(2024, 2, 1), date(2024, 2, 5)).days_in_month == 29
+        assert BudgetPacer(date(2025, 12, 1), date(2025, 12, 5)).days_in_month == 31
+
+    def test_shared_budget_counted_once(self):
+        """Test campaigns sharing a budget add it once, and paused campaigns add only cost."""
+        pacer = pacer_with({"1111111111": [
+            (1, "ENABLED", 10, 50_000_000, "DAILY", 300_000_000),
+            (2, "ENABLED", 10, 50_000_000, "DAILY", 200_000_000),
+            (3, "PAUSED", 11, 80_000_000, "DAILY", 100_000_000),
+        ]})
+
+        row = pacer.results(ACCOUNTS[:1])[0]
+
+        assert row["daily_budget"] == 50.0
+        assert row["monthly_budget"] == 1500.0
+        assert row["cost_to_date"] == 600.0
+        assert row["expected_to_date"] == 500.0
+        assert row["projected_month_end"] == 1800.0
+        assert row["pace_pct"] == 120.0
+        assert row["status"] == "over"
+        assert row["enabled_campaigns"] == 2
+
+    def test_statuses_and_order(self):
+        """Test flags and ranking by distance from 100% pace."""
+        pacer = pacer_with({
+            "1111111111": [(1, "ENABLED", 10, 10_000_000, "DAILY", 95_000_000)],
+            "2222222222": [(2, "ENABLED", 20, 10_000_000, "DAILY", 50_000_000)],
+        })
+
+        rows = pacer.results(ACCOUNTS, tolerance_pct=10)
+
+        assert [(row["customer_id"], row["status"]) for row in rows] == [
+            ("2222222222", "under"), ("1111111111", "on_pace"), ("3333333333", "no_budget")
+        ]
+        assert rows[0]["currency"] == "EUR"
+
+
+class TestBudgetPacingTool:
+    """Tests for the google_ads_budget_pacing tool."""
+
+    @pytest.fixture
+    def pacing_client(self, monkeypatch, mock_credentials_env, make_stream_client):
+        from google.ads.googleads.v21.services.types.google_ads_service import GoogleAdsRow
+
+        class FixedDate(date):
+            @classmethod
+            def today(cls):
+                return cls(2025, 6, 11)
+
+        row = GoogleAdsRow.pb()()
+        row.campaign.id = 1
+        row.campaign.status = 2  # ENABLED
+        row.campaign_budget.id = 10
+        row.campaign_budget.amount_micros = 10_000_000
+        row.campaign_budget.period = 2  # DAILY
+        row.metrics.cost_micros = 200_000_000
+        client = make_stream_client([row])
+        client.get_service.return_value.search_stream.side_effect = lambda **kwargs: iter(
+            [type("Batch", (), {"results": [row]})()]
+        )
+        monkeypatch.setattr(google_ads_mcp, "date", FixedDate)
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+        monkeypatch.setattr(google_ads_mcp, "fetch_client_accounts", lambda client, mcc_id: ACCOUNTS)
+        return client
+
+    def test_json(self, pacing_client):
+        """Test every account is paced from one query each."""
+        params = BudgetPacingInput(flagged_only=True, response_format=ResponseFormat.JSON)
+
+        payload = json.loads(asyncio.run(google_ads_budget_pacing(params)))
+
+        stream = pacing_client.get_service.return_value.search_stream
+        assert stream.call_count == 3
+        assert "BETWEEN '2025-06-01' AND '2025-06-10'" in stream.call_args.kwargs["query"]
+        assert payload["status_counts"] == {"over": 3, "under": 0, "on_pace": 0, "no_budget": 0}
+        assert payload["account_count"] == 3
+        assert payload["accounts"][0]["pace_pct"] == 200.0
+
+    def test_window_follows_account_time_zones(self, pacing_client, monkeypatch):
+        """Test the month-to-date window ends on a day complete in every account's time zone."""
+        monkeypatch.setattr(google_ads_mcp, "earliest_account_date", lambda accounts: date(2025, 6, 5))
+
+        payload = json.loads(asyncio.run(google_ads_budget_pacing(BudgetPacingInput(response_format=ResponseFormat.JSON))))
+
+        assert payload["as_of"] == "2025-06-04"
+        query = pacing_client.get_service.return_value.search_stream.call_args.kwargs["query"]
+        assert "BETWEEN '2025-06-01' AND '2025-06-04'" in query
+
+    def test_markdown_name_filter(self, pacing_client):
+        """Test account selection by name pattern and the Markdown table."""
+        output = asyncio.run(google_ads_budget_pacing(BudgetPacingInput(account_name_pattern="*oots")))
+
+        assert output.startswith("# Budget Pacing")
+        assert "| 2222222222 | Boots | EUR | 200.00 | 100.00 | 300.00 | 600.00 | 200.0% | over |" in output
+        assert "Shoes" not in output
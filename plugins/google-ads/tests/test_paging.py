@@ -0,0 +1,189 @@
+# File: plugins/google-ads/tests/test_paging.py
+"""Tests for cursor-based paging of GAQL results."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    GaqlCursorRegistry,
+    GaqlNextPageInput,
+    GaqlResponseFormat,
+    GaqlSingleFlight,
+    RunGoogleAdsGaqlInput,
+    build_cursor_page,
+    build_json_response,
+    iter_serialized_gaql_rows,
+    run_google_ads_gaql,
+    run_google_ads_gaql_next_page,
+)
+
+QUERY = "SELECT campaign.id, campaign.name FROM campaign"
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A fresh cursor registry installed as the module registry."""
+    cursor_registry = GaqlCursorRegistry(ttl_seconds=300, max_cursors=4)
+    monkeypatch.setattr(google_ads_mcp, "cursor_registry", cursor_registry)
+    yield cursor_registry
+    cursor_registry.clear()
+
+
+class ClosableRows:
+    """Row iterator that records being closed."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self.close = Mock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._rows)
+
+
+class TestGaqlCursor:
+    """Tests for resuming a row iterator across pages."""
+
+    def test_pages_continue_where_previous_stopped(self, registry):
+        cursor = registry.open("1", QUERY, [], iter(range(7)))
+
+        pages = [json.loads(build_cursor_page(cursor, {}, 3)) for _ in range(3)]
+
+        assert [page["results"] for page in pages] == [[0, 1, 2], [3, 4, 5], [6]]
+        assert [page["offset"] for page in pages] == [0, 3, 6]
+        assert pages[0]["next_cursor"] == cursor.cursor_id
+        assert "next_cursor" not in pages[2]
+        assert registry.stats()["open"] == 0
+
+    def test_row_rejected_by_budget_starts_next_page(self, registry):
+        rows = [{"name": f"Campaign {i}", "padding": "x" * 200} for i in range(50)]
+        cursor = registry.open("1", QUERY, [], iter(rows))
+
+        first = json.loads(build_json_response({}, cursor.take(), budget=2000, next_cursor=cursor.cursor_id))
+        second = json.loads(build_cursor_page(cursor, {}, 100))
+
+        assert first["truncated"] is True
+        assert second["results"][0] == rows[first["result_count"]]
+        assert second["offset"] == first["result_count"]
+
+    def test_exact_page_closes_cursor(self, registry):
+        source = ClosableRows(range(2))
+        cursor = registry.open("1", QUERY, [], source)
+
+        page = json.loads(build_cursor_page(cursor, {}, 2))
+
+        assert page["truncated"] is False
+        source.close.assert_called_once()
+
+    def test_unknown_cursor(self, registry):
+        with pytest.raises(ValueError, match="unknown or expired"):
+            registry.get("missing")
+
+    def test_idle_cursor_expires_and_closes(self, registry):
+        rows = ClosableRows(range(5))
+        cursor = registry.open("1", QUERY, [], rows)
+        cursor.expires_at = 0
+
+        with pytest.raises(ValueError):
+            registry.get(cursor.cursor_id)
+        rows.close.assert_called_once()
+        assert registry.stats()["expired"] == 1
+
+    def test_least_recently_used_evicted(self, registry):
+        cursors = [registry.open("1", QUERY, [], iter(range(3))) for _ in range(5)]
+
+        with pytest.raises(ValueError):
+            registry.get(cursors[0].cursor_id)
+        assert registry.get(cursors[4].cursor_id) is cursors[4]
+
+
+class TestRunGoogleAdsGaqlPaging:
+    """Tests for page_size and run_google_ads_gaql_next_page."""
+
+    def test_walks_result_with_one_query(self, registry, monkeypatch, make_campaign_row, make_stream_client):
+        rows = [make_campaign_row(campaign_id=i, name=f"Campaign {i}") for i in range(5)]
+        client = make_stream_client(rows)
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+
+        first = json.loads(asyncio.run(run_google_ads_gaql(
+            RunGoogleAdsGaqlInput(customer_id="1234567890", query=QUERY, page_size=2)
+        )))
+        second = json.loads(asyncio.run(run_google_ads_gaql_next_page(
+            GaqlNextPageInput(cursor=first["next_cursor"], page_size=2)
+        )))
+        third = json.loads(asyncio.run(run_google_ads_gaql_next_page(
+            GaqlNextPageInput(cursor=second["next_cursor"], page_size=2)
+        )))
+
+        ids = [row["campaign"]["id"] for page in (first, second, third) for row in page["results"]]
+        assert ids == [0, 1, 2, 3, 4]
+        assert third["truncated"] is False
+        assert "next_cursor" not in third
+        # The total is unknown until the last page, which counts earlier pages too
+        assert first["rows_total"] is None
+        assert (third["rows_returned"], third["rows_total"]) == (1, 5)
+        assert client.get_service.return_value.search.call_count == 1
+
+    def test_columnar_pages(self, registry, monkeypatch, make_campaign_row, make_stream_client):
+        rows = [make_campaign_row(campaign_id=i, name="Brand") for i in range(3)]
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: make_stream_client(rows))
+
+        first = json.loads(asyncio.run(run_google_ads_gaql(RunGoogleAdsGaqlInput(
+            customer_id="1234567890", query=QUERY, page_size=2, response_format=GaqlResponseFormat.COLUMNAR
+        ))))
+        second = json.loads(asyncio.run(run_google_ads_gaql_next_page(
+            GaqlNextPageInput(cursor=first["next_cursor"])
+        )))
+
+        assert first["rows"] == [[0, 0], [1, 0]]
+        assert second["format"] == "columnar"
+        assert second["rows"] == [[2, 0]]
+        assert second["dictionaries"] == {"campaign.name": ["Brand"]}
+
+    def test_idle_cursor_does_not_pin_a_concurrent_read(self, registry, monkeypatch, make_campaign_row):
+        """Test an idle cursor on a shared stream is detached instead of buffering the other reader's rows."""
+        rows = [make_campaign_row(campaign_id=i) for i in range(500)]
+        client = Mock()
+        client.get_service.return_value.search.side_effect = lambda **kwargs: iter(rows)
+        single_flight = GaqlSingleFlight(replay_rows=5, max_lag_rows=20)
+        monkeypatch.setattr(google_ads_mcp, "gaql_single_flight", single_flight)
+
+        cursor = registry.open(
+            "1234567890", QUERY, [],
+            iter_serialized_gaql_rows(client, "1234567890", QUERY, use_streaming=False, use_cache=False)
+        )
+        first = json.loads(build_cursor_page(cursor, {}, 3))
+
+        largest_buffer = 0
+        read = 0
+        for _ in iter_serialized_gaql_rows(client, "1234567890", QUERY, use_streaming=False, use_cache=False):
+            read += 1
+            flight = single_flight._flights.get(google_ads_mcp.gaql_cache_key("1234567890", QUERY))
+            if flight is not None:
+                largest_buffer = max(largest_buffer, len(flight._buffer))
+
+        assert read == 500
+        assert largest_buffer <= 21
+
+        # The cursor resumes on its own request without losing or repeating rows
+        second = json.loads(build_cursor_page(cursor, {}, 3))
+        ids = [row["campaign"]["id"] for page in (first, second) for row in page["results"]]
+        assert ids == [0, 1, 2, 3, 4, 5]
+        assert single_flight.stats()["detached"] == 1
+
+    def test_expired_cursor_returns_error(self, registry):
+        output = asyncio.run(run_google_ads_gaql_next_page(GaqlNextPageInput(cursor="gone")))
+
+        assert output.startswith("Error fetching next page:")
+        assert "Re-run the query" in output
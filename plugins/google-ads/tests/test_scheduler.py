@@ -0,0 +1,174 @@
+# File: plugins/google-ads/tests/test_scheduler.py
+"""Tests for rate limiting, retries and priority lanes."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    GaqlScheduler,
+    RequestPriority,
+    TokenBucket,
+    classify_api_error,
+    iter_gaql_rows,
+)
+
+
+class FakeApiError(Exception):
+    """Shaped like GoogleAdsException: a gRPC error plus GoogleAdsFailure details."""
+
+    def __init__(self, status, retry_seconds=None, quota_error=None):
+        super().__init__(status)
+        self.error = SimpleNamespace(code=lambda: SimpleNamespace(name=status))
+        details = SimpleNamespace(quota_error_details=SimpleNamespace(
+            retry_delay=SimpleNamespace(seconds=retry_seconds, nanos=0)
+        )) if retry_seconds else None
+        self.failure = SimpleNamespace(errors=[SimpleNamespace(
+            error_code=SimpleNamespace(quota_error=quota_error), details=details
+        )])
+
+
+class TestClassifyApiError:
+    """Tests for deciding what is retryable."""
+
+    def test_quota_error_with_retry_delay(self):
+        error = FakeApiError("RESOURCE_EXHAUSTED", retry_seconds=7)
+        assert classify_api_error(error) == ("RESOURCE_EXHAUSTED", 7.0)
+
+    def test_transient_status(self):
+        assert classify_api_error(FakeApiError("UNAVAILABLE")) == ("UNAVAILABLE", None)
+
+    def test_quota_detail_without_status(self):
+        error = FakeApiError("UNKNOWN", quota_error=SimpleNamespace(name="RESOURCE_TEMPORARILY_EXHAUSTED"))
+        assert classify_api_error(error)[0] == "RESOURCE_EXHAUSTED"
+
+    def test_permanent_errors(self):
+        assert classify_api_error(FakeApiError("INVALID_ARGUMENT")) == (None, None)
+        assert classify_api_error(ValueError("bad")) == (None, None)
+
+
+class TestTokenBucket:
+    """Tests for token reservations."""
+
+    def test_burst_then_waits(self):
+        bucket = TokenBucket(rate_per_second=10, burst=2)
+        waits = [bucket.reserve() for _ in range(4)]
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(0.1, abs=0.02)
+        assert waits[3] == pytest.approx(0.2, abs=0.02)
+
+    def test_floor_keeps_reserve(self):
+        bucket = TokenBucket(rate_per_second=10, burst=4)
+        assert bucket.reserve(floor=1) == 0.0
+        assert bucket.reserve(floor=1) == 0.0
+        assert bucket.reserve(floor=1) == 0.0
+        # The last token is kept for callers without a floor
+        assert bucket.reserve(floor=1) > 0
+        assert TokenBucket(10, 4).reserve(floor=0) == 0.0
+
+    def test_pause(self):
+        bucket = TokenBucket(rate_per_second=0, burst=1)
+        assert bucket.reserve() == 0.0
+        bucket.pause(5)
+        assert bucket.reserve() == pytest.approx(5, abs=0.1)
+
+
+class TestGaqlScheduler:
+    """Tests for admission and backoff decisions."""
+
+    def test_throttling_is_counted(self):
+        sleep = Mock()
+        scheduler = GaqlScheduler(developer_qps=100, customer_qps=1, sleep=sleep)
+
+        for _ in range(3):
+            scheduler.acquire("1234567890")
+
+        stats = scheduler.stats()
+        assert stats["requests"] == {"interactive": 3, "bulk": 0}
+        assert stats["throttled"] == 1
+        sleep.assert_called_once()
+
+    def test_bulk_waits_before_interactive(self):
+        scheduler = GaqlScheduler(developer_qps=10, customer_qps=0, sleep=Mock(), bulk_reserve=0.5)
+
+        bulk_waits = [scheduler.acquire(str(i), RequestPriority.BULK) for i in range(11)]
+        assert bulk_waits[9] == 0.0
+        assert bulk_waits[10] > 0
+
+    def test_backoff_honors_retry_delay_and_pauses_customer(self):
+        sleep = Mock()
+        scheduler = GaqlScheduler(customer_qps=0, sleep=sleep)
+
+        delay = scheduler.backoff(FakeApiError("RESOURCE_EXHAUSTED", retry_seconds=12), 1, "1234567890")
+
+        assert delay == 12
+        sleep.assert_called_once_with(12)
+        assert scheduler.acquire("1234567890") > 11
+        assert scheduler.stats()["retries"] == {"RESOURCE_EXHAUSTED": 1}
+
+    def test_exponential_backoff_with_jitter(self):
+        scheduler = GaqlScheduler(base_delay=1.0, max_delay=60, sleep=Mock())
+        delays = [scheduler.backoff(FakeApiError("UNAVAILABLE"), attempt, "1") for attempt in (1, 2, 3)]
+
+        assert 0.5 <= delays[0] <= 1
+        assert 1 <= delays[1] <= 2
+        assert 2 <= delays[2] <= 4
+
+    def test_gives_up(self):
+        scheduler = GaqlScheduler(max_attempts=2, max_delay=30, sleep=Mock())
+
+        assert scheduler.backoff(FakeApiError("INVALID_ARGUMENT"), 1, "1") is None
+        assert scheduler.backoff(FakeApiError("UNAVAILABLE"), 2, "1") is None
+        # A daily quota asking for hours is not worth waiting for
+        assert scheduler.backoff(FakeApiError("RESOURCE_EXHAUSTED", retry_seconds=3600), 1, "1") is None
+        assert scheduler.stats()["gave_up"] == 2
+
+
+class TestIterGaqlRowsRetries:
+    """Tests for retries around the row stream."""
+
+    def test_retries_transient_error(self):
+        client = Mock()
+        client.get_service.return_value.search_stream.side_effect = [
+            FakeApiError("UNAVAILABLE"),
+            iter([SimpleNamespace(results=[1, 2])]),
+        ]
+
+        assert list(iter_gaql_rows(client, "1234567890", "SELECT campaign.id FROM campaign")) == [1, 2]
+        assert google_ads_mcp.gaql_scheduler.stats()["retries"] == {"UNAVAILABLE": 1}
+
+    def test_reports_attempts_when_giving_up(self):
+        client = Mock()
+        client.get_service.return_value.search_stream.side_effect = FakeApiError("INTERNAL")
+
+        with pytest.raises(Exception, match="gave up after 5 attempts"):
+            list(iter_gaql_rows(client, "1234567890", "SELECT campaign.id FROM campaign"))
+        assert client.get_service.return_value.search_stream.call_count == 5
+
+    def test_no_retry_after_rows_were_yielded(self):
+        def failing_stream():
+            yield SimpleNamespace(results=[1])
+            raise FakeApiError("UNAVAILABLE")
+
+        client = Mock()
+        client.get_service.return_value.search_stream.return_value = failing_stream()
+        rows = iter_gaql_rows(client, "1234567890", "SELECT campaign.id FROM campaign")
+
+        assert next(rows) == 1
+        with pytest.raises(Exception, match="UNAVAILABLE"):
+            next(rows)
+        assert client.get_service.return_value.search_stream.call_count == 1
+
+    def test_bulk_priority_is_recorded(self, make_stream_client):
+        client = make_stream_client([1])
+        list(iter_gaql_rows(client, "1", "SELECT campaign.id FROM campaign", priority=RequestPriority.BULK))
+
+        assert google_ads_mcp.gaql_scheduler.stats()["requests"]["bulk"] == 1
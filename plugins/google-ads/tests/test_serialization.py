@@ -0,0 +1,145 @@
+# File: plugins/google-ads/tests/test_serialization.py
+"""Tests for GAQL row serialization."""
+
+import json
+import sys
+from types import SimpleNamespace
+from pathlib import Path
+
+import pytest
+from google.protobuf.json_format import MessageToJson
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from google_ads_mcp import (
+    EnumRegistry,
+    GaqlRowExtractor,
+    get_enum_name,
+    iter_serialized_gaql_rows,
+    parse_select_fields,
+    serialize_gaql_row,
+)
+
+CAMPAIGN_QUERY = (
+    "SELECT campaign.id, campaign.name, campaign.status, metrics.cost_micros, metrics.clicks "
+    "FROM campaign WHERE segments.date DURING LAST_7_DAYS"
+)
+
+
+class TestParseSelectFields:
+    """Tests for SELECT clause parsing."""
+
+    def test_parses_fields_in_order(self):
+        """Test field paths are returned in SELECT order."""
+        assert parse_select_fields(CAMPAIGN_QUERY) == [
+            "campaign.id", "campaign.name", "campaign.status", "metrics.cost_micros", "metrics.clicks"
+        ]
+
+    def test_multiline_and_case(self):
+        """Test keywords are case-insensitive and whitespace is ignored."""
+        query = "select\n  Campaign.Id,\n  metrics.clicks\nfrom campaign"
+        assert parse_select_fields(query) == ["campaign.id", "metrics.clicks"]
+
+    def test_unparseable_returns_empty(self):
+        """Test malformed SELECT clauses are not guessed at."""
+        assert parse_select_fields("SELECT * FROM campaign") == []
+        assert parse_select_fields("campaign.id FROM campaign") == []
+
+
+class TestGaqlRowExtractor:
+    """Tests for the compiled row extractor."""
+
+    def test_matches_message_to_json_for_set_fields(self, make_campaign_row):
+        """Test output matches MessageToJson apart from int64 encoding."""
+        row = make_campaign_row(campaign_id=42, name="Brand", status=2, cost_micros=1_500_000, clicks=7)
+        extracted = GaqlRowExtractor.for_query(CAMPAIGN_QUERY)(row)
+
+        expected = json.loads(MessageToJson(row))
+        expected["campaign"]["id"] = int(expected["campaign"]["id"])
+        expected["metrics"] = {key: int(value) for key, value in expected["metrics"].items()}
+        assert extracted == expected
+
+    def test_enum_names(self, make_campaign_row):
+        """Test enum values are emitted by name."""
+        extractor = GaqlRowExtractor.for_query(CAMPAIGN_QUERY)
+        assert extractor(make_campaign_row(status=3))["campaign"]["status"] == "PAUSED"
+
+    def test_unset_fields_keep_defaults(self, make_campaign_row):
+        """Test zero metrics are present rather than omitted."""
+        extracted = GaqlRowExtractor.for_query(CAMPAIGN_QUERY)(make_campaign_row())
+        assert extracted["metrics"] == {"costMicros": 0, "clicks": 0}
+
+    def test_values_in_select_order(self, make_campaign_row):
+        """Test flat extraction follows the SELECT order."""
+        row = make_campaign_row(campaign_id=1, name="A", status=2, cost_micros=10, clicks=3)
+        assert GaqlRowExtractor.for_query(CAMPAIGN_QUERY).values(row) == (1, "A", "ENABLED", 10, 3)
+
+    def test_unknown_enum_number(self, make_campaign_row):
+        """Test numbers newer than the installed SDK render as text, like MessageToJson."""
+        extractor = GaqlRowExtractor.for_query(CAMPAIGN_QUERY)
+        assert extractor.values(make_campaign_row(status=99))[2] == "99"
+
+    def test_unknown_field_raises(self, make_campaign_row):
+        """Test unknown field paths are rejected at compile time."""
+        extractor = GaqlRowExtractor(["campaign.not_a_field"])
+        with pytest.raises(ValueError, match="not_a_field"):
+            extractor(make_campaign_row())
+
+
+class TestEnumRegistry:
+    """Tests for the enum number-to-name tables."""
+
+    @pytest.fixture
+    def campaign_status(self):
+        from google.ads.googleads.v21.enums.types.campaign_status import CampaignStatusEnum
+        return CampaignStatusEnum.CampaignStatus
+
+    def test_table_indexed_by_number(self, campaign_status):
+        """Test descriptors and proto-plus enum classes give the same table."""
+        from google.ads.googleads.v21.enums.types.campaign_status import CampaignStatusEnum
+
+        descriptor = CampaignStatusEnum.pb().DESCRIPTOR.enum_types_by_name["CampaignStatus"]
+        table = EnumRegistry().table(descriptor)
+        assert table == ("UNSPECIFIED", "UNKNOWN", "ENABLED", "PAUSED", "REMOVED")
+        assert EnumRegistry().table(campaign_status) == table
+
+    def test_built_once_per_enum(self, campaign_status):
+        registry = EnumRegistry()
+        assert registry.table(campaign_status) is registry.table(campaign_status)
+        assert len(registry) == 1
+
+    def test_get_enum_name(self, campaign_status):
+        """Test members keep their name and raw numbers go through the converter."""
+        convert = EnumRegistry().converter(campaign_status)
+        assert get_enum_name(campaign_status.PAUSED) == "PAUSED"
+        assert get_enum_name(3, convert) == "PAUSED"
+        assert get_enum_name(42, convert) == "42"
+        assert get_enum_name(None, convert) == "UNSPECIFIED"
+
+
+class TestIterSerializedGaqlRows:
+    """Tests for extractor selection in the row pipeline."""
+
+    def test_uses_extractor(self, make_campaign_row, make_stream_client):
+        """Test rows are serialized with the compiled extractor."""
+        client = make_stream_client([make_campaign_row(campaign_id=9)])
+        rows = list(iter_serialized_gaql_rows(client, "1", CAMPAIGN_QUERY))
+        assert rows[0]["campaign"]["id"] == 9
+
+    def test_falls_back_for_unknown_fields(self, make_campaign_row, make_stream_client):
+        """Test unresolvable field paths fall back to serialize_gaql_row."""
+        row = make_campaign_row(campaign_id=9)
+        client = make_stream_client([row])
+        query = "SELECT campaign.id, campaign.made_up FROM campaign"
+
+        assert list(iter_serialized_gaql_rows(client, "1", query)) == [serialize_gaql_row(row)]
+
+    def test_later_failure_raises_instead_of_mixing_formats(self, make_campaign_row, make_stream_client):
+        """Test a row the extractor can't read after the first is an error, not a fallback."""
+        client = make_stream_client([make_campaign_row(campaign_id=1), SimpleNamespace()])
+        rows = iter_serialized_gaql_rows(client, "1", CAMPAIGN_QUERY, use_cache=False)
+
+        assert next(rows)["campaign"]["id"] == 1
+        with pytest.raises(AttributeError):
+            next(rows)
@@ -0,0 +1,115 @@
+"""Tests for streaming top-N selection over Shopping product reports."""
+
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    BoundedTopN,
+    ResponseFormat,
+    ShoppingTopProductsInput,
+    google_ads_shopping_top_products,
+)
+
+
+class TestBoundedTopN:
+    """Tests for the fixed-size heap."""
+
+    def test_matches_full_sort(self):
+        rng = random.Random(7)
+        values = [rng.random() for _ in range(2000)]
+        for descending in (True, False):
+            top = BoundedTopN(25, descending=descending)
+            for value in values:
+                top.offer(value, value)
+
+            assert top.items() == sorted(values, reverse=descending)[:25]
+            assert top.offered == len(values)
+
+    def test_ties_keep_earlier_items(self):
+        top = BoundedTopN(2)
+        for item in ("a", "b", "c"):
+            top.offer(1.0, item)
+
+        assert top.items() == ["a", "b"]
+
+    def test_fewer_items_than_n(self):
+        top = BoundedTopN(10, descending=False)
+        top.offer(3, "x")
+        top.offer(1, "y")
+
+        assert top.items() == ["y", "x"]
+
+
+class TestShoppingTopProductsTool:
+    """Tests for the google_ads_shopping_top_products tool."""
+
+    @pytest.fixture
+    def shopping_client(self, monkeypatch, mock_credentials_env, make_stream_client):
+        from google.ads.googleads.v21.services.types.google_ads_service import GoogleAdsRow
+
+        products = [
+            # item_id, title, brand, clicks, cost (currency), conversions, value
+            ("sku-1", "Blue Runner", "Acme", 100, 50, 5, 400),
+            ("sku-2", "Red Runner", "Acme", 80, 40, 0, 0),
+            ("sku-3", "Blue Boot", "Bolt", 60, 30, 3, 45),
+            ("sku-4", "Green Hat", "Bolt", 10, 0, 0, 0),
+        ]
+        rows = []
+        for item_id, title, brand, clicks, cost, conversions, value in products:
+            row = GoogleAdsRow.pb()()
+            row.segments.product_item_id = item_id
+            row.segments.product_title = title
+            row.segments.product_brand = brand
+            row.segments.product_type_l1 = "Apparel"
+            row.metrics.impressions = clicks * 10
+            row.metrics.clicks = clicks
+            row.metrics.cost_micros = cost * 1_000_000
+            row.metrics.conversions = conversions
+            row.metrics.conversions_value = value
+            rows.append(row)
+        client = make_stream_client(rows)
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+        return client
+
+    def test_worst_roas_json(self, shopping_client):
+        """Test products are ranked worst first and unspent products are skipped."""
+        params = ShoppingTopProductsInput(
+            customer_id="1234567890", limit=2, min_cost=10, response_format=ResponseFormat.JSON, use_cache=False
+        )
+
+        payload = json.loads(asyncio.run(google_ads_shopping_top_products(params)))
+
+        query = shopping_client.get_service.return_value.search_stream.call_args.kwargs["query"]
+        assert "AND metrics.cost_micros > 10000000" in query
+        assert payload["rows_scanned"] == 4
+        assert payload["products_matching"] == 3
+        assert [product["item_id"] for product in payload["products"]] == ["sku-2", "sku-3"]
+        assert payload["products"][1]["roas"] == 1.5
+        assert payload["products"][1]["cpa"] == 10.0
+        assert payload["product_count"] == 2
+
+    def test_filters_and_markdown(self, shopping_client):
+        """Test wildcard attribute filters and the Markdown table."""
+        params = ShoppingTopProductsInput(
+            customer_id="1234567890", metric="cost", descending=True, title="*BLUE*", brand="acme",
+            use_cache=False
+        )
+
+        output = asyncio.run(google_ads_shopping_top_products(params))
+
+        assert output.startswith("# Shopping Products: highest cost")
+        assert "| sku-1 | Blue Runner | Acme | 100 | 50.00 | 5.0 | 400.00 | 8.0 | 10.0 |" in output
+        assert "sku-3" not in output
+
+    def test_invalid_campaign_id(self):
+        with pytest.raises(ValueError):
+            ShoppingTopProductsInput(customer_id="1234567890", campaign_id="abc")
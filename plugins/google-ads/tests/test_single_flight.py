@@ -0,0 +1,222 @@
+# File: plugins/google-ads/tests/test_single_flight.py
+"""Tests for coalescing identical in-flight GAQL queries."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import GaqlSingleFlight, execute_gaql_query
+
+
+class GatedSource:
+    """Row source that blocks before its first row until released, and records closing."""
+
+    def __init__(self, rows, error=None):
+        self.release = threading.Event()
+        self.opened = 0
+        self.closed = False
+        self._rows = rows
+        self._error = error
+
+    def open(self):
+        self.opened += 1
+        return self._generate()
+
+    def _generate(self):
+        try:
+            self.release.wait(5)
+            yield from self._rows
+            if self._error:
+                raise self._error
+        finally:
+            self.closed = True
+
+
+def wait_for(predicate):
+    deadline = time.time() + 5
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def consume_in_thread(rows, results, name):
+    def consume():
+        try:
+            results[name] = list(rows)
+        except Exception as e:
+            results[name] = e
+
+    thread = threading.Thread(target=consume)
+    thread.start()
+    return thread
+
+
+class TestGaqlSingleFlight:
+    """Tests for the shared row buffer."""
+
+    def test_concurrent_callers_share_one_call(self):
+        single_flight = GaqlSingleFlight()
+        source = GatedSource(list(range(5)))
+        results = {}
+
+        first = consume_in_thread(single_flight.iter_rows("key", source.open), results, "first")
+        wait_for(lambda: single_flight.stats()["in_flight"] == 1)
+        second = consume_in_thread(single_flight.iter_rows("key", source.open), results, "second")
+        wait_for(lambda: single_flight.stats()["deduplicated"] == 1)
+        source.release.set()
+        first.join()
+        second.join()
+
+        assert results == {"first": [0, 1, 2, 3, 4], "second": [0, 1, 2, 3, 4]}
+        assert source.opened == 1
+        assert single_flight.stats() == {"in_flight": 0, "flights": 1, "deduplicated": 1, "detached": 0}
+
+    def test_late_joiner_replays_buffer(self):
+        single_flight = GaqlSingleFlight()
+        source = GatedSource(list(range(4)))
+        source.release.set()
+
+        leader = single_flight.iter_rows("key", source.open)
+        assert [next(leader), next(leader)] == [0, 1]
+        follower = single_flight.iter_rows("key", source.open)
+
+        assert list(follower) == [0, 1, 2, 3]
+        assert list(leader) == [2, 3]
+        assert source.opened == 1
+
+    def test_finished_flight_is_not_joined(self):
+        single_flight = GaqlSingleFlight()
+        source = GatedSource([1])
+        source.release.set()
+
+        assert list(single_flight.iter_rows("key", source.open)) == [1]
+        assert list(single_flight.iter_rows("key", source.open)) == [1]
+        assert source.opened == 2
+
+    def test_stream_cancelled_only_when_last_subscriber_leaves(self):
+        single_flight = GaqlSingleFlight()
+        source = GatedSource(list(range(10)))
+        source.release.set()
+
+        first = single_flight.iter_rows("key", source.open)
+        second = single_flight.iter_rows("key", source.open)
+        assert next(first) == 0
+        assert next(second) == 0
+
+        first.close()
+        assert not source.closed
+        assert next(second) == 1
+        second.close()
+        assert source.closed
+
+    def test_unread_generator_never_subscribes(self):
+        single_flight = GaqlSingleFlight()
+        source = GatedSource([1])
+
+        single_flight.iter_rows("key", source.open).close()
+
+        assert source.opened == 0
+        assert single_flight.stats()["flights"] == 0
+
+    def test_error_reaches_every_subscriber(self):
+        single_flight = GaqlSingleFlight()
+        source = GatedSource([1], error=RuntimeError("quota"))
+        results = {}
+
+        first = consume_in_thread(single_flight.iter_rows("key", source.open), results, "first")
+        wait_for(lambda: single_flight.stats()["in_flight"] == 1)
+        second = consume_in_thread(single_flight.iter_rows("key", source.open), results, "second")
+        wait_for(lambda: single_flight.stats()["deduplicated"] == 1)
+        source.release.set()
+        first.join()
+        second.join()
+
+        assert all(isinstance(result, RuntimeError) for result in results.values())
+
+    def test_trimmed_flight_stops_accepting_joiners(self):
+        single_flight = GaqlSingleFlight(replay_rows=2)
+        source = GatedSource(list(range(6)))
+        source.release.set()
+
+        leader = single_flight.iter_rows("key", source.open)
+        assert [next(leader) for _ in range(4)] == [0, 1, 2, 3]
+        follower = single_flight.iter_rows("key", source.open)
+
+        assert list(follower) == list(range(6))
+        assert source.opened == 2
+
+    def test_buffer_keeps_only_unread_rows_past_replay_window(self):
+        single_flight = GaqlSingleFlight(replay_rows=3)
+        source = GatedSource(list(range(100)))
+        source.release.set()
+
+        fast = single_flight.iter_rows("key", source.open)
+        slow = single_flight.iter_rows("key", source.open)
+        assert next(slow) == 0
+        assert [next(fast) for _ in range(50)] == list(range(50))
+        flight = single_flight._flights["key"]
+        assert len(flight._buffer) == 50
+
+        assert [next(slow) for _ in range(49)] == list(range(1, 50))
+        assert next(fast) == 50
+        # Only the row the slow reader is on and the fast reader's new row remain
+        assert len(flight._buffer) == 2
+        fast.close()
+        assert list(slow) == list(range(50, 100))
+        assert len(flight._buffer) <= 1
+
+
+    def test_lagging_reader_is_detached_and_resumes_privately(self):
+        single_flight = GaqlSingleFlight(replay_rows=2, max_lag_rows=5)
+        source = GatedSource(list(range(30)))
+        source.release.set()
+
+        slow = single_flight.iter_rows("key", source.open)
+        assert [next(slow), next(slow)] == [0, 1]
+        fast = single_flight.iter_rows("key", source.open)
+        assert list(fast) == list(range(30))
+
+        assert list(slow) == list(range(2, 30))
+        assert source.opened == 2
+        assert single_flight.stats()["detached"] == 1
+
+
+class TestExecuteGaqlQueryCoalescing:
+    """Tests for coalescing at the query helpers."""
+
+    def test_identical_queries_with_different_formatting_share_a_call(self):
+        release = threading.Event()
+
+        def search_stream(customer_id, query):
+            release.wait(5)
+            return iter([SimpleNamespace(results=[1, 2])])
+
+        client = Mock()
+        client.get_service.return_value.search_stream.side_effect = search_stream
+        single_flight = google_ads_mcp.gaql_single_flight
+        results = {}
+
+        def run(name, query):
+            results[name] = execute_gaql_query(client, "1234567890", query)
+
+        first = threading.Thread(target=run, args=("first", "SELECT campaign.id FROM campaign"))
+        first.start()
+        wait_for(lambda: single_flight.stats()["in_flight"] == 1)
+        second = threading.Thread(target=run, args=("second", "select   campaign.id from campaign"))
+        second.start()
+        wait_for(lambda: single_flight.stats()["deduplicated"] == 1)
+        release.set()
+        first.join()
+        second.join()
+
+        assert results == {"first": [1, 2], "second": [1, 2]}
+        assert client.get_service.return_value.search_stream.call_count == 1
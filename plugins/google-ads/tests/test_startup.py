@@ -0,0 +1,101 @@
+# File: plugins/google-ads/tests/test_startup.py
+"""Tests for deferred SDK loading and the startup prewarm."""
+
+import asyncio
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# Add src directory to path
+sys.path.insert(0, str(SRC_DIR))
+
+import google_ads_mcp
+from google_ads_mcp import google_ads_api_version, install_prewarm_hook, prewarm_google_ads_sdk
+
+
+@pytest.fixture
+def fresh_version():
+    """Resolve the API version again for this test."""
+    google_ads_api_version.cache_clear()
+    yield
+    google_ads_api_version.cache_clear()
+
+
+class TestDeferredImports:
+    """Tests that importing the server does not load the Ads SDK."""
+
+    def test_import_skips_sdk(self):
+        script = textwrap.dedent(f"""
+            import sys
+            sys.path.insert(0, {str(SRC_DIR)!r})
+            import google_ads_mcp
+            heavy = ["google.ads.googleads.client", "google.oauth2.credentials",
+                     "google.auth.transport.requests", "google.protobuf.json_format"]
+            print(",".join(name for name in heavy if name in sys.modules))
+        """)
+        completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+
+        assert completed.stdout.strip() == ""
+
+    def test_pooled_client_class_on_access(self):
+        from google.ads.googleads.client import GoogleAdsClient
+
+        assert issubclass(google_ads_mcp.PooledGoogleAdsClient, GoogleAdsClient)
+        assert google_ads_mcp.PooledGoogleAdsClient is google_ads_mcp.pooled_client_class()
+
+
+class TestApiVersion:
+    """Tests for lazy API version resolution."""
+
+    def test_default(self, fresh_version, monkeypatch):
+        monkeypatch.delenv("GOOGLE_ADS_API_VERSION", raising=False)
+        assert google_ads_api_version() is None
+
+    def test_unavailable_version_falls_back(self, fresh_version, monkeypatch):
+        monkeypatch.setenv("GOOGLE_ADS_API_VERSION", "v1")
+        with pytest.warns(RuntimeWarning, match="not available"):
+            assert google_ads_api_version() is None
+
+
+class TestPrewarm:
+    """Tests for the background prewarm."""
+
+    def test_hook_starts_prewarm_after_handshake(self, monkeypatch):
+        from mcp.server.fastmcp import FastMCP
+        from mcp.types import InitializedNotification
+
+        started = []
+        monkeypatch.setattr(google_ads_mcp, "start_prewarm", lambda: started.append(True))
+        server = FastMCP("test")
+        install_prewarm_hook(server)
+
+        assert not started
+        handler = server._mcp_server.notification_handlers[InitializedNotification]
+        asyncio.run(handler(InitializedNotification(method="notifications/initialized")))
+        assert started == [True]
+
+    def test_prewarm_without_credentials(self, mock_no_credentials_env, monkeypatch):
+        pool = google_ads_mcp.GoogleAdsClientPool(background_refresh=False)
+        monkeypatch.setattr(google_ads_mcp, "client_pool", pool)
+
+        prewarm_google_ads_sdk()
+
+        assert "google.protobuf.json_format" in sys.modules
+        assert pool.stats()["clients"] == 0
+
+    def test_prewarm_failure_is_logged(self, monkeypatch, caplog):
+        def fail():
+            raise ImportError("no SDK")
+
+        monkeypatch.setattr(google_ads_mcp, "googleads_client_module", fail)
+
+        with caplog.at_level("DEBUG", logger=google_ads_mcp.logger.name):
+            prewarm_google_ads_sdk()
+
+        assert "prewarm failed" in caplog.text
+        assert "no SDK" in caplog.text
@@ -0,0 +1,132 @@
+# File: plugins/google-ads/tests/test_store.py
+"""Tests for the local GAQL result store."""
+
+import asyncio
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    GaqlResultStore,
+    QueryStoreInput,
+    RunGoogleAdsGaqlInput,
+    google_ads_query_store,
+    iter_cursor_rows,
+    run_google_ads_gaql,
+    validate_store_table_name,
+)
+
+COLUMNS = ["campaign.name", "metrics.cost_micros", "ad_group_ad.ad.final_urls"]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A result store in a temporary file, installed as the module store."""
+    result_store = GaqlResultStore(str(tmp_path / "store.sqlite"))
+    monkeypatch.setattr(google_ads_mcp, "result_store", result_store)
+    return result_store
+
+
+class TestGaqlResultStore:
+    """Tests for storing and querying rows."""
+
+    def test_store_and_query(self, store):
+        """Test rows are stored in batches and queryable with SQL."""
+        rows = ((f"Campaign {i % 3}", i * 1000, [f"https://example.com/{i}"]) for i in range(12_000))
+        assert store.store_rows("ads", COLUMNS, rows, "1234567890", "SELECT ...") == 12_000
+
+        cursor = store.query("SELECT campaign_name, COUNT(*) FROM ads GROUP BY 1 ORDER BY 1")
+        assert list(iter_cursor_rows(cursor)) == [("Campaign 0", 4000), ("Campaign 1", 4000), ("Campaign 2", 4000)]
+
+    def test_lists_are_stored_as_json(self, store):
+        """Test repeated fields are stored as JSON text."""
+        store.store_rows("ads", COLUMNS, [("A", 1, ["u1", "u2"])], "1", "q")
+        cursor = store.query("SELECT ad_group_ad_ad_final_urls FROM ads")
+        assert json.loads(list(iter_cursor_rows(cursor))[0][0]) == ["u1", "u2"]
+
+    def test_restore_replaces_table(self, store):
+        """Test storing under the same name replaces the previous rows."""
+        store.store_rows("ads", COLUMNS, [("A", 1, [])], "1", "q")
+        store.store_rows("ads", COLUMNS, [("B", 2, []), ("C", 3, [])], "1", "q")
+
+        assert [table["row_count"] for table in store.list_tables()] == [2]
+
+    def test_failed_restore_keeps_previous_table(self, store):
+        """Test a stream that fails part-way leaves the old rows and metadata in place."""
+        store.store_rows("ads", COLUMNS, [("A", 1, []), ("B", 2, [])], "1", "q")
+
+        def failing_rows():
+            yield ("C", 3, [])
+            raise RuntimeError("stream reset")
+
+        with pytest.raises(RuntimeError, match="stream reset"):
+            store.store_rows("ads", COLUMNS, failing_rows(), "1", "q2")
+
+        cursor = store.query("SELECT campaign_name FROM ads ORDER BY 1")
+        assert list(iter_cursor_rows(cursor)) == [("A",), ("B",)]
+        assert [(table["row_count"], table["query"]) for table in store.list_tables()] == [(2, "q")]
+
+    def test_rejects_writes(self, store):
+        """Test non-SELECT statements are refused."""
+        store.store_rows("ads", COLUMNS, [("A", 1, [])], "1", "q")
+        with pytest.raises(ValueError, match="SELECT"):
+            store.query("DELETE FROM ads")
+        with pytest.raises(sqlite3.Error):
+            store.query("SELECT 1; DROP TABLE ads")
+
+    def test_table_name_validation(self):
+        """Test table names must be plain identifiers."""
+        assert validate_store_table_name("Search_Terms_2025") == "search_terms_2025"
+        with pytest.raises(ValueError):
+            validate_store_table_name("terms; drop table x")
+
+
+class TestStoreTools:
+    """Tests for store_as and google_ads_query_store."""
+
+    def test_store_then_query(self, store, monkeypatch, make_campaign_row, make_stream_client):
+        """Test a stored pull answers follow-up SQL without another API call."""
+        rows = [make_campaign_row(campaign_id=i, name=f"C{i % 2}", cost_micros=1_000_000) for i in range(50)]
+        client = make_stream_client(rows, batch_size=10)
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+
+        stored = json.loads(asyncio.run(run_google_ads_gaql(RunGoogleAdsGaqlInput(
+            customer_id="1234567890",
+            query="SELECT campaign.name, metrics.cost_micros FROM campaign",
+            store_as="campaigns"
+        ))))
+        result = json.loads(asyncio.run(google_ads_query_store(QueryStoreInput(
+            sql="SELECT campaign_name, SUM(metrics_cost_micros) / 1e6 AS cost FROM campaigns GROUP BY 1 ORDER BY 1"
+        ))))
+
+        assert stored["rows_stored"] == 50
+        assert result["results"] == [{"campaign_name": "C0", "cost": 25.0}, {"campaign_name": "C1", "cost": 25.0}]
+        assert client.get_service.return_value.search_stream.call_count == 1
+
+    def test_list_tables(self, store):
+        """Test omitting sql lists stored tables."""
+        store.store_rows("ads", COLUMNS, [("A", 1, [])], "1234567890", "SELECT ...")
+        listing = json.loads(asyncio.run(google_ads_query_store(QueryStoreInput())))
+
+        assert listing["tables"][0]["table_name"] == "ads"
+        assert listing["tables"][0]["columns"] == ["campaign_name", "metrics_cost_micros", "ad_group_ad_ad_final_urls"]
+
+    def test_long_table_list_is_budgeted(self, store, monkeypatch):
+        """Test a listing larger than the response budget drops whole tables and stays valid JSON."""
+        monkeypatch.setattr(
+            store, "list_tables",
+            lambda: [{"table_name": f"t{i}", "columns": "[]", "row_count": i} for i in range(2_000)]
+        )
+        listing = json.loads(asyncio.run(google_ads_query_store(QueryStoreInput())))
+
+        assert listing["store_path"] == store.path
+        assert listing["truncated"] is True
+        assert listing["rows_total"] == 2_000
+        assert listing["table_count"] == len(listing["tables"]) < 2_000
@@ -0,0 +1,223 @@
+# File: plugins/google-ads/tests/test_streaming.py
+"""Tests for streaming GAQL rows into budgeted responses."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    GaqlResponseFormat,
+    RunGoogleAdsGaqlInput,
+    build_columnar_response,
+    build_json_response,
+    iter_gaql_rows,
+    run_google_ads_gaql,
+)
+
+
+class CancellableStream:
+    """Stand-in for a gRPC stream that records cancellation."""
+
+    def __init__(self, batches):
+        self._batches = iter(batches)
+        self.cancel = Mock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._batches)
+
+
+class TestIterGaqlRows:
+    """Tests for lazy row iteration."""
+
+    def test_yields_rows_across_batches(self, make_stream_client):
+        """Test rows from every batch are yielded in order."""
+        client = make_stream_client(list(range(5)))
+        assert list(iter_gaql_rows(client, "1234567890", "SELECT campaign.id FROM campaign")) == [0, 1, 2, 3, 4]
+
+    def test_closing_early_cancels_stream(self):
+        """Test an abandoned stream is cancelled instead of drained."""
+        stream = CancellableStream([SimpleNamespace(results=[1, 2]), SimpleNamespace(results=[3])])
+        client = Mock()
+        client.get_service.return_value.search_stream.return_value = stream
+
+        rows = iter_gaql_rows(client, "1234567890", "SELECT campaign.id FROM campaign")
+        assert next(rows) == 1
+        rows.close()
+
+        stream.cancel.assert_called_once()
+
+    def test_exhausted_stream_is_not_cancelled(self):
+        """Test a fully read stream is left alone."""
+        stream = CancellableStream([SimpleNamespace(results=[1])])
+        client = Mock()
+        client.get_service.return_value.search_stream.return_value = stream
+
+        assert list(iter_gaql_rows(client, "1234567890", "SELECT campaign.id FROM campaign")) == [1]
+        stream.cancel.assert_not_called()
+
+
+class TestBuildJsonResponse:
+    """Tests for the budget-aware JSON writer."""
+
+    def test_matches_json_dumps_layout(self):
+        """Test untruncated output equals the equivalent json.dumps(indent=2)."""
+        rows = [{"campaign": {"id": "1", "name": "A"}}, {"campaign": {"id": "2", "name": "B"}}]
+        output = build_json_response({"customer_id": "1234567890"}, iter(rows))
+
+        expected = json.dumps({
+            "customer_id": "1234567890",
+            "results": rows,
+            "result_count": 2,
+            "rows_returned": 2,
+            "rows_total": 2,
+            "truncated": False
+        }, indent=2)
+        assert output == expected
+
+    def test_empty_rows(self):
+        """Test an empty stream still yields valid JSON."""
+        output = json.loads(build_json_response({"customer_id": "1"}, iter([])))
+        assert output["results"] == []
+        assert output["result_count"] == 0
+
+    def test_stops_at_budget_with_valid_json(self):
+        """Test truncation keeps JSON valid and marks remaining rows."""
+        consumed = []
+
+        def rows():
+            for i in range(10_000):
+                consumed.append(i)
+                yield {"campaign": {"id": str(i), "name": "x" * 50}}
+
+        output = build_json_response({"customer_id": "1"}, rows(), budget=2000)
+        parsed = json.loads(output)
+
+        assert len(output) <= 2000
+        assert parsed["truncated"] is True
+        assert parsed["more_rows_available"] is True
+        assert parsed["result_count"] == len(parsed["results"])
+        # Only one row past the budget is ever read
+        assert len(consumed) == parsed["result_count"] + 1
+        assert parsed["rows_returned"] == parsed["result_count"]
+        # A stream cut short has an unknown total
+        assert parsed["rows_total"] is None
+
+    def test_rows_total_for_lists(self):
+        """Test a truncated list still reports how many rows it had."""
+        rows = [{"campaign": {"id": str(i)}} for i in range(500)]
+        parsed = json.loads(build_json_response({}, rows, budget=1500))
+
+        assert parsed["truncated"] is True
+        assert parsed["rows_total"] == 500
+        assert parsed["rows_returned"] < 500
+
+    def test_rows_past_budget_are_not_encoded(self, monkeypatch):
+        """Test rows estimated not to fit are never serialized."""
+        encoded = []
+        dumps = json.dumps
+
+        def counting_dumps(value, *args, **kwargs):
+            if isinstance(value, dict) and "campaign" in value:
+                encoded.append(value)
+            return dumps(value, *args, **kwargs)
+
+        monkeypatch.setattr(google_ads_mcp.json, "dumps", counting_dumps)
+        rows = ({"campaign": {"id": f"{i:06d}"}} for i in range(10_000))
+        parsed = json.loads(build_json_response({}, rows, budget=3000))
+
+        assert len(encoded) == parsed["result_count"]
+
+
+def decode_columnar(payload):
+    """Expand a columnar response back into value tuples."""
+    dictionaries = payload["dictionaries"]
+    decoded = []
+    for row in payload["rows"]:
+        values = []
+        for column, value in zip(payload["columns"], row):
+            values.append(dictionaries[column][value] if column in dictionaries else value)
+        decoded.append(tuple(values))
+    return decoded
+
+
+class TestBuildColumnarResponse:
+    """Tests for the columnar JSON writer."""
+
+    COLUMNS = ["campaign.name", "campaign.status", "metrics.clicks"]
+
+    def test_round_trip(self):
+        """Test dictionary-encoded rows decode to the original values."""
+        rows = [("Brand", "ENABLED", 3), ("Generic", "PAUSED", 0), ("Brand", "ENABLED", 7)]
+        payload = json.loads(build_columnar_response({"customer_id": "1"}, self.COLUMNS, iter(rows)))
+
+        assert payload["columns"] == self.COLUMNS
+        assert payload["dictionaries"]["campaign.name"] == ["Brand", "Generic"]
+        assert payload["rows"][2] == [0, 0, 7]
+        assert decode_columnar(payload) == rows
+
+    def test_stops_at_budget_with_valid_json(self):
+        """Test dictionary growth counts against the budget."""
+        rows = ((f"Campaign number {i}", "ENABLED", i) for i in range(10_000))
+        output = build_columnar_response({"customer_id": "1"}, self.COLUMNS, rows, budget=3000)
+        payload = json.loads(output)
+
+        assert len(output) <= 3000
+        assert payload["truncated"] is True
+        assert len(payload["dictionaries"]["campaign.name"]) == payload["result_count"]
+
+    def test_smaller_than_json(self):
+        """Test columnar output is several times smaller for repetitive rows."""
+        values = [(f"Campaign {i % 10}", "ENABLED", i) for i in range(500)]
+        dicts = [{"campaign": {"name": n, "status": s}, "metrics": {"clicks": c}} for n, s, c in values]
+        columnar = build_columnar_response({}, self.COLUMNS, iter(values), budget=10 ** 9)
+        nested = build_json_response({}, iter(dicts), budget=10 ** 9)
+
+        assert len(nested) > 3 * len(columnar)
+
+
+class TestRunGoogleAdsGaqlStreaming:
+    """Tests for the run_google_ads_gaql response budget."""
+
+    def test_large_result_is_truncated(self, monkeypatch, make_campaign_row, make_stream_client):
+        """Test large results respect CHARACTER_LIMIT."""
+        rows = [make_campaign_row(campaign_id=i, name=f"Campaign {i}") for i in range(2000)]
+        client = make_stream_client(rows, batch_size=100)
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+        params = RunGoogleAdsGaqlInput(
+            customer_id="123-456-7890",
+            query="SELECT campaign.id, campaign.name FROM campaign",
+            use_streaming=True
+        )
+
+        output = asyncio.run(run_google_ads_gaql(params))
+        parsed = json.loads(output)
+
+        assert len(output) <= google_ads_mcp.CHARACTER_LIMIT
+        assert parsed["truncated"] is True
+        assert 0 < parsed["result_count"] < 2000
+        assert parsed["results"][0]["campaign"]["name"] == "Campaign 0"
+
+    def test_columnar_format(self, monkeypatch, make_campaign_row, make_stream_client):
+        """Test the columnar response format decodes to the selected fields."""
+        rows = [make_campaign_row(campaign_id=i, name="Brand", status=2, clicks=i) for i in range(3)]
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: make_stream_client(rows))
+        params = RunGoogleAdsGaqlInput(
+            customer_id="1234567890",
+            query="SELECT campaign.id, campaign.name, campaign.status, metrics.clicks FROM campaign",
+            response_format=GaqlResponseFormat.COLUMNAR
+        )
+
+        payload = json.loads(asyncio.run(run_google_ads_gaql(params)))
+
+        assert payload["format"] == "columnar"
+        assert decode_columnar(payload) == [(i, "Brand", "ENABLED", i) for i in range(3)]
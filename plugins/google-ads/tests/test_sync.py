@@ -0,0 +1,260 @@
+# File: plugins/google-ads/tests/test_sync.py
+"""Tests for incremental daily metrics sync."""
+
+import asyncio
+import json
+import re
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    GaqlResultStore,
+    MetricsSyncEngine,
+    QueryStoreInput,
+    SyncMetricsInput,
+    google_ads_query_store,
+    google_ads_sync_metrics,
+)
+
+TODAY = date(2025, 6, 15)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """A sync engine and metrics store on a temporary file, installed as the module globals."""
+    path = str(tmp_path / "metrics.sqlite")
+    sync_engine = MetricsSyncEngine(path)
+    monkeypatch.setattr(google_ads_mcp, "metrics_sync", sync_engine)
+    monkeypatch.setattr(google_ads_mcp, "metrics_store", GaqlResultStore(path))
+    return sync_engine
+
+
+@pytest.fixture
+def daily_client():
+    """Mock client that returns one campaign row per day in the queried date range."""
+    from google.ads.googleads.v21.services.types.google_ads_service import GoogleAdsRow
+
+    row_class = GoogleAdsRow.pb()
+    client = Mock()
+    client.queries = []
+
+    def search_stream(customer_id, query):
+        client.queries.append(query)
+        if "FROM customer" in query:
+            row = row_class()
+            row.customer.time_zone = "Pacific/Pago_Pago"
+            return iter([SimpleNamespace(results=[row])])
+        start, end = re.search(r"BETWEEN '([\d-]+)' AND '([\d-]+)'", query).groups()
+        rows = []
+        day = date.fromisoformat(start)
+        while day <= date.fromisoformat(end):
+            row = row_class()
+            row.segments.date = day.isoformat()
+            row.campaign.id = 11
+            row.campaign.name = "Brand"
+            row.metrics.clicks = 5
+            row.metrics.cost_micros = 1_000_000
+            rows.append(row)
+            day += timedelta(days=1)
+        return iter([SimpleNamespace(results=rows)])
+
+    client.get_service.return_value.search_stream.side_effect = search_stream
+    return client
+
+
+def read_rows(path, sql):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(sql).fetchall()
+    finally:
+        connection.close()
+
+
+class TestMetricsSyncEngine:
+    """Tests for watermarks, windows and upserts."""
+
+    def test_first_sync_loads_lookback(self, engine, daily_client):
+        summary = engine.sync(daily_client, "123-456-7890", "campaign", lookback_days=30, today=TODAY)
+
+        assert summary["status"] == "synced"
+        assert summary["start_date"] == "2025-05-16"
+        assert summary["end_date"] == "2025-06-14"
+        assert summary["rows"] == 30
+        assert engine.get_watermark("1234567890", "campaign") == date(2025, 6, 14)
+        assert read_rows(engine.path, "SELECT COUNT(*) FROM campaign_daily") == [(30,)]
+
+    def test_next_day_fetches_only_restatement_window(self, engine, daily_client):
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=30, restatement_days=3, today=TODAY)
+        summary = engine.sync(
+            daily_client, "1234567890", "campaign",
+            lookback_days=30, restatement_days=3, today=TODAY + timedelta(days=1)
+        )
+
+        # Three restated days plus the one new day
+        assert (summary["start_date"], summary["end_date"]) == ("2025-06-12", "2025-06-15")
+        assert summary["rows"] == 4
+        assert "BETWEEN '2025-06-12' AND '2025-06-15'" in daily_client.queries[-1]
+        # Restated days are replaced, not duplicated
+        assert read_rows(engine.path, "SELECT COUNT(*) FROM campaign_daily") == [(31,)]
+
+    def test_up_to_date_without_restatement(self, engine, daily_client):
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=7, restatement_days=0, today=TODAY)
+        summary = engine.sync(daily_client, "1234567890", "campaign", restatement_days=0, today=TODAY)
+
+        assert summary["status"] == "up_to_date"
+        assert len(daily_client.queries) == 1
+
+    def test_restated_values_overwrite(self, engine, daily_client):
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=3, today=TODAY)
+        connection = sqlite3.connect(engine.path)
+        connection.execute("UPDATE campaign_daily SET metrics_clicks = 0")
+        connection.commit()
+        connection.close()
+
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=3, restatement_days=1, today=TODAY)
+
+        rows = read_rows(engine.path, "SELECT segments_date, metrics_clicks FROM campaign_daily ORDER BY 1")
+        assert rows == [("2025-06-12", 0), ("2025-06-13", 0), ("2025-06-14", 5)]
+
+    def test_failed_fetch_keeps_watermark(self, engine, daily_client):
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=3, today=TODAY)
+        daily_client.get_service.return_value.search_stream.side_effect = Exception("quota")
+
+        with pytest.raises(Exception, match="quota"):
+            engine.sync(daily_client, "1234567890", "campaign", today=TODAY + timedelta(days=2))
+
+        assert engine.get_watermark("1234567890", "campaign") == date(2025, 6, 14)
+
+    def test_rows_are_inserted_in_batches(self, engine, daily_client, monkeypatch):
+        monkeypatch.setattr(google_ads_mcp, "STORE_INSERT_BATCH_SIZE", 4)
+        summary = engine.sync(daily_client, "1234567890", "campaign", lookback_days=10, today=TODAY)
+
+        assert summary["rows"] == 10
+        assert read_rows(engine.path, "SELECT COUNT(*) FROM campaign_daily") == [(10,)]
+
+    def test_failed_stream_rolls_back(self, engine, daily_client):
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=3, today=TODAY)
+        rows = daily_client.get_service.return_value.search_stream.side_effect(
+            "1234567890", "WHERE segments.date BETWEEN '2025-06-12' AND '2025-06-16'"
+        )
+        batch = next(rows)
+
+        def failing_stream(customer_id, query):
+            yield batch
+            raise Exception("stream reset")
+
+        daily_client.get_service.return_value.search_stream.side_effect = failing_stream
+        with pytest.raises(Exception, match="stream reset"):
+            engine.sync(daily_client, "1234567890", "campaign", restatement_days=3, today=TODAY + timedelta(days=2))
+
+        # The restated days weren't deleted and the watermark didn't move
+        assert read_rows(engine.path, "SELECT COUNT(*) FROM campaign_daily") == [(3,)]
+        assert engine.get_watermark("1234567890", "campaign") == date(2025, 6, 14)
+
+    def test_list_tables(self, engine, daily_client):
+        assert engine.list_tables() == []
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=3, today=TODAY)
+        engine.sync(daily_client, "2222222222", "campaign", lookback_days=2, today=TODAY)
+
+        [table] = engine.list_tables()
+        assert table["table_name"] == "campaign_daily"
+        assert table["row_count"] == 5
+        assert table["columns"][:3] == ["customer_id", "segments_date", "campaign_id"]
+        assert [(account["customer_id"], account["last_date"]) for account in table["accounts"]] == [
+            ("1234567890", "2025-06-14"), ("2222222222", "2025-06-14")
+        ]
+
+    def test_window_ends_before_the_accounts_today(self, engine, daily_client, monkeypatch):
+        seen = []
+
+        def account_date(accounts):
+            seen.extend(accounts)
+            return TODAY
+
+        monkeypatch.setattr(google_ads_mcp, "earliest_account_date", account_date)
+        summary = engine.sync(daily_client, "1234567890", "campaign", lookback_days=3)
+
+        assert seen == [{"id": "1234567890", "timezone": "Pacific/Pago_Pago"}]
+        assert summary["end_date"] == "2025-06-14"
+
+        engine.sync(daily_client, "1234567890", "ad_group", lookback_days=3, time_zone="Europe/Berlin")
+        assert seen[-1]["timezone"] == "Europe/Berlin"
+        assert sum("FROM customer" in query for query in daily_client.queries) == 1
+
+    def test_new_columns_are_added_to_existing_tables(self, engine, daily_client):
+        connection = sqlite3.connect(engine.path)
+        connection.execute(
+            "CREATE TABLE campaign_daily (customer_id, segments_date, campaign_id, campaign_name, metrics_clicks, "
+            "PRIMARY KEY (customer_id, segments_date, campaign_id))"
+        )
+        connection.close()
+
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=2, today=TODAY)
+
+        rows = read_rows(engine.path, "SELECT metrics_clicks, metrics_cost_micros FROM campaign_daily")
+        assert rows == [(5, 1_000_000), (5, 1_000_000)]
+
+    def test_incompatible_table_fails_loudly(self, engine, daily_client):
+        connection = sqlite3.connect(engine.path)
+        connection.execute("CREATE TABLE campaign_daily (customer_id, segments_date, PRIMARY KEY (customer_id, segments_date))")
+        connection.close()
+
+        with pytest.raises(ValueError, match="primary key"):
+            engine.sync(daily_client, "1234567890", "campaign", lookback_days=2, today=TODAY)
+        assert engine.get_watermark("1234567890", "campaign") is None
+
+    def test_unknown_resource(self, engine, daily_client):
+        with pytest.raises(ValueError, match="Unknown resource"):
+            engine.sync(daily_client, "1234567890", "geo")
+
+
+class TestSyncMetricsTool:
+    """Tests for the google_ads_sync_metrics tool."""
+
+    def test_rejects_unknown_resource(self):
+        with pytest.raises(ValueError):
+            SyncMetricsInput(resources=["geo"])
+
+    def test_syncs_accounts_and_reports_errors(self, engine, daily_client):
+        def sync(client, customer_id, resource, **kwargs):
+            if customer_id == "2222222222":
+                raise Exception("permission denied")
+            return MetricsSyncEngine.sync(engine, client, customer_id, resource, lookback_days=2, today=TODAY)
+
+        with patch.object(google_ads_mcp, "get_google_ads_client", return_value=daily_client), \
+                patch.object(engine, "sync", side_effect=sync):
+            result = json.loads(asyncio.run(google_ads_sync_metrics(
+                SyncMetricsInput(customer_ids=["1111111111", "2222222222"])
+            )))
+
+        assert result["accounts"] == 2
+        assert result["rows_synced"] == 2
+        assert result["errors"] == 1
+        statuses = {sync["customer_id"]: sync["status"] for sync in result["syncs"]}
+        assert statuses == {"1111111111": "synced", "2222222222": "error"}
+
+    def test_query_store_reads_metrics(self, engine, daily_client):
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=2, today=TODAY)
+
+        result = json.loads(asyncio.run(google_ads_query_store(QueryStoreInput(
+            sql="SELECT SUM(metrics_clicks) AS clicks FROM campaign_daily", store="metrics"
+        ))))
+
+        assert result["results"] == [{"clicks": 10}]
+
+    def test_query_store_lists_metrics_tables(self, engine, daily_client):
+        engine.sync(daily_client, "1234567890", "campaign", lookback_days=2, today=TODAY)
+
+        result = json.loads(asyncio.run(google_ads_query_store(QueryStoreInput(store="metrics"))))
+
+        assert [(table["table_name"], table["row_count"]) for table in result["tables"]] == [("campaign_daily", 2)]
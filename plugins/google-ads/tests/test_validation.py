@@ -0,0 +1,288 @@
+# File: plugins/google-ads/tests/test_validation.py
+"""Tests for the offline GAQL parser, validator and field catalog."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import google_ads_mcp
+from google_ads_mcp import (
+    GaqlFieldCatalog,
+    GaqlFieldCatalogCache,
+    GaqlSyntaxError,
+    GaqlValidationError,
+    RunGoogleAdsGaqlInput,
+    ValidateGaqlInput,
+    google_ads_validate_gaql,
+    parse_gaql,
+    prepare_gaql_query,
+    run_google_ads_gaql,
+    validate_gaql,
+)
+
+
+def field(category, selectable=True, filterable=True, sortable=True, selectable_with=(), **extra):
+    return dict(
+        category=category, selectable=selectable, filterable=filterable, sortable=sortable,
+        selectable_with=list(selectable_with), **extra
+    )
+
+
+@pytest.fixture
+def catalog():
+    """A small catalog modelled on the real campaign / search_term_view metadata."""
+    return GaqlFieldCatalog("v21", {
+        "campaign": field("RESOURCE", selectable_with=[
+            "segments.date", "segments.device", "metrics.clicks", "metrics.cost_micros",
+            "metrics.search_impression_share"
+        ]),
+        "search_term_view": field("RESOURCE", selectable_with=[
+            "campaign", "segments.date", "metrics.clicks"
+        ], attribute_resources=["campaign"]),
+        "campaign.id": field("ATTRIBUTE"),
+        "campaign.name": field("ATTRIBUTE"),
+        "campaign.status": field(
+            "ATTRIBUTE", data_type="ENUM", enum_values=["UNSPECIFIED", "UNKNOWN", "ENABLED", "PAUSED", "REMOVED"]
+        ),
+        "campaign.resource_name": field("ATTRIBUTE", sortable=False),
+        "search_term_view.search_term": field("ATTRIBUTE"),
+        "segments.date": field("SEGMENT"),
+        "segments.device": field("SEGMENT", selectable_with=["campaign", "metrics.clicks"]),
+        "metrics.clicks": field("METRIC"),
+        "metrics.cost_micros": field("METRIC"),
+        "metrics.search_impression_share": field("METRIC", filterable=False),
+    })
+
+
+class TestParseGaql:
+    """Tests for the GAQL grammar."""
+
+    def test_full_query(self):
+        parsed = parse_gaql(
+            "SELECT campaign.id, metrics.clicks FROM campaign "
+            "WHERE campaign.status IN ('ENABLED', 'PAUSED') AND segments.date BETWEEN '2025-01-01' AND '2025-01-31' "
+            "AND metrics.clicks > 10 AND campaign.name NOT LIKE '%brand%' AND campaign.id IS NOT NULL "
+            "ORDER BY metrics.clicks DESC, campaign.id LIMIT 50 PARAMETERS include_drafts = true"
+        )
+
+        assert parsed.select == ["campaign.id", "metrics.clicks"]
+        assert parsed.resource == "campaign"
+        assert [c.operator for c in parsed.where] == ["IN", "BETWEEN", ">", "NOT LIKE", "IS NOT NULL"]
+        assert parsed.order_by == [("metrics.clicks", "DESC"), ("campaign.id", "ASC")]
+        assert parsed.limit == 50
+        assert parsed.parameters == [("include_drafts", "true")]
+
+    def test_round_trip(self):
+        query = (
+            "SELECT campaign.id FROM campaign WHERE segments.date DURING LAST_7_DAYS "
+            "AND campaign.status IN ('ENABLED') ORDER BY campaign.id DESC LIMIT 5"
+        )
+        assert parse_gaql(parse_gaql(query).to_gaql()).to_gaql() == parse_gaql(query).to_gaql()
+
+    @pytest.mark.parametrize("query", [
+        "UPDATE campaign SET campaign.status = 'PAUSED'",
+        "SELECT campaign.id FROM campaign; DELETE FROM campaign",
+        "SELECT campaign.id FROM campaign WHERE campaign.id = 1 OR campaign.id = 2",
+        "SELECT campaign.id, FROM campaign",
+        "SELECT campaign.id FROM campaign LIMIT 0",
+    ])
+    def test_rejects(self, query):
+        with pytest.raises(GaqlSyntaxError):
+            parse_gaql(query)
+
+    def test_mutation_words_in_values_are_allowed(self):
+        """Test filters that merely mention 'update' or 'create' are not mistaken for mutations."""
+        parsed = parse_gaql("SELECT campaign.name FROM campaign WHERE campaign.name LIKE '%Update - Create%'")
+        assert parsed.where[0].values == [("string", "'%Update - Create%'")]
+
+
+class TestValidateGaql:
+    """Tests for catalog-backed validation and auto-fixes."""
+
+    def test_valid_query_is_unchanged(self, catalog):
+        query = "SELECT campaign.name, metrics.clicks FROM campaign WHERE segments.date DURING LAST_7_DAYS"
+        validation = validate_gaql(query, catalog)
+
+        assert validation.valid
+        assert validation.query == query
+        assert validation.fixes == []
+
+    def test_typo_suggestion(self, catalog):
+        validation = validate_gaql("SELECT campaign.nmae FROM campaing", catalog)
+
+        assert "Unknown field 'campaign.nmae' in SELECT; did you mean 'campaign.name'?" in validation.errors
+        assert "Unknown resource 'campaing' in FROM; did you mean 'campaign'?" in validation.errors
+
+    def test_incompatible_fields(self, catalog):
+        validation = validate_gaql(
+            "SELECT search_term_view.search_term, metrics.cost_micros FROM search_term_view "
+            "WHERE segments.date DURING LAST_7_DAYS",
+            catalog
+        )
+        assert validation.errors == ["metrics.cost_micros cannot be used with FROM search_term_view"]
+
+    def test_attributed_resource_fields_allowed(self, catalog):
+        validation = validate_gaql(
+            "SELECT search_term_view.search_term, campaign.name, metrics.clicks FROM search_term_view "
+            "WHERE segments.date DURING LAST_7_DAYS",
+            catalog
+        )
+        assert validation.valid
+
+    def test_segment_metric_compatibility(self, catalog):
+        validation = validate_gaql("SELECT segments.device, metrics.cost_micros FROM campaign", catalog)
+        assert "segments.device and metrics.cost_micros cannot be selected together" in validation.errors
+
+    def test_capabilities(self, catalog):
+        validation = validate_gaql(
+            "SELECT campaign.id FROM campaign WHERE metrics.search_impression_share > 0.5 "
+            "ORDER BY campaign.resource_name",
+            catalog
+        )
+        assert validation.errors == [
+            "metrics.search_impression_share is not filterable (used in WHERE)",
+            "campaign.resource_name is not sortable (used in ORDER BY)",
+        ]
+
+    def test_date_segment_needs_range(self):
+        validation = validate_gaql("SELECT segments.date, metrics.clicks FROM campaign")
+        assert not validation.valid
+        assert "finite range" in validation.errors[0]
+
+    def test_open_date_bound_is_not_finite(self):
+        validation = validate_gaql(
+            "SELECT segments.date, metrics.clicks FROM campaign WHERE segments.date >= '2025-01-01'"
+        )
+        assert not validation.valid
+        assert "finite range" in validation.errors[0]
+
+    @pytest.mark.parametrize("condition", [
+        "segments.date DURING LAST_7_DAYS",
+        "segments.date BETWEEN '2025-01-01' AND '2025-01-31'",
+        "segments.date = '2025-01-01'",
+        "segments.date IN ('2025-01-01', '2025-01-02')",
+        "segments.date >= '2025-01-01' AND segments.date < '2025-02-01'",
+    ])
+    def test_finite_date_ranges(self, condition):
+        validation = validate_gaql(f"SELECT segments.date, metrics.clicks FROM campaign WHERE {condition}")
+        assert validation.valid, validation.errors
+
+    def test_auto_fix_enum_case_and_duplicates(self, catalog):
+        validation = validate_gaql(
+            "SELECT campaign.id, campaign.id FROM campaign WHERE campaign.status IN ('enabled', 'Paused')",
+            catalog
+        )
+
+        assert validation.valid
+        assert validation.query == "SELECT campaign.id FROM campaign WHERE campaign.status IN ('ENABLED', 'PAUSED')"
+        assert len(validation.fixes) == 3
+
+    def test_without_auto_fix_reports_errors(self, catalog):
+        validation = validate_gaql(
+            "SELECT campaign.id FROM campaign WHERE campaign.status = 'enabled'", catalog, auto_fix=False
+        )
+        assert validation.errors == ["'enabled' is not a valid value for campaign.status; did you mean 'ENABLED'?"]
+
+    def test_unknown_enum_value(self, catalog):
+        validation = validate_gaql("SELECT campaign.id FROM campaign WHERE campaign.status = 'ACTIVE'", catalog)
+        assert not validation.valid
+
+
+def make_field_service_client(fields):
+    client = Mock()
+    client.get_service.return_value.search_google_ads_fields.return_value = iter(fields)
+    return client
+
+
+def api_field(name, category, **extra):
+    values = dict(
+        name=name, category=SimpleNamespace(name=category), selectable=True, filterable=True, sortable=True,
+        selectable_with=[], attribute_resources=[], data_type=SimpleNamespace(name="STRING"),
+        enum_values=[], is_repeated=False
+    )
+    values.update(extra)
+    return SimpleNamespace(**values)
+
+
+class TestGaqlFieldCatalogCache:
+    """Tests for fetching and caching the field catalog."""
+
+    def test_fetched_once_and_reused_from_disk(self, tmp_path):
+        client = make_field_service_client([
+            api_field("campaign", "RESOURCE", selectable_with=["metrics.clicks"]),
+            api_field("campaign.id", "ATTRIBUTE"),
+            api_field("metrics.clicks", "METRIC"),
+        ])
+        cache = GaqlFieldCatalogCache(str(tmp_path))
+
+        catalog = cache.get(client, "v21")
+        assert catalog.get("campaign")["selectable_with"] == ["metrics.clicks"]
+        assert cache.get(client, "v21") is catalog
+
+        # A new process reads the disk copy instead of calling the API again
+        restarted = GaqlFieldCatalogCache(str(tmp_path))
+        assert restarted.get(Mock(), "v21").get("campaign.id")["category"] == "ATTRIBUTE"
+        assert restarted.stats()["disk_loads"] == 1
+        assert client.get_service.return_value.search_google_ads_fields.call_count == 1
+
+    def test_fetch_failure_falls_back_and_is_not_retried_immediately(self, tmp_path):
+        client = Mock()
+        client.get_service.return_value.search_google_ads_fields.side_effect = Exception("unavailable")
+        cache = GaqlFieldCatalogCache(str(tmp_path))
+
+        assert cache.get(client, "v21") is None
+        assert cache.get(client, "v21") is None
+        assert cache.stats()["fetch_errors"] == 1
+
+    def test_prepare_raises_with_all_errors(self, tmp_path, monkeypatch, catalog):
+        monkeypatch.setattr(google_ads_mcp.field_catalog, "get", lambda client: catalog)
+
+        with pytest.raises(GaqlValidationError) as error:
+            prepare_gaql_query(Mock(), "SELECT campaign.nmae, metrics.clikcs FROM campaign")
+        assert len(error.value.errors) == 2
+
+
+class TestToolValidation:
+    """Tests for validation inside the tools."""
+
+    def test_invalid_query_never_reaches_api(self, monkeypatch):
+        client = Mock()
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: client)
+
+        output = asyncio.run(run_google_ads_gaql(RunGoogleAdsGaqlInput(
+            customer_id="1234567890", query="REMOVE campaign WHERE campaign.id = 1"
+        )))
+
+        assert output.startswith("Error executing GAQL query: Invalid GAQL query:")
+        client.get_service.return_value.search.assert_not_called()
+
+    def test_fixes_are_reported(self, monkeypatch, catalog, make_campaign_row, make_stream_client):
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", lambda: make_stream_client([make_campaign_row()]))
+        monkeypatch.setattr(google_ads_mcp.field_catalog, "get", lambda client: catalog)
+
+        payload = json.loads(asyncio.run(run_google_ads_gaql(RunGoogleAdsGaqlInput(
+            customer_id="1234567890", query="SELECT campaign.id FROM campaign WHERE campaign.status = 'enabled'"
+        ))))
+
+        assert payload["query"].endswith("campaign.status = 'ENABLED'")
+        assert payload["query_fixes"] == ["campaign.status: 'enabled' -> 'ENABLED'"]
+
+    def test_validate_tool(self, monkeypatch, catalog):
+        monkeypatch.setattr(google_ads_mcp, "get_google_ads_client", Mock)
+        monkeypatch.setattr(google_ads_mcp.field_catalog, "get", lambda client: catalog)
+
+        payload = json.loads(asyncio.run(google_ads_validate_gaql(
+            ValidateGaqlInput(query="SELECT campaign.nmae FROM campaign")
+        )))
+
+        assert payload["valid"] is False
+        assert payload["checks"] == "full"
+        assert "did you mean 'campaign.name'" in payload["errors"][0]